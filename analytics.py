@@ -0,0 +1,148 @@
+# analytics.py
+"""
+Estatísticas em lote sobre todos os hábitos de um HabitTracker.
+
+Em vez de calcular hábito por hábito em Python puro, junta os ordinais das
+conclusões de todos os hábitos num só array e calcula tudo com NumPy: streak
+atual, maior streak, taxa de conclusão numa janela e contagem por dia da
+semana. As streaks saem das sequências de ordinais consecutivos, sem montar uma
+matriz hábitos x dias, então o custo acompanha o número de conclusões e não o
+intervalo entre a mais antiga e 'today'. completion_matrix monta a matriz para
+um intervalo dado. Requer NumPy (dependência opcional; o resto do app não precisa dela).
+"""
+from datetime import date
+import numpy as np
+from habit_logic import HabitTracker
+
+
+class BulkStats:
+    """Resultado de compute_stats: um array por métrica, na ordem de 'names'."""
+    def __init__(self, names: list[str], start: date, today: date, window_days: int,
+                 current_streak: np.ndarray, longest_streak: np.ndarray,
+                 completion_rate: np.ndarray, weekday_counts: np.ndarray):
+        self.names = names
+        self.start = start
+        self.today = today
+        self.window_days = window_days
+        self.current_streak = current_streak
+        self.longest_streak = longest_streak
+        self.completion_rate = completion_rate
+        # weekday_counts[i, w]: conclusões do hábito i no dia da semana w (0 = segunda).
+        self.weekday_counts = weekday_counts
+        self._index = {name: i for i, name in enumerate(names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def for_habit(self, name: str) -> dict | None:
+        """Estatísticas de um hábito como dicionário de valores Python."""
+        i = self._index.get(name)
+        if i is None:
+            return None
+        return {
+            "name": name,
+            "current_streak": int(self.current_streak[i]),
+            "longest_streak": int(self.longest_streak[i]),
+            "completion_rate": float(self.completion_rate[i]),
+            "weekday_counts": self.weekday_counts[i].tolist(),
+        }
+
+
+def _habit_ordinals(tracker: HabitTracker) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """
+    Ordinais de todas as conclusões em um único array, junto com o índice do
+    hábito (linha) de cada uma. Dentro de cada hábito os ordinais são crescentes.
+    """
+    snapshot = tracker.snapshot()
+    per_habit = [np.frombuffer(ordinals, dtype=np.intc) for _, ordinals in snapshot]
+    if not per_habit:
+        return [], np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    ordinals = np.concatenate(per_habit).astype(np.int64)
+    rows = np.repeat(np.arange(len(snapshot)), [len(o) for o in per_habit])
+    return [name for name, _ in snapshot], ordinals, rows
+
+
+def _matrix(n_rows: int, first: int, last: int, ordinals: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    n_days = max(last - first + 1, 0)
+    matrix = np.zeros(n_rows * n_days, dtype=bool)
+    if n_days:
+        matrix[rows * n_days + (ordinals - first)] = True
+    return matrix.reshape(n_rows, n_days)
+
+
+def completion_matrix(tracker: HabitTracker, start: date, end: date) -> tuple[list[str], np.ndarray]:
+    """
+    Matriz booleana (hábitos x dias) das conclusões entre 'start' e 'end', inclusive.
+    A coluna j corresponde ao dia start + j.
+    """
+    names, ordinals, rows = _habit_ordinals(tracker)
+    first, last = start.toordinal(), end.toordinal()
+    inside = (ordinals >= first) & (ordinals <= last)
+    return names, _matrix(len(names), first, last, ordinals[inside], rows[inside])
+
+
+def _runs(ordinals: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sequências de dias consecutivos nos ordinais (agrupados por hábito e
+    crescentes dentro dele, como em _habit_ordinals): hábito, último ordinal e
+    tamanho de cada uma, na mesma ordem.
+    """
+    if len(ordinals) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+    breaks = np.ones(len(ordinals), dtype=bool)
+    breaks[1:] = (np.diff(ordinals) != 1) | (np.diff(rows) != 0)
+    starts = np.flatnonzero(breaks)
+    ends = np.append(starts[1:], len(ordinals)) - 1
+    return rows[starts], ordinals[ends], ends - starts + 1
+
+
+def compute_stats(tracker: HabitTracker, today: date, window_days: int = 30,
+                  start: date | None = None) -> BulkStats:
+    """
+    Calcula as estatísticas de todos os hábitos de uma vez, considerando o
+    histórico até 'today'.
+    - current_streak: dias seguidos concluídos até 'today' (ou até ontem, se
+      'today' ainda não foi concluído); é a regra de
+      HabitTracker.get_current_streak só para hábitos diários, já que a agenda
+      (habit_logic.Schedule) não é considerada aqui.
+    - longest_streak: maior sequência de dias seguidos entre 'start' e 'today'.
+    - completion_rate: fração dos últimos 'window_days' dias (até 'today') concluídos.
+    - weekday_counts: conclusões por dia da semana entre 'start' e 'today'.
+    Se 'start' não for dado, usa a conclusão mais antiga de todos os hábitos;
+    current_streak e completion_rate nunca são cortados por 'start'.
+    """
+    if window_days <= 0:
+        raise ValueError("A janela deve ter pelo menos um dia.")
+    names, ordinals, rows = _habit_ordinals(tracker)
+    n = len(names)
+    last = today.toordinal()
+    until_today = ordinals <= last
+    ordinals, rows = ordinals[until_today], rows[until_today]
+
+    # A streak atual e a janela não dependem de 'start': usam todo o histórico até 'today'.
+    run_rows, run_ends, run_lengths = _runs(ordinals, rows)
+    current = np.zeros(n, dtype=np.int64)
+    # A última sequência de cada hábito conta se termina hoje ou ontem.
+    is_last = np.ones(len(run_rows), dtype=bool)
+    is_last[:-1] = run_rows[1:] != run_rows[:-1]
+    alive = is_last & (run_ends >= last - 1)
+    current[run_rows[alive]] = run_lengths[alive]
+    in_window = ordinals > last - window_days
+    rate = np.bincount(rows[in_window], minlength=n) / window_days
+
+    if start is None:
+        first = min(int(ordinals.min()) if len(ordinals) else last, last)
+    else:
+        first = min(start.toordinal(), last)
+    since_start = ordinals >= first
+    ordinals, rows = ordinals[since_start], rows[since_start]
+    run_rows, _, run_lengths = _runs(ordinals, rows)
+    longest = np.zeros(n, dtype=np.int64)
+    np.maximum.at(longest, run_rows, run_lengths)
+
+    # date.fromordinal(1) é uma segunda-feira (weekday 0).
+    weekday_counts = np.bincount(rows * 7 + (ordinals - 1) % 7, minlength=n * 7).reshape(n, 7)
+
+    return BulkStats(names, date.fromordinal(first), today, window_days, current,
+                     longest, rate, weekday_counts)
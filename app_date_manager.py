@@ -7,40 +7,72 @@ def _get_real_today():
 # Por padrão, a função que define "hoje" é a que retorna a data real.
 # Os testes poderão substituir esta função.
 _today_func = _get_real_today
-_current_app_date = _today_func()
+
+class DateContext:
+    """
+    Data de referência de uma sessão do aplicativo. Cada sessão (ex.: cada aba
+    no modo servidor) tem a sua; as funções do módulo usam um contexto padrão.
+    """
+    def __init__(self, today_func=None):
+        # Sem 'today_func', usa a _today_func do módulo vigente a cada chamada.
+        self._own_today_func = today_func
+        self._current_app_date = self._today()
+
+    def _today(self) -> date:
+        return (self._own_today_func or _today_func)()
+
+    def get_current_app_date(self) -> date:
+        """Retorna a data atualmente configurada para o aplicativo."""
+        return self._current_app_date
+
+    def set_current_app_date(self, new_date: date):
+        """Define manualmente a data do aplicativo, não permitindo datas futuras."""
+        today = self._today() # Usa a função controlável
+        if new_date > today:
+            self._current_app_date = today
+        else:
+            self._current_app_date = new_date
+
+    def advance_day(self):
+        """Avança a data do aplicativo em um dia, se não ultrapassar o dia de hoje."""
+        today = self._today() # Usa a função controlável
+        if self._current_app_date < today:
+            self._current_app_date += timedelta(days=1)
+        # Garante que, mesmo que algo dê errado, não passe de hoje
+        elif self._current_app_date > today:
+             self._current_app_date = today
+
+    def rewind_day(self):
+        """Retrocede a data do aplicativo em um dia."""
+        # Aqui você poderia adicionar um limite inferior, se desejado, mas não foi solicitado.
+        self._current_app_date -= timedelta(days=1)
+
+    def reset_to_today(self):
+        """Reseta a data do aplicativo para o dia atual real."""
+        self._current_app_date = self._today() # Usa a função controlável
+
+_default_context = DateContext()
+
+def default_context() -> DateContext:
+    """Contexto de data usado pelas funções do módulo (aplicativo desktop)."""
+    return _default_context
 
 def get_current_app_date() -> date:
     """Retorna a data atualmente configurada para o aplicativo."""
-    global _current_app_date
-    return _current_app_date
+    return _default_context.get_current_app_date()
 
 def set_current_app_date(new_date: date):
     """Define manualmente a data do aplicativo, não permitindo datas futuras."""
-    global _current_app_date
-    today = _today_func() # Usa a função controlável
-    if new_date > today:
-        _current_app_date = today
-    else:
-        _current_app_date = new_date
+    _default_context.set_current_app_date(new_date)
 
 def advance_day():
     """Avança a data do aplicativo em um dia, se não ultrapassar o dia de hoje."""
-    global _current_app_date
-    today = _today_func() # Usa a função controlável
-    if _current_app_date < today:
-        _current_app_date += timedelta(days=1)
-    # Garante que, mesmo que algo dê errado, não passe de hoje
-    elif _current_app_date > today:
-         _current_app_date = today
-
+    _default_context.advance_day()
 
 def rewind_day():
     """Retrocede a data do aplicativo em um dia."""
-    global _current_app_date
-    # Aqui você poderia adicionar um limite inferior, se desejado, mas não foi solicitado.
-    _current_app_date -= timedelta(days=1)
+    _default_context.rewind_day()
 
 def reset_to_today():
     """Reseta a data do aplicativo para o dia atual real."""
-    global _current_app_date
-    _current_app_date = _today_func() # Usa a função controlável
\ No newline at end of file
+    _default_context.reset_to_today()
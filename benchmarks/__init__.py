@@ -0,0 +1,2 @@
+# Benchmarks de desempenho. Execute a partir da raiz do repositório, ex.:
+#   python -m benchmarks.bench_tracker
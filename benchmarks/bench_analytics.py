@@ -0,0 +1,63 @@
+# benchmarks/bench_analytics.py
+"""
+Compara analytics.compute_stats (NumPy, todos os hábitos de uma vez) com o
+cálculo hábito por hábito em Python puro.
+
+Uso: python -m benchmarks.bench_analytics [N_HABITOS] [ANOS]
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+from completion_store import ArrayCompletionStore
+from habit_logic import Habit, HabitTracker
+from analytics import compute_stats
+
+TODAY = date(2025, 6, 9)
+WINDOW_DAYS = 30
+
+
+def build_tracker(n_habits: int, years: int, seed: int = 0) -> HabitTracker:
+    rng = random.Random(seed)
+    tracker = HabitTracker(store=ArrayCompletionStore)
+    last = TODAY.toordinal()
+    days = range(last - 365 * years + 1, last + 1)
+    for i in range(n_habits):
+        density = rng.uniform(0.2, 0.95)
+        ordinals = [o for o in days if rng.random() < density]
+        tracker.insert_habit(Habit.from_ordinals(f"habito-{i}", ordinals, ArrayCompletionStore))
+    return tracker
+
+
+def per_habit_loop(tracker: HabitTracker):
+    """O que um painel faria sem a API em lote."""
+    rows = []
+    for habit in tracker:
+        weekdays = [0] * 7
+        for day in habit.completions:
+            if day <= TODAY:
+                weekdays[day.weekday()] += 1
+        window = sum(TODAY - timedelta(days=k) in habit.completions for k in range(WINDOW_DAYS))
+        rows.append((habit.current_streak(TODAY), habit.longest_streak(), window / WINDOW_DAYS, weekdays))
+    return rows
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(argv: list[str]):
+    n_habits = int(argv[0]) if argv else 1_000
+    years = int(argv[1]) if len(argv) > 1 else 5
+    tracker = build_tracker(n_habits, years)
+    vectorized = min(timed(lambda: compute_stats(tracker, TODAY, WINDOW_DAYS)) for _ in range(3))
+    looped = timed(lambda: per_habit_loop(tracker))
+    print(f"{n_habits} hábitos x {years} anos")
+    print(f"compute_stats (NumPy): {vectorized * 1000:>9.1f} ms")
+    print(f"loop por hábito:       {looped * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,147 @@
+# benchmarks/bench_http_api.py
+"""
+Teste de carga da API HTTP (http_api.py): vários clientes, cada um com uma
+conexão persistente, fazem requisições durante alguns segundos; o resultado é
+a vazão (requisições/s) e as latências p50/p99 por tipo de carga.
+
+Sem --url, sobe uma instância local num processo separado, com dados
+temporários. As cargas medidas são: marcar/desmarcar dias, consultar streaks
+e lotes de BATCH_SIZE marcações por requisição.
+
+Uso: python -m benchmarks.bench_http_api [--url http://127.0.0.1:8551]
+                                         [--clients 8] [--seconds 3] [--habits 50]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BATCH_SIZE = 50
+TODAY = date.today()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_instance(directory: str) -> tuple[subprocess.Popen, str, int]:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "http_api", "--port", str(port), "--data", os.path.join(directory, "habits.json")],
+        cwd=ROOT, stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, "127.0.0.1", port
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                raise RuntimeError("A instância local da API não iniciou.")
+            time.sleep(0.05)
+
+
+def call(conn: http.client.HTTPConnection, method: str, path: str, body=None):
+    data = None if body is None else json.dumps(body)
+    conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    payload = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{method} {path}: {response.status} {payload[:200]!r}")
+
+
+def request_factory(workload: str, habits: list[str], rng: random.Random):
+    def random_day() -> str:
+        return (TODAY - timedelta(days=rng.randrange(365))).isoformat()
+
+    if workload == "marcar":
+        return lambda: ("PUT" if rng.random() < 0.6 else "DELETE",
+                        f"/habits/{quote(rng.choice(habits))}/days/{random_day()}", None)
+    if workload == "streak":
+        return lambda: ("GET", f"/habits/{quote(rng.choice(habits))}/streak", None)
+    if workload == "lote":
+        return lambda: ("POST", "/batch", [
+            {"op": "mark", "habit": rng.choice(habits), "date": random_day()} for _ in range(BATCH_SIZE)])
+    raise ValueError(workload)
+
+
+def run_workload(host: str, port: int, workload: str, habits: list[str], clients: int, seconds: float):
+    latencies: list[list[float]] = [[] for _ in range(clients)]
+    stop_at = time.perf_counter() + seconds
+
+    def client(index: int):
+        rng = random.Random(index)
+        next_request = request_factory(workload, habits, rng)
+        conn = http.client.HTTPConnection(host, port)
+        own = latencies[index]
+        while time.perf_counter() < stop_at:
+            method, path, body = next_request()
+            start = time.perf_counter()
+            call(conn, method, path, body)
+            own.append(time.perf_counter() - start)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    samples = sorted(latency for own in latencies for latency in own)
+    return len(samples) / elapsed, percentile(samples, 0.50), percentile(samples, 0.99)
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return float("nan")
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def main(argv: list[str]):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_http_api")
+    parser.add_argument("--url", help="instância já em execução (padrão: sobe uma local)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--habits", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        process = None
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            process, host, port = start_local_instance(directory)
+        try:
+            habits = [f"bench-{i}" for i in range(args.habits)]
+            conn = http.client.HTTPConnection(host, port)
+            call(conn, "POST", "/batch", [{"op": "add", "habit": name} for name in habits])
+            conn.close()
+
+            print(f"{args.clients} clientes, {args.seconds:g} s por carga, {args.habits} hábitos")
+            for workload in ("marcar", "streak", "lote"):
+                rps, p50, p99 = run_workload(host, port, workload, habits, args.clients, args.seconds)
+                unit = f" ({rps * BATCH_SIZE:,.0f} marcações/s)" if workload == "lote" else ""
+                print(f"{workload:<7} {rps:9,.0f} req/s   p50 {p50 * 1000:6.2f} ms   "
+                      f"p99 {p99 * 1000:6.2f} ms{unit}")
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
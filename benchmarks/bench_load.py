@@ -0,0 +1,60 @@
+# benchmarks/bench_load.py
+"""
+Tempo de inicialização (load_data) com carga completa e com carga preguiçosa
+(janela de dias recentes), para o backend JSON e para o SQLite.
+
+Uso: python -m benchmarks.bench_load [N_HABITOS] [ANOS] [JANELA_DIAS]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from persistence import JsonBackend
+from habit_logic import HabitTracker
+from sqlite_storage import SqliteBackend
+
+TODAY = date.today()
+
+
+def build_tracker(n_habits: int, years: int) -> HabitTracker:
+    tracker = HabitTracker()
+    for i in range(n_habits):
+        name = f"habito-{i}"
+        tracker.add_habit(name)
+        for offset in range(0, 365 * years):
+            if (offset * 7 + i) % 10 < 7:  # ~70% dos dias
+                tracker.mark_complete(name, TODAY - timedelta(days=offset))
+    return tracker
+
+
+def best_of(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str]):
+    n_habits = int(argv[0]) if argv else 200
+    years = int(argv[1]) if len(argv) > 1 else 5
+    window = int(argv[2]) if len(argv) > 2 else 90
+    tracker = build_tracker(n_habits, years)
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {
+            "JSON": JsonBackend(os.path.join(directory, "habits_data.json")),
+            "SQLite": SqliteBackend(os.path.join(directory, "habits.db")),
+        }
+        print(f"{n_habits} hábitos x {years} anos, janela de {window} dias")
+        for label, backend in backends.items():
+            backend.save(tracker)
+            eager = best_of(lambda: backend.load())
+            lazy = best_of(lambda: backend.load(window_days=window))
+            print(f"{label:<7} completa {eager * 1000:8.1f} ms   preguiçosa {lazy * 1000:8.1f} ms")
+        backends["SQLite"].close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,53 @@
+# benchmarks/bench_memory.py
+"""
+Compara o consumo de memória das representações de conclusões com 1M de conclusões:
+o set[date] original, o Habit com SetCompletionStore e o Habit com ArrayCompletionStore
+(os dois últimos incluem os segmentos de streak).
+
+Uso: python -m benchmarks.bench_memory [N_CONCLUSOES]
+"""
+import random
+import sys
+import tracemalloc
+from datetime import date
+from completion_store import ArrayCompletionStore, SetCompletionStore
+from habit_logic import Habit
+
+DEFAULT_COMPLETIONS = 1_000_000
+DENSITY = 0.7  # fração de dias concluídos dentro do período
+
+
+def synthetic_ordinals(n: int, seed: int = 0) -> list[int]:
+    """n ordinais distintos e ordenados, espalhados com a densidade configurada."""
+    rng = random.Random(seed)
+    span = int(n / DENSITY)
+    return sorted(rng.sample(range(1, span + 1), n))
+
+
+def measure(build) -> int:
+    """Bytes alocados (e ainda vivos) pela estrutura retornada por 'build'."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def main(argv: list[str]):
+    n = int(argv[0]) if argv else DEFAULT_COMPLETIONS
+    ordinals = synthetic_ordinals(n)
+    cases = {
+        "set[date] (original)": lambda: {date.fromordinal(o) for o in ordinals},
+        "Habit + SetCompletionStore": lambda: Habit.from_ordinals("h", ordinals, SetCompletionStore),
+        "Habit + ArrayCompletionStore": lambda: Habit.from_ordinals("h", ordinals, ArrayCompletionStore),
+    }
+    print(f"{n:,} conclusões, densidade {DENSITY:.0%}")
+    for label, build in cases.items():
+        size = measure(build)
+        print(f"{label:<30} {size / 2**20:>8.1f} MiB  {size / n:>6.1f} bytes/conclusão")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
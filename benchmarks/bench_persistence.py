@@ -0,0 +1,76 @@
+# benchmarks/bench_persistence.py
+"""
+Latência de save_data (snapshot atômico) e de uma linha do diário sob cada
+política de fsync: "always", "batch" e "never".
+
+Uso: python -m benchmarks.bench_persistence [N_HABITOS] [DIAS] [REPETICOES]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+import persistence
+from habit_logic import HabitTracker
+
+TODAY = date(2025, 6, 9)
+POLICIES = (persistence.FSYNC_ALWAYS, persistence.FSYNC_BATCH, persistence.FSYNC_NEVER)
+
+
+def build_tracker(n_habits: int, days: int) -> HabitTracker:
+    tracker = HabitTracker()
+    for i in range(n_habits):
+        name = f"habito-{i}"
+        tracker.add_habit(name)
+        for offset in range(0, days, 2):
+            tracker.mark_complete(name, TODAY - timedelta(days=offset))
+    return tracker
+
+
+def summarize(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return (f"média {statistics.mean(samples) * 1e3:8.3f} ms  "
+            f"p50 {samples[len(samples) // 2] * 1e3:8.3f} ms  p99 {p99 * 1e3:8.3f} ms")
+
+
+def bench_policy(policy: str, tracker: HabitTracker, repeat: int) -> tuple[list[float], list[float]]:
+    persistence.set_fsync_policy(policy)
+    saves = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        persistence.save_data(tracker)
+        saves.append(time.perf_counter() - start)
+
+    journal = persistence.Journal(tracker, compact_every=10**9)
+    appends = []
+    for offset in range(repeat):
+        day = TODAY + timedelta(days=offset + 1)
+        start = time.perf_counter()
+        tracker.mark_complete("habito-0", day)
+        appends.append(time.perf_counter() - start)
+    for offset in range(repeat):
+        tracker.mark_incomplete("habito-0", TODAY + timedelta(days=offset + 1))
+    journal.close()
+    return saves, appends
+
+
+def main(argv: list[str]):
+    n_habits = int(argv[0]) if argv else 50
+    days = int(argv[1]) if len(argv) > 1 else 365
+    repeat = int(argv[2]) if len(argv) > 2 else 200
+    tracker = build_tracker(n_habits, days)
+    with tempfile.TemporaryDirectory() as directory:
+        persistence.DATA_FILE = os.path.join(directory, "habits_data.json")
+        for policy in POLICIES:
+            saves, appends = bench_policy(policy, tracker, repeat)
+            print(f"[{policy}]")
+            print(f"  save_data       {summarize(saves)}")
+            print(f"  linha do diário {summarize(appends)}")
+        size = os.path.getsize(persistence.DATA_FILE)
+    print(f"{n_habits} hábitos x {days} dias, snapshot de {size / 1024:.0f} KiB, {repeat} repetições")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
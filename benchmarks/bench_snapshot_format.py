@@ -0,0 +1,73 @@
+# benchmarks/bench_snapshot_format.py
+"""
+Tamanho do arquivo e tempo de save/load do snapshot em JSON e no formato
+binário (binary_format), com e sem zlib, para um histórico longo.
+
+Uso: python -m benchmarks.bench_snapshot_format [N_HABITOS] [ANOS] [JANELA_DIAS]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+import persistence
+from habit_logic import Habit, HabitTracker
+from persistence import JsonBackend
+
+TODAY = date.today()
+VARIANTS = (
+    ("JSON", persistence.FORMAT_JSON, True),
+    ("binário", persistence.FORMAT_BINARY, False),
+    ("binário+zlib", persistence.FORMAT_BINARY, True),
+)
+
+
+def build_tracker(n_habits: int, years: int, seed: int = 42) -> HabitTracker:
+    """Hábitos com sequências realistas: dias feitos tendem a vir em blocos."""
+    rng = random.Random(seed)
+    tracker = HabitTracker()
+    first = TODAY.toordinal() - 365 * years + 1
+    for i in range(n_habits):
+        ordinals, done = [], False
+        for ordinal in range(first, TODAY.toordinal() + 1):
+            done = rng.random() < (0.85 if done else 0.35)
+            if done:
+                ordinals.append(ordinal)
+        tracker.insert_habit(Habit.from_ordinals(f"habito-{i}", ordinals))
+    return tracker
+
+
+def best_of(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str]):
+    n_habits = int(argv[0]) if argv else 1000
+    years = int(argv[1]) if len(argv) > 1 else 5
+    window = int(argv[2]) if len(argv) > 2 else 90
+    tracker = build_tracker(n_habits, years)
+    completions = sum(len(o) for _, o in tracker.snapshot())
+    persistence.set_fsync_policy(persistence.FSYNC_NEVER)
+    print(f"{n_habits} hábitos x {years} anos, {completions} conclusões, janela de {window} dias")
+    print(f"{'formato':<14}{'tamanho':>12}{'save':>12}{'load':>12}{'load janela':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, snapshot_format, compress in VARIANTS:
+            persistence.set_snapshot_format(snapshot_format, compress=compress)
+            backend = JsonBackend(os.path.join(directory, f"habits_{label}.dat"))
+            save = best_of(lambda: backend.save(tracker))
+            size = os.path.getsize(backend.path)
+            load = best_of(lambda: backend.load())
+            lazy = best_of(lambda: backend.load(window_days=window))
+            print(f"{label:<14}{size / 1024:>9.0f} KiB{save * 1e3:>9.0f} ms"
+                  f"{load * 1e3:>9.0f} ms{lazy * 1e3:>11.0f} ms")
+    persistence.set_snapshot_format(persistence.FORMAT_JSON, compress=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
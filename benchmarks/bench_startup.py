@@ -0,0 +1,51 @@
+# benchmarks/bench_startup.py
+"""
+Tempo de inicialização da CLI (cli.py) comparado ao caminho de import da
+interface (main_gui, que carrega o Flet). Cada medida é um processo Python
+novo, como numa chamada feita por cron ou por um script.
+
+Uso: python -m benchmarks.bench_startup [REPETICOES]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def best_of(args: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: list[str]):
+    repeat = int(argv[0]) if argv else 10
+    with tempfile.TemporaryDirectory() as directory:
+        data = os.path.join(directory, "habits.json")
+        subprocess.run([sys.executable, "cli.py", "--data", data, "add", "Ler"],
+                       cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        cases = {
+            "python vazio": ["-c", "pass"],
+            "import cli": ["-c", "import cli"],
+            "cli.py mark": ["cli.py", "--data", data, "mark", "Ler"],
+            "cli.py stats": ["cli.py", "--data", data, "stats"],
+            "import main_gui": ["-c", "import main_gui"],
+        }
+        print(f"melhor de {repeat} processos")
+        for label, args in cases.items():
+            try:
+                elapsed = best_of(args, repeat)
+            except subprocess.CalledProcessError:
+                print(f"{label:<16} indisponível")
+                continue
+            print(f"{label:<16} {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
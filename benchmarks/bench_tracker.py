@@ -0,0 +1,64 @@
+# benchmarks/bench_tracker.py
+"""
+Mede o custo por operação do HabitTracker à medida que o número de hábitos cresce.
+
+Com o índice por nome, get_habit, add_habit (checagem de duplicata),
+mark_complete, mark_incomplete, is_complete_today e delete_habit devem ter
+custo aproximadamente constante, independente de N.
+
+Uso: python -m benchmarks.bench_tracker [N ...]
+"""
+import sys
+import timeit
+from datetime import date
+from habit_logic import HabitTracker
+
+DAY = date(2025, 6, 9)
+DEFAULT_SIZES = (100, 1_000, 10_000, 100_000)
+REPEAT = 5
+NUMBER = 2_000
+
+
+def build_tracker(n: int) -> HabitTracker:
+    tracker = HabitTracker()
+    for i in range(n):
+        tracker.add_habit(f"habito-{i}")
+    return tracker
+
+
+def per_op_ns(stmt, number: int = NUMBER) -> float:
+    """Retorna o melhor tempo por chamada, em nanossegundos."""
+    best = min(timeit.repeat(stmt, number=number, repeat=REPEAT))
+    return best / number * 1e9
+
+
+def bench(n: int) -> dict[str, float]:
+    tracker = build_tracker(n)
+    # Um nome do fim da lista é o pior caso de uma busca linear.
+    target = f"habito-{n - 1}"
+
+    def toggle_then_delete():
+        tracker.delete_habit(target)
+        tracker.add_habit(target)
+
+    return {
+        "get_habit": per_op_ns(lambda: tracker.get_habit(target)),
+        "add_habit (duplicado)": per_op_ns(lambda: tracker.add_habit(target)),
+        "mark_complete": per_op_ns(lambda: tracker.mark_complete(target, DAY)),
+        "is_complete_today": per_op_ns(lambda: tracker.is_complete_today(target, DAY)),
+        "mark_incomplete": per_op_ns(lambda: tracker.mark_incomplete(target, DAY)),
+        "delete+add": per_op_ns(toggle_then_delete),
+    }
+
+
+def main(argv: list[str]):
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    results = {n: bench(n) for n in sizes}
+    ops = list(next(iter(results.values())))
+    print(f"{'operação':<24}" + "".join(f"{'N=' + str(n):>14}" for n in sizes))
+    for op in ops:
+        print(f"{op:<24}" + "".join(f"{results[n][op]:>11.0f} ns" for n in sizes))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
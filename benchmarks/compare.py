@@ -0,0 +1,75 @@
+# benchmarks/compare.py
+"""
+Compara dois arquivos de resultados de benchmarks.run_all (ex.: o commit base
+e o atual), caso a caso, pela mediana do tempo por chamada.
+
+Uma razão novo/base acima de 1 + threshold é uma regressão; abaixo de
+1 - threshold, uma melhora. O código de saída é 1 se houver regressões, para
+uso em CI.
+
+Uso: python -m benchmarks.compare base.json novo.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+from benchmarks.run_all import format_time
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def load_results(path: str) -> tuple[dict, dict[str, dict]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("meta", {}), data["results"]
+
+
+def compare(base: dict[str, dict], new: dict[str, dict], threshold: float = DEFAULT_THRESHOLD):
+    """Linhas (caso, mediana base, mediana nova, razão, veredito) dos casos presentes nos dois."""
+    rows = []
+    for key in sorted(base.keys() & new.keys()):
+        before, after = base[key]["median"], new[key]["median"]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            verdict = "regressão"
+        elif ratio < 1 - threshold:
+            verdict = "melhora"
+        else:
+            verdict = ""
+        rows.append((key, before, after, ratio, verdict))
+    return rows
+
+
+def _describe(meta: dict) -> str:
+    commit = (meta.get("commit") or "?") + ("+alterações" if meta.get("dirty") else "")
+    return f"{commit} (Python {meta.get('python', '?')}, {meta.get('timestamp', '?')})"
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="variação relativa tolerada (padrão: 0.10)")
+    args = parser.parse_args(argv)
+
+    base_meta, base = load_results(args.base)
+    new_meta, new = load_results(args.new)
+    print(f"base: {_describe(base_meta)}")
+    print(f"novo: {_describe(new_meta)}")
+    if base_meta.get("machine") != new_meta.get("machine") or base_meta.get("python") != new_meta.get("python"):
+        print("Aviso: resultados de máquinas ou versões do Python diferentes.")
+
+    rows = compare(base, new, args.threshold)
+    width = max((len(row[0]) for row in rows), default=4)
+    for key, before, after, ratio, verdict in rows:
+        print(f"{key:<{width}}  {format_time(before):>10}  {format_time(after):>10}  {ratio:6.2f}x  {verdict}")
+    only = sorted(base.keys() ^ new.keys())
+    if only:
+        print(f"Casos presentes em só um dos arquivos: {', '.join(only)}")
+    regressions = sum(1 for row in rows if row[4] == "regressão")
+    print(f"{len(rows)} casos comparados, {regressions} regressões")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,69 @@
+# benchmarks/datagen.py
+"""
+Geradores de dados sintéticos para os benchmarks: N hábitos × M anos, com
+densidade (fração de dias concluídos) e tamanho médio das sequências
+configuráveis. A geração é determinística (semente fixa e data final fixa),
+então o mesmo conjunto de dados é medido em commits diferentes.
+
+As conclusões seguem uma cadeia de Markov de dois estados (concluído / não
+concluído): uma sequência continua com probabilidade 1 - 1/mean_run, e uma nova
+começa com a probabilidade que leva à densidade pedida. Isso dá sequências de
+tamanhos variados, como num histórico real, em vez de dias sorteados um a um.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date
+from habit_logic import Habit, HabitTracker
+from completion_store import CompletionStore
+
+END_DATE = date(2025, 6, 9)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """Parâmetros de um conjunto de dados sintético."""
+    name: str
+    n_habits: int
+    years: int
+    density: float  # fração dos dias concluídos (0 a 1)
+    mean_run: float = 7.0  # tamanho médio das sequências, em dias
+    seed: int = 0
+
+
+DATASETS = {
+    "small": Dataset("small", n_habits=100, years=1, density=0.7),
+    "sparse": Dataset("sparse", n_habits=500, years=5, density=0.2, mean_run=2.0),
+    "dense": Dataset("dense", n_habits=500, years=5, density=0.9, mean_run=30.0),
+    "large": Dataset("large", n_habits=1000, years=5, density=0.7),
+}
+
+
+def completion_ordinals(rng: random.Random, first: int, last: int, density: float, mean_run: float) -> list[int]:
+    """Ordinais concluídos entre 'first' e 'last' (inclusive), em ordem."""
+    if density <= 0:
+        return []
+    if density >= 1:
+        return list(range(first, last + 1))
+    p_continue = 1 - 1 / max(mean_run, 1.0)
+    # Lacuna média = mean_run * (1 - density) / density dias.
+    p_start = min(density / (max(mean_run, 1.0) * (1 - density)), 1.0)
+    ordinals = []
+    done = rng.random() < density
+    for ordinal in range(first, last + 1):
+        done = rng.random() < (p_continue if done else p_start)
+        if done:
+            ordinals.append(ordinal)
+    return ordinals
+
+
+def generate_tracker(dataset: Dataset, store: type[CompletionStore] = None,
+                     end: date = END_DATE) -> HabitTracker:
+    """Tracker com os hábitos de 'dataset', terminando em 'end'."""
+    rng = random.Random(dataset.seed)
+    last = end.toordinal()
+    first = last - 365 * dataset.years + 1
+    tracker = HabitTracker(store=store)
+    for i in range(dataset.n_habits):
+        ordinals = completion_ordinals(rng, first, last, dataset.density, dataset.mean_run)
+        tracker.insert_habit(Habit.from_ordinals(f"habito-{i:05d}", ordinals, store=store))
+    return tracker
@@ -0,0 +1,392 @@
+# benchmarks/run_all.py
+"""
+Suíte de benchmarks: streaks, consultas, alterações, gravação/carga e montagem
+da lista da interface, sobre os conjuntos de dados de benchmarks.datagen.
+
+Os resultados vão para um arquivo JSON (um por execução, com o commit, a
+versão do Python e a máquina), para serem comparados entre commits com
+benchmarks.compare. Cada caso é medido como no timeit: o número de chamadas
+por repetição é calibrado para durar pelo menos MIN_TIME segundos, e são
+guardados o melhor tempo e a mediana das repetições, por chamada.
+
+Uso: python -m benchmarks.run_all [--profile quick|full] [--datasets small,large]
+                                  [--cases streak,persistence] [--output arquivo.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import timedelta
+import persistence
+from benchmarks.datagen import DATASETS, END_DATE, Dataset, generate_tracker
+from habit_logic import Habit, HabitTracker, Schedule
+from sharded_storage import ShardedBackend
+from sqlite_storage import SqliteBackend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+PROFILES = {
+    "quick": ["small"],
+    "full": ["small", "sparse", "dense", "large"],
+}
+MIN_TIME = 0.2  # segundos por repetição
+REPEAT = 5
+SAMPLE_SIZE = 1000  # consultas por chamada nos casos de consulta
+WINDOW_DAYS = 90
+
+# Um caso recebe o tracker do conjunto de dados e um diretório temporário e
+# retorna a função medida (sem argumentos); o preparo não entra na medida.
+Case = Callable[[HabitTracker, str], Callable[[], object]]
+CASES: dict[str, Case] = {}
+
+
+def case(name: str):
+    def register(factory: Case) -> Case:
+        CASES[name] = factory
+        return factory
+    return register
+
+
+def _sample_names(tracker: HabitTracker, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    names = [habit.name for habit in tracker]
+    return [rng.choice(names) for _ in range(SAMPLE_SIZE)]
+
+
+def _sample_days(seed: int = 2, days: int = 365):
+    rng = random.Random(seed)
+    return [END_DATE - timedelta(days=rng.randrange(days)) for _ in range(SAMPLE_SIZE)]
+
+
+# --- Streaks ---
+
+@case("streak.current")
+def _streak_current(tracker, directory):
+    names = _sample_names(tracker)
+    return lambda: [tracker.get_current_streak(name, END_DATE) for name in names]
+
+
+@case("streak.current_past_days")
+def _streak_current_past_days(tracker, directory):
+    pairs = list(zip(_sample_names(tracker), _sample_days()))
+    return lambda: [tracker.get_current_streak(name, day) for name, day in pairs]
+
+
+@case("streak.longest_cold")
+def _streak_longest_cold(tracker, directory):
+    habits = list(tracker)[:SAMPLE_SIZE]
+
+    def run():
+        for habit in habits:
+            habit._longest = None  # descarta o cache para medir o cálculo
+            habit.longest_streak()
+    return run
+
+
+@case("streak.history")
+def _streak_history(tracker, directory):
+    habits = list(tracker)[:100]
+    return lambda: [habit.streak_history() for habit in habits]
+
+
+def _scheduled_habits(tracker, count: int = 100) -> list:
+    # Cópias com agenda, para não alterar o tracker compartilhado pelos outros casos.
+    schedules = [Schedule.from_days([0, 2, 4]), Schedule(per_week=3)]
+    habits = []
+    for i, habit in enumerate(list(tracker)[:count]):
+        copy = Habit.from_segments(habit.name, *habit.snapshot_segments())
+        copy.set_schedule(schedules[i % len(schedules)])
+        habits.append(copy)
+    return habits
+
+
+@case("streak.scheduled_current")
+def _streak_scheduled_current(tracker, directory):
+    habits = _scheduled_habits(tracker)
+    pairs = [(habits[i % len(habits)], day) for i, day in enumerate(_sample_days())]
+    return lambda: [habit.current_streak(day) for habit, day in pairs]
+
+
+@case("streak.scheduled_cold")
+def _streak_scheduled_cold(tracker, directory):
+    habits = _scheduled_habits(tracker)
+
+    def run():
+        for habit in habits:
+            habit._period_runs = habit._longest = None  # descarta os períodos pré-calculados
+            habit.current_streak(END_DATE)
+            habit.longest_streak()
+    return run
+
+
+@case("streak.adherence")
+def _streak_adherence(tracker, directory):
+    habits = _scheduled_habits(tracker)
+    start = END_DATE - timedelta(days=365)
+    return lambda: [habit.adherence(start, END_DATE) for habit in habits]
+
+
+# --- Consultas ---
+
+@case("lookup.get_habit")
+def _lookup_get_habit(tracker, directory):
+    names = _sample_names(tracker)
+    return lambda: [tracker.get_habit(name) for name in names]
+
+
+@case("lookup.is_complete")
+def _lookup_is_complete(tracker, directory):
+    pairs = list(zip(_sample_names(tracker), _sample_days()))
+    return lambda: [tracker.is_complete_today(name, day) for name, day in pairs]
+
+
+@case("lookup.find_by_prefix")
+def _lookup_find_by_prefix(tracker, directory):
+    prefixes = ["", "habito-0", "habito-00", "habito-001", "x"]
+    return lambda: [tracker.find_by_prefix(prefix, 0, 50) for prefix in prefixes]
+
+
+# --- Histórico ---
+
+@case("history.year_all")
+def _history_year_all(tracker, directory):
+    import heatmap
+    start, end = heatmap.view_range(heatmap.VIEW_YEAR, END_DATE)
+    return lambda: heatmap.build(tracker, start, end)
+
+
+@case("history.counts_by_month")
+def _history_counts_by_month(tracker, directory):
+    habits = list(tracker)[:100]
+    start = END_DATE - timedelta(days=365)
+    return lambda: [habit.counts_by_period(start, END_DATE, "month") for habit in habits]
+
+
+# --- Alterações ---
+
+@case("mutate.toggle")
+def _mutate_toggle(tracker, directory):
+    # Um dia depois do fim dos dados: marcar e desmarcar deixa o tracker como estava.
+    names, day = _sample_names(tracker), END_DATE + timedelta(days=1)
+
+    def run():
+        for name in names:
+            tracker.mark_complete(name, day)
+            tracker.mark_incomplete(name, day)
+    return run
+
+
+@case("mutate.mark_range")
+def _mutate_mark_range(tracker, directory):
+    name = next(iter(tracker)).name
+    start, end = END_DATE + timedelta(days=1), END_DATE + timedelta(days=365)
+
+    def run():
+        tracker.mark_range(name, start, end)
+        tracker.mark_range(name, start, end, done=False)
+    return run
+
+
+# --- Gravação e carga ---
+
+def _json_backend(tracker, directory, snapshot_format) -> persistence.JsonBackend:
+    backend = persistence.JsonBackend(os.path.join(directory, f"habits.{snapshot_format}"), snapshot_format)
+    backend.save(tracker)
+    return backend
+
+
+for _format in (persistence.FORMAT_JSON, persistence.FORMAT_BINARY):
+    @case(f"persistence.save_{_format}")
+    def _save(tracker, directory, snapshot_format=_format):
+        backend = _json_backend(tracker, directory, snapshot_format)
+        return lambda: backend.save(tracker)
+
+    @case(f"persistence.load_{_format}")
+    def _load(tracker, directory, snapshot_format=_format):
+        backend = _json_backend(tracker, directory, snapshot_format)
+        return lambda: backend.load()
+
+    @case(f"persistence.load_{_format}_window")
+    def _load_window(tracker, directory, snapshot_format=_format):
+        backend = _json_backend(tracker, directory, snapshot_format)
+        return lambda: backend.load(window_days=WINDOW_DAYS, today=END_DATE)
+
+
+@case("persistence.save_sharded_one_dirty")
+def _save_sharded_one_dirty(tracker, directory):
+    backend = ShardedBackend(os.path.join(directory, "sharded"))
+    backend.save(tracker)
+    name, day = next(iter(tracker)).name, END_DATE + timedelta(days=1)
+
+    def run():
+        # Uma alteração que se desfaz: o hábito muda de revisão e só o shard dele é regravado.
+        tracker.mark_complete(name, day)
+        tracker.mark_incomplete(name, day)
+        backend.save(tracker)
+    return run
+
+
+@case("persistence.load_sharded")
+def _load_sharded(tracker, directory):
+    backend = ShardedBackend(os.path.join(directory, "sharded"))
+    backend.save(tracker)
+    return lambda: backend.load()
+
+
+@case("persistence.load_sqlite")
+def _load_sqlite(tracker, directory):
+    backend = SqliteBackend(os.path.join(directory, "habits.db"))
+    backend.save(tracker)
+    return lambda: backend.load()
+
+
+# --- Interface ---
+
+@case("render.first_page")
+def _render_first_page(tracker, directory):
+    import flet as ft
+    from main_gui import HabitListView
+
+    def run():
+        view = HabitListView(ft.ListView(), tracker, on_change=lambda: None)
+        view.render(END_DATE)
+        view.close()
+    return run
+
+
+@case("render.change_date")
+def _render_change_date(tracker, directory):
+    import flet as ft
+    from main_gui import HabitListView
+    view = HabitListView(ft.ListView(), tracker, on_change=lambda: None)
+    days = [END_DATE - timedelta(days=i) for i in range(2)]
+    view.render(days[0])
+
+    def run():
+        for day in days:
+            view.render(day)
+    return run
+
+
+@case("render.scrub_week_cached")
+def _render_scrub_week_cached(tracker, directory):
+    import flet as ft
+    from main_gui import HabitListView
+    from view_cache import DayViewCache
+    view = HabitListView(ft.ListView(), tracker, on_change=lambda: None, view_cache=DayViewCache(tracker))
+    days = [END_DATE - timedelta(days=i) for i in range(7)]
+
+    def run():
+        # Volta uma semana e retorna: depois da primeira passada, tudo vem do cache.
+        for day in days + days[::-1]:
+            view.render(day)
+    return run
+
+
+def measure(func: Callable[[], object], min_time: float = MIN_TIME, repeat: int = REPEAT) -> dict:
+    """Tempo por chamada de 'func' (melhor e mediana de 'repeat' repetições), em segundos."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)) + 1)
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {"best": min(timings), "median": statistics.median(timings), "number": number, "repeat": repeat}
+
+
+def run_dataset(dataset: Dataset, case_names: list[str], min_time: float, repeat: int) -> dict[str, dict]:
+    results = {}
+    tracker = generate_tracker(dataset)
+    with tempfile.TemporaryDirectory() as directory:
+        for name in case_names:
+            try:
+                func = CASES[name](tracker, directory)
+            except ImportError as error:
+                print(f"  {name:<32} ignorado ({error.name} indisponível)")
+                continue
+            result = measure(func, min_time, repeat)
+            results[f"{dataset.name}/{name}"] = result
+            print(f"  {name:<32} {format_time(result['median']):>10}  (melhor {format_time(result['best'])})")
+    return results
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def metadata(profile: str) -> dict:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.platform(),
+        "profile": profile,
+    }
+
+
+def main(argv: list[str]):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run_all")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--datasets", help=f"conjuntos separados por vírgula ({', '.join(DATASETS)})")
+    parser.add_argument("--cases", help="prefixos dos casos separados por vírgula (ex.: streak,lookup)")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="segundos por repetição")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--output", help=f"arquivo de resultados (padrão: {os.path.relpath(RESULTS_DIR, ROOT)}/...)")
+    args = parser.parse_args(argv)
+
+    dataset_names = args.datasets.split(",") if args.datasets else PROFILES[args.profile]
+    unknown = [name for name in dataset_names if name not in DATASETS]
+    if unknown:
+        parser.error(f"conjuntos desconhecidos: {', '.join(unknown)}")
+    prefixes = tuple(args.cases.split(",")) if args.cases else ("",)
+    case_names = [name for name in CASES if name.startswith(prefixes)]
+
+    # A medida de gravação não deve depender do disco: o fsync fica de fora.
+    persistence.set_fsync_policy(persistence.FSYNC_NEVER)
+    meta = metadata(args.profile)
+    results = {}
+    for name in dataset_names:
+        dataset = DATASETS[name]
+        print(f"{name}: {dataset.n_habits} hábitos x {dataset.years} anos, densidade {dataset.density:g}")
+        results.update(run_dataset(dataset, case_names, args.min_time, args.repeat))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{meta['commit'] or 'sem-commit'}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"Resultados em {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,159 @@
+# binary_format.py
+"""
+Formato binário compacto para o snapshot dos hábitos.
+
+Em vez de uma string ISO por conclusão, cada hábito guarda suas sequências de
+dias consecutivos (os mesmos segmentos do Habit), com codificação delta: o
+primeiro dia absoluto e, para cada sequência, a distância até o fim da
+anterior e o seu comprimento. Os números vão em arrays de largura fixa (uint16
+quando cabem, o que é o caso normal), então codificar e decodificar são cópias
+de memória, sem conversão de texto. Opcionalmente o corpo é comprimido com zlib.
+
+Layout (little-endian):
+    MAGIC  versão:u8  flags:u8  corpo (comprimido se flags & FLAG_ZLIB)
+    corpo: n_hábitos:u32, e para cada hábito:
+        tamanho do nome:u16, nome (UTF-8), n_sequências:u32, primeiro dia:u32,
+        tipo:u8 ('H' ou 'I'), 2 * n_sequências valores [gap, comprimento - 1, ...]
+    e, se flags & FLAG_SCHEDULES, as agendas dos hábitos que não são diários:
+        n_agendas:u32, e para cada uma: posição do hábito:u32, dias da semana:u8,
+        meta semanal:u8 (0 = sem meta)
+"""
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate, chain
+
+MAGIC = b"HTRK"
+VERSION = 1
+FLAG_ZLIB = 1
+FLAG_SCHEDULES = 2
+
+_HEADER = struct.Struct("<4sBB")
+_COUNT = struct.Struct("<I")
+_NAME_SIZE = struct.Struct("<H")
+_HABIT = struct.Struct("<IIB")
+_SCHEDULE = struct.Struct("<IBB")
+
+# Agenda de um hábito: (máscara dos dias da semana, meta semanal ou None).
+ScheduleFields = tuple[int, int | None]
+
+
+class FormatError(ValueError):
+    """Os bytes não são um snapshot binário válido."""
+
+
+def is_binary(data: bytes) -> bool:
+    """True se 'data' começa com o cabeçalho do formato binário."""
+    return data[:len(MAGIC)] == MAGIC
+
+
+def _pack_values(values: list[int]) -> tuple[str, bytes]:
+    typecode = "H" if max(values, default=0) <= 0xFFFF else "I"
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return typecode, packed.tobytes()
+
+
+def encode(habits, compress: bool = True, schedules: dict[str, ScheduleFields] | None = None) -> bytes:
+    """
+    Codifica [(nome, inícios, fins), ...], onde inícios/fins são os ordinais
+    (inclusivos e em ordem) das sequências de cada hábito, e as agendas dos
+    hábitos em 'schedules' (por nome). Sem agendas, o resultado é idêntico ao
+    das versões que não as conheciam (que, de todo modo, as ignoram).
+    """
+    schedules = schedules or {}
+    positions = []
+    parts = [b""]  # contagem de hábitos, preenchida no fim
+    count = 0
+    for name, starts, ends in habits:
+        if name in schedules:
+            positions.append((count, *schedules[name]))
+        encoded_name = name.encode("utf-8")
+        values = []
+        previous_end = starts[0] if starts else 0
+        for start, end in zip(starts, ends):
+            values.append(start - previous_end)
+            values.append(end - start)
+            previous_end = end
+        typecode, packed = _pack_values(values)
+        parts.append(_NAME_SIZE.pack(len(encoded_name)))
+        parts.append(encoded_name)
+        parts.append(_HABIT.pack(len(starts), starts[0] if starts else 0, ord(typecode)))
+        parts.append(packed)
+        count += 1
+    parts[0] = _COUNT.pack(count)
+    flags = 0
+    if positions:
+        parts.append(_COUNT.pack(len(positions)))
+        parts.extend(_SCHEDULE.pack(position, weekdays, per_week or 0)
+                     for position, weekdays, per_week in positions)
+        flags |= FLAG_SCHEDULES
+    body = b"".join(parts)
+    if compress:
+        body = zlib.compress(body, 6)
+        flags |= FLAG_ZLIB
+    return _HEADER.pack(MAGIC, VERSION, flags) + body
+
+
+def decode(data: bytes) -> list[tuple[str, array, array]]:
+    """Decodifica um snapshot em [(nome, inícios, fins), ...] (ver encode)."""
+    return decode_with_schedules(data)[0]
+
+
+def decode_with_schedules(data: bytes) -> tuple[list[tuple[str, array, array]], dict[str, ScheduleFields]]:
+    """Como decode, mas também devolve as agendas gravadas, por nome."""
+    try:
+        magic, version, flags = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise FormatError("Cabeçalho inválido.")
+        if version != VERSION:
+            raise FormatError(f"Versão do formato binário não suportada: {version}")
+        body = data[_HEADER.size:]
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        return _decode_body(memoryview(body), bool(flags & FLAG_SCHEDULES))
+    except (struct.error, zlib.error, UnicodeDecodeError) as error:
+        raise FormatError(f"Snapshot binário corrompido: {error}") from error
+
+
+def segment_ordinals(starts, ends):
+    """Ordinais de todos os dias cobertos pelas sequências, em ordem."""
+    return chain.from_iterable(map(range, starts, [end + 1 for end in ends]))
+
+
+def _decode_body(body: memoryview, with_schedules: bool):
+    (count,), offset = _COUNT.unpack_from(body), _COUNT.size
+    habits = []
+    for _ in range(count):
+        (name_size,) = _NAME_SIZE.unpack_from(body, offset)
+        offset += _NAME_SIZE.size
+        name = bytes(body[offset:offset + name_size]).decode("utf-8")
+        offset += name_size
+        n_runs, first, typecode = _HABIT.unpack_from(body, offset)
+        offset += _HABIT.size
+        if typecode not in (ord("H"), ord("I")):
+            raise FormatError("Tipo de valores inválido.")
+        values = array(chr(typecode))
+        size = 2 * n_runs * values.itemsize
+        if offset + size > len(body):
+            raise FormatError("Snapshot binário truncado.")
+        values.frombytes(body[offset:offset + size])
+        offset += size
+        if sys.byteorder == "big":
+            values.byteswap()
+        # Somas acumuladas de [gap, comprimento, ...] dão [início, fim, ...].
+        bounds = list(accumulate(values, initial=first))[1:]
+        habits.append((name, array("i", bounds[0::2]), array("i", bounds[1::2])))
+    schedules = {}
+    if with_schedules:
+        (n_schedules,) = _COUNT.unpack_from(body, offset)
+        offset += _COUNT.size
+        for _ in range(n_schedules):
+            position, weekdays, per_week = _SCHEDULE.unpack_from(body, offset)
+            offset += _SCHEDULE.size
+            if position >= len(habits):
+                raise FormatError("Agenda de um hábito inexistente.")
+            schedules[habits[position][0]] = (weekdays, per_week or None)
+    return habits, schedules
@@ -0,0 +1,259 @@
+# cli.py
+"""
+Interface de linha de comando, para scripts e tarefas agendadas (cron).
+
+Só depende de habit_logic e persistence: não carrega o Flet nem a interface,
+então cada chamada inicia em poucas dezenas de milissegundos. Os dados são
+carregados com a janela preguiçosa (só os dias recentes são convertidos) e
+cada alteração é anexada ao diário, em vez de regravar o arquivo inteiro.
+
+Uso:
+    python cli.py add "Ler" "Correr"
+    python cli.py mark "Ler"                      # hoje
+    python cli.py mark "Ler" 2025-06-01 --to 2025-06-07
+    python cli.py unmark "Ler" 2025-06-03
+    python cli.py streak "Ler"
+    python cli.py schedule "Academia" seg,qua,sex   # só nesses dias
+    python cli.py schedule "Correr" --per-week 3    # 3 vezes por semana
+    python cli.py stats [--json]
+    python cli.py export backup.csv.gz
+"""
+import argparse
+import json
+import sys
+from datetime import date
+import instrumentation
+import persistence
+from habit_logic import DAILY, HabitTracker, Schedule
+from habit_summary import ADHERENCE_DAYS, habit_stats
+
+# Dias carregados de imediato; o histórico mais antigo só é lido se um comando precisar dele.
+LOAD_WINDOW_DAYS = 90
+
+# Comandos que alteram os dados (os demais só leem). O import não passa pelo
+# diário: com milhares de eventos ele seria compactado várias vezes no meio do
+# caminho; em vez disso, um único snapshot é gravado no fim.
+_MUTATING = {"add", "delete", "rename", "mark", "unmark", "schedule"}
+_SNAPSHOT_AFTER = {"import"}
+
+WEEKDAY_NAMES = ("seg", "ter", "qua", "qui", "sex", "sab", "dom")
+
+
+class CommandError(Exception):
+    """Erro de uso reportado ao usuário (código de saída 1)."""
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {value!r} (use AAAA-MM-DD)") from None
+
+
+def _parse_weekdays(value: str) -> list[int]:
+    try:
+        return [WEEKDAY_NAMES.index(day.strip().lower()[:3]) for day in value.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"dias inválidos: {value!r} (use {','.join(WEEKDAY_NAMES)})") from None
+
+
+def describe_schedule(schedule: Schedule) -> str:
+    """Agenda em texto, ex.: "seg, qua, sex" ou "3x por semana"."""
+    days = "todos os dias" if schedule.weekdays == DAILY.weekdays else \
+        ", ".join(WEEKDAY_NAMES[day] for day in schedule.days)
+    if schedule.per_week is None:
+        return days
+    return f"{schedule.per_week}x por semana" + ("" if schedule.weekdays == DAILY.weekdays else f" ({days})")
+
+
+def _require_habit(tracker: HabitTracker, name: str):
+    habit = tracker.get_habit(name)
+    if habit is None:
+        raise CommandError(f"Hábito não encontrado: {name}")
+    return habit
+
+
+def cmd_add(tracker: HabitTracker, args) -> None:
+    for name in args.names:
+        # Como na interface e na API: "  Ler " é o mesmo hábito que "Ler".
+        name = name.strip()
+        if not name:
+            raise CommandError("O nome do hábito não pode ser vazio.")
+        if tracker.add_habit(name):
+            print(f"Hábito adicionado: {name}")
+        else:
+            print(f"Hábito já existe: {name}")
+
+
+def cmd_delete(tracker: HabitTracker, args) -> None:
+    for name in args.names:
+        _require_habit(tracker, name)
+        tracker.delete_habit(name)
+        print(f"Hábito removido: {name}")
+
+
+def cmd_rename(tracker: HabitTracker, args) -> None:
+    _require_habit(tracker, args.old)
+    try:
+        renamed = tracker.rename_habit(args.old, args.new)
+    except ValueError as error:
+        raise CommandError(str(error)) from None
+    if not renamed:
+        raise CommandError(f"Já existe um hábito chamado {args.new}")
+    print(f"Hábito renomeado: {args.old} -> {args.new}")
+
+
+def _cmd_mark(tracker: HabitTracker, args, done: bool) -> None:
+    _require_habit(tracker, args.name)
+    start = args.date or date.today()
+    end = args.to or start
+    if end < start:
+        raise CommandError("--to deve ser igual ou posterior à data inicial.")
+    changed = tracker.mark_range(args.name, start, end, done=done)
+    action = "marcado(s)" if done else "desmarcado(s)"
+    print(f"{args.name}: {changed} dia(s) {action}")
+
+
+def cmd_mark(tracker: HabitTracker, args) -> None:
+    _cmd_mark(tracker, args, done=True)
+
+
+def cmd_unmark(tracker: HabitTracker, args) -> None:
+    _cmd_mark(tracker, args, done=False)
+
+
+def cmd_list(tracker: HabitTracker, args) -> None:
+    for name in tracker.find_by_prefix(args.prefix):
+        print(name)
+
+
+def cmd_streak(tracker: HabitTracker, args) -> None:
+    habit = _require_habit(tracker, args.name)
+    print(habit.current_streak(args.date or date.today()))
+
+
+def cmd_schedule(tracker: HabitTracker, args) -> None:
+    habit = _require_habit(tracker, args.name)
+    if args.days is None and args.per_week is None:
+        print(f"{habit.name}: {describe_schedule(habit.schedule)}")
+        return
+    days = args.days if args.days is not None else range(7)
+    try:
+        schedule = Schedule.from_days(days, args.per_week)
+    except ValueError as error:
+        raise CommandError(str(error)) from None
+    tracker.set_schedule(habit.name, schedule)
+    print(f"{habit.name}: {describe_schedule(schedule)}")
+
+
+def cmd_stats(tracker: HabitTracker, args) -> None:
+    try:
+        stats = habit_stats(tracker, args.date or date.today(), args.names or None)
+    except KeyError as error:
+        raise CommandError(f"Hábito não encontrado: {error.args[0]}") from None
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False))
+        return
+    for item in stats:
+        mark = "x" if item["done_today"] else " "
+        met, periods = item["adherence"]
+        unit = "semanas" if item["schedule"] and "per_week" in item["schedule"] else "dias"
+        print(f"[{mark}] {item['habit']}: {item['completions']} conclusões, "
+              f"streak {item['current_streak']} {unit} (maior {item['longest_streak']}), "
+              f"{met}/{periods} nos últimos {ADHERENCE_DAYS} dias")
+
+
+def cmd_import(tracker: HabitTracker, args) -> None:
+    import import_export  # csv/gzip só são carregados quando usados
+    count = import_export.import_file(tracker, args.path, args.format)
+    print(f"{count} registros importados de {args.path}")
+
+
+def cmd_export(tracker: HabitTracker, args) -> None:
+    import import_export
+    count = import_export.export_file(tracker, args.path, args.format)
+    print(f"{count} registros exportados para {args.path}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python cli.py",
+                                     description="Rastreador de hábitos pela linha de comando.")
+    parser.add_argument("--data", help=f"arquivo de dados (padrão: {persistence.DATA_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="adiciona hábitos")
+    add.add_argument("names", nargs="+", metavar="NOME")
+    add.set_defaults(func=cmd_add)
+
+    delete = commands.add_parser("delete", help="remove hábitos")
+    delete.add_argument("names", nargs="+", metavar="NOME")
+    delete.set_defaults(func=cmd_delete)
+
+    rename = commands.add_parser("rename", help="renomeia um hábito")
+    rename.add_argument("old", metavar="NOME")
+    rename.add_argument("new", metavar="NOVO_NOME")
+    rename.set_defaults(func=cmd_rename)
+
+    for command, func, verb in (("mark", cmd_mark, "marca"), ("unmark", cmd_unmark, "desmarca")):
+        sub = commands.add_parser(command, help=f"{verb} um dia (ou um intervalo com --to)")
+        sub.add_argument("name", metavar="NOME")
+        sub.add_argument("date", nargs="?", type=_parse_date, metavar="DATA", help="AAAA-MM-DD (padrão: hoje)")
+        sub.add_argument("--to", type=_parse_date, metavar="DATA", help="último dia do intervalo, inclusive")
+        sub.set_defaults(func=func)
+
+    listing = commands.add_parser("list", help="lista os hábitos em ordem alfabética")
+    listing.add_argument("prefix", nargs="?", default="", metavar="PREFIXO")
+    listing.set_defaults(func=cmd_list)
+
+    streak = commands.add_parser("streak", help="streak atual de um hábito")
+    streak.add_argument("name", metavar="NOME")
+    streak.add_argument("--date", type=_parse_date, metavar="DATA", help="data de referência (padrão: hoje)")
+    streak.set_defaults(func=cmd_streak)
+
+    schedule = commands.add_parser("schedule", help="mostra ou define a agenda de um hábito")
+    schedule.add_argument("name", metavar="NOME")
+    schedule.add_argument("days", nargs="?", type=_parse_weekdays, metavar="DIAS",
+                          help=f"dias da semana separados por vírgula ({','.join(WEEKDAY_NAMES)}; padrão: todos)")
+    schedule.add_argument("--per-week", type=int, metavar="N", help="meta semanal: N dos dias da agenda")
+    schedule.set_defaults(func=cmd_schedule)
+
+    stats = commands.add_parser("stats", help="resumo dos hábitos")
+    stats.add_argument("names", nargs="*", metavar="NOME")
+    stats.add_argument("--date", type=_parse_date, metavar="DATA", help="data de referência (padrão: hoje)")
+    stats.add_argument("--json", action="store_true", help="saída em JSON")
+    stats.set_defaults(func=cmd_stats)
+
+    for command, func in (("import", cmd_import), ("export", cmd_export)):
+        sub = commands.add_parser(command, help=f"{command}a CSV ou NDJSON (opcionalmente .gz)")
+        sub.add_argument("path", metavar="ARQUIVO")
+        sub.add_argument("--format", choices=("csv", "ndjson"), help="formato, se não der para deduzir")
+        sub.set_defaults(func=func)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    instrumentation.enable_from_env()
+    if args.data:
+        persistence.DATA_FILE = args.data
+
+    backend = persistence.get_backend()
+    tracker = backend.load(window_days=LOAD_WINDOW_DAYS)
+    # Alterações vão para o diário, uma escrita por comando (lotes viram um evento só).
+    recorder = backend.attach(tracker) if args.command in _MUTATING else None
+    try:
+        args.func(tracker, args)
+        if args.command in _SNAPSHOT_AFTER:
+            backend.save(tracker)
+    except (CommandError, OSError, ValueError) as error:
+        print(f"Erro: {error}", file=sys.stderr)
+        return 1
+    finally:
+        if recorder is not None:
+            recorder.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# completion_store.py
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Set
+from datetime import date
+
+
+class CompletionStore(Set):
+    """
+    Conjunto (somente leitura pela interface Set) das datas de conclusão de um hábito.
+
+    As alterações devem passar por Habit.add_completion/remove_completion, que
+    mantêm os segmentos de streak em dia. O contador 'version' muda a cada
+    alteração, o que permite ao Habit detectar mudanças feitas por fora.
+    """
+    __slots__ = ("version",)
+
+    def add(self, day: date) -> bool:
+        raise NotImplementedError
+
+    def discard(self, day: date) -> bool:
+        raise NotImplementedError
+
+    def ordinals(self) -> Iterable[int]:
+        """Ordinais (date.toordinal) das conclusões, em ordem crescente."""
+        raise NotImplementedError
+
+    def copy(self) -> "CompletionStore":
+        return type(self).from_ordinals(self.ordinals())
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> "CompletionStore":
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self)!r})"
+
+
+class SetCompletionStore(CompletionStore):
+    """Armazenamento padrão: um set[date]. Rápido, mas ~100+ bytes por conclusão."""
+    __slots__ = ("_days",)
+
+    def __init__(self, days: Iterable[date] = ()):
+        self._days: set[date] = set(days)
+        self.version = 0
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> "SetCompletionStore":
+        return cls(date.fromordinal(o) for o in ordinals)
+
+    def add(self, day: date) -> bool:
+        if day in self._days:
+            return False
+        self._days.add(day)
+        self.version += 1
+        return True
+
+    def discard(self, day: date) -> bool:
+        if day not in self._days:
+            return False
+        self._days.remove(day)
+        self.version += 1
+        return True
+
+    def ordinals(self) -> list[int]:
+        return sorted(d.toordinal() for d in self._days)
+
+    def __contains__(self, day) -> bool:
+        return day in self._days
+
+    def __iter__(self) -> Iterator[date]:
+        return iter(self._days)
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+
+class ArrayCompletionStore(CompletionStore):
+    """
+    Armazenamento compacto: ordinais dos dias em um array('i') ordenado
+    (4 bytes por conclusão). Busca por bisect; inserções no fim, o caso comum
+    de quem marca o dia de hoje, são O(1).
+    """
+    __slots__ = ("_ordinals",)
+
+    def __init__(self, days: Iterable[date] = ()):
+        self._ordinals = array("i", sorted({d.toordinal() for d in days}))
+        self.version = 0
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> "ArrayCompletionStore":
+        store = cls()
+        store._ordinals = array("i", sorted(set(ordinals)))
+        return store
+
+    def _find(self, ordinal: int) -> int:
+        """Posição de 'ordinal' no array, ou -1 se não estiver presente."""
+        data = self._ordinals
+        i = bisect_left(data, ordinal)
+        return i if i < len(data) and data[i] == ordinal else -1
+
+    def add(self, day: date) -> bool:
+        ordinal = day.toordinal()
+        data = self._ordinals
+        if not data or data[-1] < ordinal:
+            data.append(ordinal)
+        else:
+            i = bisect_left(data, ordinal)
+            if data[i] == ordinal:
+                return False
+            data.insert(i, ordinal)
+        self.version += 1
+        return True
+
+    def discard(self, day: date) -> bool:
+        i = self._find(day.toordinal())
+        if i < 0:
+            return False
+        del self._ordinals[i]
+        self.version += 1
+        return True
+
+    def ordinals(self) -> array:
+        return self._ordinals
+
+    def __contains__(self, day) -> bool:
+        return isinstance(day, date) and self._find(day.toordinal()) >= 0
+
+    def __iter__(self) -> Iterator[date]:
+        return map(date.fromordinal, self._ordinals)
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+
+# Armazenamento usado quando nenhum é especificado.
+DEFAULT_STORE = SetCompletionStore
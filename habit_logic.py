@@ -1,79 +1,945 @@
 # habit_logic.py
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator
 from datetime import date, timedelta
+from itertools import accumulate, chain, count
+from completion_store import CompletionStore, DEFAULT_STORE
+
+# Fonte das revisões dos hábitos (Habit.revision); next() nela é atômico no CPython.
+_revisions = count(1)
 
 class Habit:
-    """Representa um único hábito com seu nome e datas de conclusão."""
-    def __init__(self, name: str, completions: set[date] = None):
+    """
+    Representa um único hábito com seu nome e datas de conclusão.
+
+    Cada hábito tem o seu lock: alterações e consultas de threads diferentes
+    (interface, gravação em segundo plano, outras sessões) não se intercalam,
+    e hábitos diferentes não disputam o mesmo lock.
+    """
+    __slots__ = ("name", "revision", "schedule", "_store", "_starts", "_ends", "_longest", "_segments_version",
+                 "_period_runs", "_cutoff", "_history", "_lock")
+
+    def __init__(self, name: str, completions: set[date] = None, store: type[CompletionStore] = None):
         if not name:
             raise ValueError("O nome do hábito não pode ser vazio.")
         self.name = name
-        self.completions = completions or set()
+        # Muda (para um valor nunca usado antes) a cada alteração das conclusões
+        # ou do nome: quem grava por hábito compara revisões para achar os alterados.
+        self.revision = next(_revisions)
+        # Frequência esperada (ver Schedule); altere via set_schedule.
+        self.schedule = DAILY
+        self._lock = threading.RLock()
+        self._store: CompletionStore = (store or DEFAULT_STORE)(completions or ())
+        # Histórico preguiçoso (ver set_lazy_history): conclusões anteriores ao
+        # ordinal '_cutoff' ainda não estão no store e vêm de '_history()'.
+        self._cutoff = 0
+        self._history: Callable[[], Iterable[int]] | None = None
+        self._rebuild_segments()
+
+    @classmethod
+    def from_ordinals(cls, name: str, ordinals, store: type[CompletionStore] = None) -> "Habit":
+        """Cria um hábito a partir de ordinais de datas (date.toordinal), sem criar objetos date intermediários."""
+        habit = cls(name, store=store)
+        habit._store = type(habit._store).from_ordinals(ordinals)
+        habit._rebuild_segments()
+        return habit
+
+    @classmethod
+    def from_segments(cls, name: str, starts, ends, store: type[CompletionStore] = None) -> "Habit":
+        """
+        Cria um hábito a partir das suas sequências (ordinais de início e fim,
+        inclusivos e em ordem), sem remontar os segmentos dia a dia.
+        """
+        habit = cls(name, store=store)
+        habit._store = type(habit._store).from_ordinals(
+            chain.from_iterable(map(range, starts, [end + 1 for end in ends])))
+        habit._starts, habit._ends = array("i", starts), array("i", ends)
+        habit._segments_version = habit._store.version
+        return habit
+
+    @property
+    def completions(self) -> CompletionStore:
+        """Datas de conclusão (somente leitura; altere via add_completion/remove_completion)."""
+        with self._lock:
+            self.load_history()
+            return self._store
+
+    @completions.setter
+    def completions(self, completions: set[date]):
+        with self._lock:
+            self._store = type(self._store)(completions)
+            self._cutoff, self._history = 0, None
+            self._rebuild_segments()
+            self.revision = next(_revisions)
+
+    # --- Histórico preguiçoso ---
+    # Ao carregar um arquivo grande só as conclusões recentes são convertidas;
+    # as mais antigas ficam para quando alguma consulta realmente precisar delas
+    # (uma data antiga, uma streak que chega à borda da janela, estatísticas...).
+
+    def set_lazy_history(self, cutoff: date, loader: Callable[[], Iterable[int]]):
+        """
+        Indica que as conclusões anteriores a 'cutoff' ainda não foram carregadas;
+        'loader()' deve devolver os ordinais delas quando forem necessárias.
+        """
+        self._cutoff = cutoff.toordinal()
+        self._history = loader
+
+    @property
+    def history_loaded(self) -> bool:
+        """True se todas as conclusões já estão em memória."""
+        return self._history is None
+
+    def load_history(self):
+        """Traz para o store as conclusões antigas ainda pendentes, se houver."""
+        with self._lock:
+            if self._history is None:
+                return
+            loader, self._history = self._history, None
+            self._cutoff = 0
+            self._store = type(self._store).from_ordinals(chain(loader(), self._store.ordinals()))
+            self._rebuild_segments()
+
+    def snapshot(self) -> array:
+        """Cópia consistente e ordenada dos ordinais de conclusão (inclui o histórico pendente)."""
+        with self._lock:
+            self.load_history()
+            return array("i", self._store.ordinals())
+
+    def snapshot_segments(self) -> tuple[array, array]:
+        """Cópia consistente dos segmentos (inícios, fins) de todo o histórico."""
+        with self._lock:
+            self.load_history()
+            self._sync_segments()
+            return array("i", self._starts), array("i", self._ends)
+
+    def _needs_history(self, ordinal: int) -> bool:
+        return self._history is not None and ordinal < self._cutoff
+
+    # --- Segmentos (run-length) ---
+    # As conclusões também são mantidas como intervalos de dias consecutivos,
+    # guardados em dois array("i") ordenados de ordinais (inícios e fins, inclusivos).
+    # Assim a streak em qualquer data é uma busca binária, e não uma caminhada
+    # dia a dia pelo conjunto de conclusões.
+
+    def _rebuild_segments(self):
+        """Reconstrói os segmentos a partir do conjunto de conclusões."""
+        self._starts = array("i")
+        self._ends = array("i")
+        for ordinal in self._store.ordinals():
+            if self._ends and self._ends[-1] == ordinal - 1:
+                self._ends[-1] = ordinal
+            else:
+                self._starts.append(ordinal)
+                self._ends.append(ordinal)
+        self._longest: int | None = None
+        self._period_runs: tuple[array, array] | None = None
+        self._segments_version = self._store.version
+
+    def _sync_segments(self):
+        """Reconstrói os segmentos se o armazenamento foi alterado por fora do Habit."""
+        if self._segments_version != self._store.version:
+            self._rebuild_segments()
+
+    def _segment_index(self, ordinal: int) -> int:
+        """Índice do último segmento que começa em ou antes de 'ordinal' (-1 se nenhum)."""
+        return bisect_right(self._starts, ordinal) - 1
+
+    def add_completion(self, completion_date: date) -> bool:
+        """Marca a data como concluída. Retorna False se ela já estava marcada."""
+        with self._lock:
+            if self._needs_history(completion_date.toordinal()):
+                self.load_history()
+            self._sync_segments()
+            if not self._store.add(completion_date):
+                return False
+            self._segment_insert(completion_date.toordinal())
+            self._longest = self._period_runs = None
+            self._segments_version = self._store.version
+            self.revision = next(_revisions)
+            return True
+
+    def remove_completion(self, completion_date: date) -> bool:
+        """Desmarca a data. Retorna False se ela não estava marcada."""
+        with self._lock:
+            if self._needs_history(completion_date.toordinal()):
+                self.load_history()
+            self._sync_segments()
+            if not self._store.discard(completion_date):
+                return False
+            self._segment_remove(completion_date.toordinal())
+            self._longest = self._period_runs = None
+            self._segments_version = self._store.version
+            self.revision = next(_revisions)
+            return True
+
+    def update_days(self, add: Iterable[date] = (), remove: Iterable[date] = ()) -> tuple[list[date], list[date]]:
+        """
+        Marca as datas de 'add' e depois desmarca as de 'remove', de uma vez.
+        Retorna as datas que realmente foram marcadas e desmarcadas. Os
+        segmentos são ajustados só no final (e reconstruídos se as mudanças
+        forem muitas em relação ao tamanho do histórico).
+        """
+        add, remove = list(add), list(remove)
+        with self._lock:
+            if self._history is not None and any(
+                    self._needs_history(day.toordinal()) for day in chain(add, remove)):
+                self.load_history()
+            self._sync_segments()
+            added = [day for day in add if self._store.add(day)]
+            removed = [day for day in remove if self._store.discard(day)]
+            changed = len(added) + len(removed)
+            if changed > max(_BULK_REBUILD_MIN, len(self._store) // 8):
+                self._rebuild_segments()
+            elif changed:
+                for day in added:
+                    self._segment_insert(day.toordinal())
+                for day in removed:
+                    self._segment_remove(day.toordinal())
+                self._longest = self._period_runs = None
+                self._segments_version = self._store.version
+            if changed:
+                self.revision = next(_revisions)
+            return added, removed
+
+    def _segment_insert(self, ordinal: int):
+        """Inclui nos segmentos um dia que acabou de ser marcado."""
+        starts, ends = self._starts, self._ends
+        i = bisect_right(starts, ordinal)
+        joins_left = i > 0 and ends[i - 1] == ordinal - 1
+        joins_right = i < len(starts) and starts[i] == ordinal + 1
+        if joins_left and joins_right:
+            # A data fecha o buraco entre dois segmentos: funde os dois.
+            ends[i - 1] = ends[i]
+            del starts[i], ends[i]
+        elif joins_left:
+            ends[i - 1] = ordinal
+        elif joins_right:
+            starts[i] = ordinal
+        else:
+            starts.insert(i, ordinal)
+            ends.insert(i, ordinal)
+
+    def _segment_remove(self, ordinal: int):
+        """Tira dos segmentos um dia que acabou de ser desmarcado."""
+        starts, ends = self._starts, self._ends
+        i = self._segment_index(ordinal)
+        start, end = starts[i], ends[i]
+        if start == end:
+            del starts[i], ends[i]
+        elif ordinal == start:
+            starts[i] = ordinal + 1
+        elif ordinal == end:
+            ends[i] = ordinal - 1
+        else:
+            # A data estava no meio do segmento: divide em dois.
+            ends[i] = ordinal - 1
+            starts.insert(i + 1, ordinal + 1)
+            ends.insert(i + 1, end)
+
+    def is_complete(self, day: date) -> bool:
+        """Verifica se o hábito foi concluído na data."""
+        with self._lock:
+            if self._needs_history(day.toordinal()):
+                self.load_history()
+            return day in self._store
+
+    def current_streak(self, today: date) -> int:
+        """
+        Sequência de dias consecutivos terminando em 'today' (ou ontem, se
+        'today' não foi concluído), em O(log n).
+        """
+        if self.schedule is not DAILY:
+            return self._scheduled_streak(today)
+        with self._lock:
+            self._sync_segments()
+            ordinal = today.toordinal()
+            if self._needs_history(ordinal - 1):
+                self.load_history()
+            i = self._segment_index(ordinal)
+            if i < 0:
+                return 0
+            start, end = self._starts[i], self._ends[i]
+            if end < ordinal - 1:
+                return 0
+            if self._needs_history(start - 1):
+                # A sequência chega à borda da janela carregada: pode continuar antes dela.
+                self.load_history()
+                return self.current_streak(today)
+            return min(end, ordinal) - start + 1
+
+    def longest_streak(self) -> int:
+        """Maior sequência de dias consecutivos já registrada (de períodos cumpridos, com agenda)."""
+        with self._lock:
+            self.load_history()
+            self._sync_segments()
+            if self._longest is None:
+                starts, ends = (self._starts, self._ends) if self.schedule is DAILY else self._schedule_runs()
+                self._longest = max((end - start + 1 for start, end in zip(starts, ends)), default=0)
+            return self._longest
+
+    def streak_history(self, start: date | None = None, end: date | None = None) -> list[tuple[date, date]]:
+        """
+        Lista de sequências (primeiro dia, último dia), em ordem cronológica.
+        Se 'start'/'end' forem dados, retorna só as sequências que tocam o intervalo.
+        """
+        with self._lock:
+            if start is None:
+                self.load_history()
+            self._sync_segments()
+            lo = 0
+            if start is not None:
+                lo = max(self._segment_index(start.toordinal()), 0)
+                reaches_edge = lo < len(self._starts) and self._needs_history(self._starts[lo] - 1)
+                if reaches_edge or self._needs_history(start.toordinal()):
+                    # O intervalo alcança a borda da janela carregada.
+                    self.load_history()
+                    return self.streak_history(start, end)
+            hi = len(self._starts)
+            if end is not None:
+                hi = self._segment_index(end.toordinal()) + 1
+            history = []
+            for i in range(lo, hi):
+                if start is not None and self._ends[i] < start.toordinal():
+                    continue
+                history.append((date.fromordinal(self._starts[i]), date.fromordinal(self._ends[i])))
+            return history
+
+    # --- Consultas por intervalo ---
+    # Respondidas pelos segmentos: duas buscas binárias acham as sequências que
+    # tocam o intervalo, sem testar dia a dia.
+
+    def _runs(self, first: int, last: int) -> list[tuple[int, int]]:
+        """Sequências (ordinais, inclusivos) cortadas em [first, last]; chamada com o lock."""
+        if self._needs_history(first):
+            self.load_history()
+        self._sync_segments()
+        lo = bisect_left(self._ends, first)
+        hi = bisect_right(self._starts, last)
+        return [(max(start, first), min(end, last))
+                for start, end in zip(self._starts[lo:hi], self._ends[lo:hi])]
+
+    def runs_between(self, start: date, end: date) -> list[tuple[int, int]]:
+        """Sequências de dias concluídos entre 'start' e 'end' (inclusive), como ordinais (início, fim)."""
+        with self._lock:
+            return self._runs(start.toordinal(), end.toordinal())
+
+    def completions_between(self, start: date, end: date) -> list[date]:
+        """Datas concluídas entre 'start' e 'end' (inclusive), em ordem."""
+        return [date.fromordinal(o) for first, last in self.runs_between(start, end)
+                for o in range(first, last + 1)]
+
+    def count_between(self, start: date, end: date) -> int:
+        """Quantos dias entre 'start' e 'end' (inclusive) foram concluídos."""
+        return sum(last - first + 1 for first, last in self.runs_between(start, end))
+
+    def counts_by_period(self, start: date, end: date, period: str = "week") -> list[tuple[date, int]]:
+        """
+        Conclusões por semana (começando na segunda) ou por mês, de 'start' a
+        'end': [(início do período, quantidade), ...]. Os períodos das pontas
+        contam só os dias dentro do intervalo.
+        """
+        bounds = period_bounds(start, end, period)
+        with self._lock:
+            runs = self._runs(start.toordinal(), end.toordinal())
+        counts = []
+        i = 0
+        for bucket, bucket_end in bounds:
+            first, last = max(bucket, start).toordinal(), min(bucket_end, end).toordinal()
+            total = 0
+            # As sequências e os períodos estão em ordem: um único passe pelas duas listas.
+            while i < len(runs) and runs[i][1] < first:
+                i += 1
+            j = i
+            while j < len(runs) and runs[j][0] <= last:
+                total += min(runs[j][1], last) - max(runs[j][0], first) + 1
+                j += 1
+            counts.append((bucket, total))
+        return counts
+
+    # --- Agenda (ver Schedule) ---
+    # Com uma agenda, a streak conta períodos cumpridos seguidos: dias da agenda
+    # concluídos ou semanas que atingiram a meta. Os períodos cumpridos são
+    # calculados uma vez a partir dos segmentos, como sequências de índices de
+    # período (em _period_runs, descartadas quando as conclusões mudam); a
+    # streak em qualquer data é então uma busca binária, como a diária.
+
+    def set_schedule(self, schedule: "Schedule") -> bool:
+        """Troca a agenda do hábito. Retorna False se ela já era essa."""
+        with self._lock:
+            if schedule == self.schedule:
+                return False
+            # DAILY é sempre o mesmo objeto: 'is DAILY' escolhe o caminho diário.
+            self.schedule = DAILY if schedule == DAILY else schedule
+            self._longest = self._period_runs = None
+            self.revision = next(_revisions)
+            return True
+
+    def _schedule_runs(self) -> tuple[array, array]:
+        """Sequências (inícios, fins) de índices de períodos cumpridos; chamada com o lock."""
+        self._sync_segments()
+        if self._period_runs is None:
+            self._period_runs = _period_runs(self.schedule, self._starts, self._ends)
+        return self._period_runs
+
+    def _period_met(self, first: int, last: int) -> int:
+        """Dias da agenda concluídos entre os ordinais 'first' e 'last'; chamada com o lock."""
+        schedule = self.schedule
+        return sum(schedule.scheduled_between(a, b) for a, b in self._runs(first, last))
+
+    def _scheduled_streak(self, today: date) -> int:
+        with self._lock:
+            ordinal = today.toordinal()
+            schedule = self.schedule
+            period = schedule.period_index(ordinal)
+            # O período de 'today' conta se já foi cumprido (até 'today'); se não,
+            # a streak é a que terminou no período anterior, como na diária.
+            if schedule.per_week is None:
+                current = schedule.is_scheduled(ordinal) and self._period_met(ordinal, ordinal) > 0
+            else:
+                week_start = ordinal - (ordinal - 1) % 7
+                current = self._period_met(week_start, ordinal) >= schedule.per_week
+            starts, ends = self._schedule_runs()
+            i = bisect_right(starts, period - 1) - 1
+            previous = period - starts[i] if i >= 0 and ends[i] >= period - 1 else 0
+            if self._history is not None:
+                # O primeiro período examinado (o que interrompe a streak) tem de
+                # estar inteiro na janela carregada; se não, carrega o histórico.
+                examined = starts[i] - 1 if previous else period - 1
+                if examined < schedule.first_full_period(self._cutoff):
+                    self.load_history()
+                    return self._scheduled_streak(today)
+            return previous + current
+
+    def adherence(self, start: date, end: date) -> tuple[int, int]:
+        """
+        (períodos cumpridos, períodos) da agenda que terminam entre 'start' e
+        'end' (inclusive): dias da agenda ou semanas de segunda a domingo.
+        """
+        with self._lock:
+            first_ordinal, last_ordinal = start.toordinal(), end.toordinal()
+            schedule = self.schedule
+            first = schedule.period_index(first_ordinal)
+            last = schedule.period_index(last_ordinal + 1) - 1
+            if last < first:
+                return 0, 0
+            # Uma semana que termina no intervalo pode ter começado antes dele.
+            earliest = first_ordinal - (first_ordinal - 1) % 7 if schedule.per_week else first_ordinal
+            if self._needs_history(earliest):
+                self.load_history()
+            starts, ends = self._schedule_runs()
+            lo = bisect_left(ends, first)
+            hi = bisect_right(starts, last)
+            met = sum(min(e, last) - max(s, first) + 1 for s, e in zip(starts[lo:hi], ends[lo:hi]))
+            return met, last - first + 1
+
+# --- Períodos ---
+PERIOD_WEEK = "week"
+PERIOD_MONTH = "month"
+
+def period_start(day: date, period: str) -> date:
+    """Primeiro dia do período (semana começando na segunda, ou mês) que contém 'day'."""
+    if period == PERIOD_WEEK:
+        return day - timedelta(days=day.weekday())
+    if period == PERIOD_MONTH:
+        return day.replace(day=1)
+    raise ValueError(f"Período desconhecido: {period!r}")
+
+def next_period_start(day: date, period: str) -> date:
+    """Primeiro dia do período seguinte ao que contém 'day'."""
+    start = period_start(day, period)
+    if period == PERIOD_WEEK:
+        return start + timedelta(days=7)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+def period_bounds(start: date, end: date, period: str) -> list[tuple[date, date]]:
+    """Períodos (primeiro dia, último dia) que cobrem de 'start' a 'end', em ordem."""
+    bounds = []
+    bucket = period_start(start, period)
+    while bucket <= end:
+        following = next_period_start(bucket, period)
+        bounds.append((bucket, following - timedelta(days=1)))
+        bucket = following
+    return bounds
+
+# --- Agenda ---
+ALL_WEEKDAYS = 0b1111111  # bit 0 = segunda-feira ... bit 6 = domingo
+
+class Schedule:
+    """
+    Frequência esperada de um hábito: os dias da semana em que ele vale
+    ('weekdays', máscara de bits, segunda = bit 0) e, opcionalmente, uma meta
+    semanal ('per_week': quantos desses dias, em cada semana de segunda a
+    domingo, bastam). Sem meta, cada dia da agenda é um período a cumprir; com
+    meta, cada semana. DAILY (todos os dias, sem meta) é a agenda padrão.
+    Imutável.
+    """
+    __slots__ = ("weekdays", "per_week", "_before")
+
+    def __init__(self, weekdays: int = ALL_WEEKDAYS, per_week: int | None = None):
+        if not 0 < weekdays <= ALL_WEEKDAYS:
+            raise ValueError("A agenda precisa de pelo menos um dia da semana.")
+        if per_week is not None and not 1 <= per_week <= weekdays.bit_count():
+            raise ValueError("A meta semanal deve ficar entre 1 e o número de dias da agenda.")
+        object.__setattr__(self, "weekdays", weekdays)
+        object.__setattr__(self, "per_week", per_week)
+        # _before[d]: dias da agenda numa semana antes do dia da semana 'd' (0 a 7).
+        object.__setattr__(self, "_before", tuple((weekdays & ((1 << d) - 1)).bit_count() for d in range(8)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Schedule é imutável.")
+
+    @classmethod
+    def from_days(cls, days: Iterable[int], per_week: int | None = None) -> "Schedule":
+        """Agenda a partir dos dias da semana (0 = segunda ... 6 = domingo)."""
+        weekdays = 0
+        for day in days:
+            if not 0 <= day <= 6:
+                raise ValueError(f"Dia da semana inválido: {day!r}")
+            weekdays |= 1 << day
+        return cls(weekdays, per_week)
+
+    @property
+    def days(self) -> list[int]:
+        """Dias da semana da agenda (0 = segunda ... 6 = domingo)."""
+        return [day for day in range(7) if self.weekdays >> day & 1]
+
+    def to_dict(self) -> dict:
+        data = {"weekdays": self.days}
+        if self.per_week is not None:
+            data["per_week"] = self.per_week
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "Schedule":
+        """Inverso de to_dict; None (ou um dict vazio) é a agenda diária."""
+        if not data:
+            return DAILY
+        if not isinstance(data, dict):
+            raise TypeError("Agenda inválida.")
+        schedule = cls.from_days(data.get("weekdays", range(7)), data.get("per_week"))
+        return DAILY if schedule == DAILY else schedule
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Schedule):
+            return NotImplemented
+        return (self.weekdays, self.per_week) == (other.weekdays, other.per_week)
+
+    def __hash__(self) -> int:
+        return hash((self.weekdays, self.per_week))
+
+    def __repr__(self) -> str:
+        return f"Schedule(weekdays={self.weekdays:#09b}, per_week={self.per_week})"
+
+    # Os dias são ordinais (date.toordinal); o ordinal 1 (01/01/0001) é uma segunda-feira.
+
+    def is_scheduled(self, ordinal: int) -> bool:
+        return bool(self.weekdays >> (ordinal - 1) % 7 & 1)
+
+    def scheduled_before(self, ordinal: int) -> int:
+        """Quantos dias da agenda existem antes de 'ordinal' (desde o ordinal 1)."""
+        weeks, weekday = divmod(ordinal - 1, 7)
+        return weeks * self._before[7] + self._before[weekday]
+
+    def scheduled_between(self, first: int, last: int) -> int:
+        """Quantos dias da agenda existem de 'first' a 'last' (inclusive), em O(1)."""
+        return self.scheduled_before(last + 1) - self.scheduled_before(first)
+
+    def period_index(self, ordinal: int) -> int:
+        """
+        Índice do período que contém 'ordinal': o da semana, com meta; sem ela,
+        o do dia da agenda (ou, num dia fora da agenda, o do próximo).
+        """
+        if self.per_week is not None:
+            return (ordinal - 1) // 7
+        return self.scheduled_before(ordinal)
+
+    def first_full_period(self, ordinal: int) -> int:
+        """Índice do primeiro período que começa em ou depois de 'ordinal'."""
+        if self.per_week is not None:
+            return (ordinal + 5) // 7
+        return self.scheduled_before(ordinal)
+
+DAILY = Schedule()
+
+def _period_runs(schedule: Schedule, starts, ends) -> tuple[array, array]:
+    """
+    Períodos cumpridos, agrupados em sequências de índices consecutivos, a
+    partir dos segmentos de conclusões (um passe pelos segmentos e pelas
+    semanas que eles tocam, sem percorrer os dias).
+    """
+    run_starts, run_ends = array("i"), array("i")
+
+    def push(first: int, last: int):
+        if run_ends and run_ends[-1] >= first - 1:
+            run_ends[-1] = max(run_ends[-1], last)
+        else:
+            run_starts.append(first)
+            run_ends.append(last)
+
+    if schedule.per_week is None:
+        # Cada dia da agenda é um período: um segmento cobre um intervalo de índices.
+        for start, end in zip(starts, ends):
+            first, last = schedule.scheduled_before(start), schedule.scheduled_before(end + 1) - 1
+            if first <= last:
+                push(first, last)
+        return run_starts, run_ends
+
+    week, total = None, 0
+    for start, end in zip(starts, ends):
+        for current in range((start - 1) // 7, (end - 1) // 7 + 1):
+            monday = current * 7 + 1
+            days = schedule.scheduled_between(max(start, monday), min(end, monday + 6))
+            if current == week:
+                total += days
+                continue
+            if week is not None and total >= schedule.per_week:
+                push(week, week)
+            week, total = current, days
+    if week is not None and total >= schedule.per_week:
+        push(week, week)
+    return run_starts, run_ends
+
+# Em update_days, a partir de quantas mudanças vale reconstruir os segmentos
+# de uma vez em vez de ajustá-los dia a dia.
+_BULK_REBUILD_MIN = 32
+
+def _index_key(name: str) -> tuple[str, str]:
+    return (name.casefold(), name)
+
+def expand_event(event: tuple) -> Iterator[tuple]:
+    """Eventos simples contidos em 'event': os de um lote ("batch", eventos) ou ele próprio."""
+    if event[0] == "batch":
+        yield from event[1]
+    else:
+        yield event
 
 class HabitTracker:
-    """Gerencia uma lista de hábitos e a lógica de negócio."""
-    def __init__(self):
-        self.habits: list[Habit] = []
+    """
+    Gerencia uma lista de hábitos e a lógica de negócio.
+
+    Pode ser usado por várias threads ao mesmo tempo. _write_lock serializa as
+    alterações junto com a entrega dos eventos delas, para que os ouvintes
+    (diário, banco) as recebam na ordem em que foram aplicadas; _lock protege
+    só o dict e o índice de nomes e é segurado por instantes. Leitores e
+    snapshot() usam apenas _lock e o lock de cada hábito, então gravar um
+    snapshot não bloqueia quem está alterando os dados.
+    """
+    def __init__(self, store: type[CompletionStore] = None):
+        # Armazenamento de conclusões usado pelos hábitos criados por este tracker.
+        self.store = store or DEFAULT_STORE
+        # Índice nome -> hábito. O dict preserva a ordem de inserção, então a
+        # iteração continua na ordem em que os hábitos foram adicionados.
+        self._habits: dict[str, Habit] = {}
+        # Índice ordenado (nome normalizado, nome) para listagem em ordem
+        # alfabética e busca por prefixo sem ordenar tudo a cada consulta.
+        self._name_index: list[tuple[str, str]] = []
+        # Funções notificadas a cada alteração efetiva (ver subscribe). A lista
+        # é substituída, nunca alterada, para que _emit possa percorrê-la sem lock.
+        self._listeners: list = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+
+    def subscribe(self, listener):
+        """
+        Registra 'listener(event)', chamado após cada alteração efetiva do tracker.
+        Eventos: ("add", nome), ("delete", nome), ("complete", nome, data),
+        ("incomplete", nome, data), ("rename", antigo, novo), ("schedule",
+        nome, agenda) e, das operações
+        em lote, ("batch", eventos), com os eventos simples do lote em ordem
+        (ver expand_event).
+        """
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def unsubscribe(self, listener):
+        """Remove um ouvinte registrado com subscribe."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners = [l for l in self._listeners if l != listener]
+
+    def _emit(self, *event):
+        for listener in self._listeners:
+            listener(event)
+
+    @property
+    def habits(self) -> tuple[Habit, ...]:
+        """
+        Hábitos em ordem de inserção, numa tupla só de leitura: altere via
+        add/delete (ou atribuindo uma nova lista a 'habits'), já que um
+        tracker.habits.append(...) numa cópia se perderia sem aviso.
+        """
+        with self._lock:
+            return tuple(self._habits.values())
+
+    @habits.setter
+    def habits(self, habits: list[Habit]):
+        by_name = {h.name: h for h in habits}
+        name_index = sorted(_index_key(name) for name in by_name)
+        with self._write_lock, self._lock:
+            self._habits, self._name_index = by_name, name_index
+
+    def __len__(self) -> int:
+        return len(self._habits)
+
+    def __iter__(self):
+        # Percorre uma cópia: outras threads podem adicionar ou remover hábitos.
+        return iter(self.habits)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._habits
 
     def add_habit(self, name: str) -> bool:
         """Adiciona um novo hábito, se o nome já não existir."""
-        if any(h.name == name for h in self.habits):
-            return False  # Hábito já existe
-        habit = Habit(name)
-        self.habits.append(habit)
+        if name in self._habits:
+            return False  # Caminho rápido, sem lock; confirmado abaixo se o nome for novo.
+        with self._write_lock:
+            with self._lock:
+                if name in self._habits:
+                    return False  # Hábito já existe
+                self._habits[name] = Habit(name, store=self.store)
+                insort(self._name_index, _index_key(name))
+            self._emit("add", name)
+        return True
+
+    def insert_habit(self, habit: Habit) -> bool:
+        """
+        Insere um hábito já construído (ex.: carregado do disco), se o nome não existir.
+        Não notifica os ouvintes: serve para montar o tracker a partir de dados já salvos.
+        """
+        with self._write_lock, self._lock:
+            if habit.name in self._habits:
+                return False
+            self._habits[habit.name] = habit
+            insort(self._name_index, _index_key(habit.name))
         return True
 
     def delete_habit(self, name: str):
         """Remove um hábito da lista."""
-        self.habits = [h for h in self.habits if h.name != name]
+        with self._write_lock:
+            if self._remove(name) is not None:
+                self._emit("delete", name)
+
+    def _remove(self, name: str) -> Habit | None:
+        with self._lock:
+            habit = self._habits.pop(name, None)
+            if habit is not None:
+                del self._name_index[bisect_left(self._name_index, _index_key(name))]
+            return habit
     
     def get_habit(self, name: str) -> Habit | None:
         """Retorna um objeto de hábito pelo nome."""
-        for habit in self.habits:
-            if habit.name == name:
-                return habit
-        return None
+        return self._habits.get(name)  # dict.get é atômico: dispensa o lock
+
+    def snapshot(self) -> list[tuple[str, array]]:
+        """
+        (nome, ordinais) de cada hábito, para gravação. Cada hábito é copiado
+        sob o seu próprio lock, então a cópia de um hábito é consistente e as
+        alterações nos demais seguem sem esperar a gravação.
+        """
+        return [(habit.name, habit.snapshot()) for habit in self.habits]
+
+    def snapshot_segments(self) -> list[tuple[str, array, array]]:
+        """Como snapshot(), mas com os segmentos (nome, inícios, fins) de cada hábito."""
+        return [(habit.name, *habit.snapshot_segments()) for habit in self.habits]
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        """Posições [lo, hi) do índice ordenado cujos nomes começam com 'prefix'."""
+        key = prefix.casefold()
+        lo = bisect_left(self._name_index, (key,))
+        hi = bisect_left(self._name_index, (key + "\U0010ffff",), lo)
+        return lo, hi
+
+    def find_by_prefix(self, prefix: str = "", offset: int = 0, limit: int | None = None) -> list[str]:
+        """
+        Nomes (em ordem alfabética, sem diferenciar maiúsculas) que começam com
+        'prefix', paginados por 'offset'/'limit'. Custa O(log n + limit).
+        """
+        with self._lock:
+            lo, hi = self._prefix_range(prefix)
+            start = lo + max(offset, 0)
+            stop = hi if limit is None else min(hi, start + limit)
+            return [name for _, name in self._name_index[start:stop]]
+
+    def count_by_prefix(self, prefix: str = "") -> int:
+        """Quantidade de hábitos cujo nome começa com 'prefix'."""
+        with self._lock:
+            lo, hi = self._prefix_range(prefix)
+        return hi - lo
 
     def mark_complete(self, name: str, completion_date: date):
         """Marca um hábito como concluído em uma data específica."""
-        habit = self.get_habit(name)
-        if habit:
-            habit.completions.add(completion_date)
+        with self._write_lock:
+            habit = self.get_habit(name)
+            if habit and habit.add_completion(completion_date):
+                self._emit("complete", name, completion_date)
 
     def mark_incomplete(self, name: str, completion_date: date):
         """Desmarca um hábito em uma data específica."""
+        with self._write_lock:
+            habit = self.get_habit(name)
+            if habit and habit.remove_completion(completion_date):
+                self._emit("incomplete", name, completion_date)
+
+    # --- Operações em lote ---
+    # Aplicam muitas alterações de uma vez: cada hábito é ajustado uma única vez
+    # e os ouvintes recebem um só evento ("batch", eventos), que o diário grava
+    # numa única escrita e o SQLite numa única transação.
+
+    def _emit_batch(self, events: list[tuple]):
+        if events:
+            self._emit("batch", tuple(events))
+
+    def apply_operations(self, operations: Iterable[tuple[str, date, bool]]) -> int:
+        """
+        Aplica operações (nome, data, concluído) em lote. Para a mesma data de
+        um hábito vale a última operação; hábitos inexistentes são ignorados.
+        Retorna quantas conclusões mudaram.
+        """
+        by_habit: dict[str, dict[date, bool]] = {}
+        for name, day, done in operations:
+            by_habit.setdefault(name, {})[day] = done
+        with self._write_lock:
+            events = []
+            for name, days in by_habit.items():
+                self._update_habit(name, [day for day, done in days.items() if done],
+                                   [day for day, done in days.items() if not done], events)
+            self._emit_batch(events)
+        return len(events)
+
+    def mark_range(self, name: str, start: date, end: date, done: bool = True) -> int:
+        """Marca (ou desmarca, com done=False) todos os dias de 'start' a 'end', inclusive."""
+        days = list(map(date.fromordinal, range(start.toordinal(), end.toordinal() + 1)))
+        with self._write_lock:
+            events = []
+            self._update_habit(name, days if done else (), () if done else days, events)
+            self._emit_batch(events)
+        return len(events)
+
+    def _update_habit(self, name: str, add, remove, events: list[tuple]):
         habit = self.get_habit(name)
-        if habit and completion_date in habit.completions:
-            habit.completions.remove(completion_date)
+        if habit is None:
+            return
+        added, removed = habit.update_days(add, remove)
+        events.extend([("complete", name, day) for day in added])
+        events.extend([("incomplete", name, day) for day in removed])
+
+    def rename_habit(self, old: str, new: str) -> bool:
+        """
+        Renomeia um hábito, mantendo as conclusões e a posição na lista.
+        Retorna False se 'old' não existe ou se 'new' já existe.
+        """
+        if not new:
+            raise ValueError("O nome do hábito não pode ser vazio.")
+        with self._write_lock:
+            with self._lock:
+                habit = self._habits.get(old)
+                if habit is None or new in self._habits:
+                    return False
+                habit.name = new
+                habit.revision = next(_revisions)
+                self._habits = {(new if name == old else name): h for name, h in self._habits.items()}
+                del self._name_index[bisect_left(self._name_index, _index_key(old))]
+                insort(self._name_index, _index_key(new))
+            self._emit("rename", old, new)
+        return True
+
+    def merge_habits(self, source: str, target: str) -> bool:
+        """
+        Junta as conclusões de 'source' às de 'target' e remove 'source'.
+        Retorna False se algum dos dois não existe ou se são o mesmo hábito.
+        """
+        with self._write_lock:
+            source_habit, target_habit = self.get_habit(source), self.get_habit(target)
+            if source_habit is None or target_habit is None or source_habit is target_habit:
+                return False
+            added, _ = target_habit.update_days(date.fromordinal(o) for o in source_habit.snapshot())
+            self._remove(source)
+            self._emit_batch([("complete", target, day) for day in added] + [("delete", source)])
+        return True
 
     def is_complete_today(self, name: str, today: date) -> bool:
         """Verifica se um hábito foi concluído hoje."""
         habit = self.get_habit(name)
-        return habit is not None and today in habit.completions
+        return habit is not None and habit.is_complete(today)
 
     def get_current_streak(self, name: str, today: date) -> int:
         """
         Calcula a sequência de dias consecutivos de um hábito.
         - Se o hábito foi concluído 'today', a streak inclui 'today'.
         - Se o hábito NÃO foi concluído 'today', a streak mostrada é a do dia anterior.
+        Com uma agenda (ver Schedule), conta dias da agenda ou semanas cumpridas.
         """
         habit = self.get_habit(name)
         if not habit:
             return 0
+        return habit.current_streak(today)
 
-        # Verifica se o hábito foi concluído 'today'
-        if today in habit.completions:
-            # Hábito concluído hoje, calcula a streak normalmente incluindo hoje
-            streak = 0
-            current_day_in_streak = today
-            while current_day_in_streak in habit.completions:
-                streak += 1
-                current_day_in_streak -= timedelta(days=1)
-            return streak
-        else:
-            # Hábito NÃO concluído hoje. Calcular a streak que terminava ontem.
-            streak_ending_yesterday = 0
-            current_day_in_streak = today - timedelta(days=1) # Começa a contagem a partir de ontem
-            while current_day_in_streak in habit.completions:
-                streak_ending_yesterday += 1
-                current_day_in_streak -= timedelta(days=1)
-            return streak_ending_yesterday
\ No newline at end of file
+    def get_longest_streak(self, name: str) -> int:
+        """Retorna a maior sequência já registrada de um hábito."""
+        habit = self.get_habit(name)
+        return habit.longest_streak() if habit else 0
+
+    def get_streak_history(self, name: str, start: date | None = None, end: date | None = None) -> list[tuple[date, date]]:
+        """Retorna as sequências (primeiro dia, último dia) de um hábito."""
+        habit = self.get_habit(name)
+        return habit.streak_history(start, end) if habit else []
+
+    def set_schedule(self, name: str, schedule: Schedule) -> bool:
+        """Define a agenda de um hábito (DAILY volta ao padrão). Retorna True se ela mudou."""
+        with self._write_lock:
+            habit = self.get_habit(name)
+            if habit is None or not habit.set_schedule(schedule):
+                return False
+            self._emit("schedule", name, habit.schedule)
+        return True
+
+    def get_schedule(self, name: str) -> Schedule | None:
+        """Agenda de um hábito (None se ele não existe)."""
+        habit = self.get_habit(name)
+        return habit.schedule if habit else None
+
+    def schedules(self) -> dict[str, Schedule]:
+        """Agendas diferentes da diária, por nome (para gravação)."""
+        return {habit.name: habit.schedule for habit in self.habits if habit.schedule is not DAILY}
+
+    def get_adherence(self, name: str, start: date, end: date) -> tuple[int, int]:
+        """(períodos cumpridos, períodos) da agenda do hábito entre 'start' e 'end' (ver Habit.adherence)."""
+        habit = self.get_habit(name)
+        return habit.adherence(start, end) if habit else (0, 0)
+
+    def completions_between(self, name: str, start: date, end: date) -> list[date]:
+        """Datas em que o hábito foi concluído entre 'start' e 'end' (inclusive)."""
+        habit = self.get_habit(name)
+        return habit.completions_between(start, end) if habit else []
+
+    def count_between(self, name: str, start: date, end: date) -> int:
+        """Quantos dias entre 'start' e 'end' (inclusive) o hábito foi concluído."""
+        habit = self.get_habit(name)
+        return habit.count_between(start, end) if habit else 0
+
+    def counts_by_period(self, name: str, start: date, end: date, period: str = PERIOD_WEEK) -> list[tuple[date, int]]:
+        """Conclusões do hábito por semana ou por mês (ver Habit.counts_by_period)."""
+        habit = self.get_habit(name)
+        if habit is None:
+            return [(bucket, 0) for bucket, _ in period_bounds(start, end, period)]
+        return habit.counts_by_period(start, end, period)
+
+    def daily_totals(self, start: date, end: date, names: Iterable[str] | None = None) -> list[int]:
+        """
+        Quantos hábitos (todos, ou os de 'names') foram concluídos em cada dia
+        de 'start' a 'end': uma posição por dia. Cada sequência soma 1 no seu
+        início e subtrai 1 depois do fim; as somas acumuladas dão os totais.
+        """
+        first, last = start.toordinal(), end.toordinal()
+        if last < first:
+            return []
+        habits = self.habits if names is None else [h for h in map(self.get_habit, names) if h]
+        deltas = [0] * (last - first + 2)
+        for habit in habits:
+            for run_first, run_last in habit.runs_between(start, end):
+                deltas[run_first - first] += 1
+                deltas[run_last - first + 1] -= 1
+        return list(accumulate(deltas[:-1]))
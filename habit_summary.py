@@ -0,0 +1,46 @@
+# habit_summary.py
+"""
+Resumo por hábito (conclusões, streaks, agenda e adesão), compartilhado pela
+linha de comando (cli.py stats) e pela API HTTP (/stats). Só depende de
+habit_logic, então nenhum dos dois precisa importar o outro.
+"""
+from datetime import date, timedelta
+from habit_logic import DAILY, Habit, HabitTracker
+
+# Adesão do resumo: períodos cumpridos nos últimos ADHERENCE_DAYS dias.
+ADHERENCE_DAYS = 28
+
+
+def summarize(habit: Habit, today: date) -> dict:
+    """
+    Conclusões, streak atual e maior streak (em períodos da agenda), se 'today'
+    foi concluído, a agenda e a adesão a ela (períodos cumpridos, períodos) nos
+    últimos ADHERENCE_DAYS dias.
+    """
+    schedule = habit.schedule
+    return {
+        "habit": habit.name,
+        "completions": len(habit.snapshot()),
+        "current_streak": habit.current_streak(today),
+        "longest_streak": habit.longest_streak(),
+        "done_today": habit.is_complete(today),
+        "schedule": None if schedule is DAILY else schedule.to_dict(),
+        "adherence": list(habit.adherence(today - timedelta(days=ADHERENCE_DAYS - 1), today)),
+    }
+
+
+def habit_stats(tracker: HabitTracker, today: date, names: list[str] | None = None) -> list[dict]:
+    """
+    Resumo de cada hábito de 'names' (todos, se None). Um nome inexistente
+    levanta KeyError. Sem 'names' os próprios hábitos são percorridos, então um
+    hábito apagado por outra thread no meio do caminho não causa erro.
+    """
+    if names is None:
+        return [summarize(habit, today) for habit in tracker]
+    stats = []
+    for name in names:
+        habit = tracker.get_habit(name)
+        if habit is None:
+            raise KeyError(name)
+        stats.append(summarize(habit, today))
+    return stats
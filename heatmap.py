@@ -0,0 +1,85 @@
+# heatmap.py
+"""
+Dados dos mapas de calor do histórico (mês e ano), sem dependência da
+interface: quantas conclusões houve em cada dia, arrumadas em semanas de
+segunda a domingo, e o nível de cor de cada valor.
+
+Os valores vêm de HabitTracker.daily_totals, que percorre as sequências de dias
+concluídos de cada hábito (consultas por intervalo nos segmentos ordenados) em
+vez de testar dia a dia; um ano de 100 hábitos custa alguns milissegundos.
+"""
+from datetime import date, timedelta
+from habit_logic import PERIOD_MONTH, HabitTracker, next_period_start, period_start
+
+VIEW_MONTH = "month"
+VIEW_YEAR = "year"
+LEVELS = 5  # nível 0 (nada) a LEVELS - 1 (máximo)
+
+HeatmapCell = tuple[date, int] | None  # (dia, conclusões); None fora do intervalo
+
+
+class Heatmap:
+    """Semanas (segunda a domingo) de 'start' a 'end', com o valor de cada dia."""
+    __slots__ = ("start", "end", "weeks", "maximum", "total")
+
+    def __init__(self, start: date, end: date, weeks: list[list[HeatmapCell]], maximum: int):
+        self.start = start
+        self.end = end
+        self.weeks = weeks
+        self.maximum = maximum  # valor que corresponde à cor mais forte
+        self.total = sum(cell[1] for week in weeks for cell in week if cell)
+
+    def level(self, value: int) -> int:
+        return level(value, self.maximum)
+
+
+def level(value: int, maximum: int) -> int:
+    """Nível de cor de 'value' numa escala até 'maximum': 0 só para zero."""
+    if value <= 0 or maximum <= 0:
+        return 0
+    return min(LEVELS - 1, 1 + (value * (LEVELS - 1) - 1) // maximum)
+
+
+def view_range(view: str, anchor: date) -> tuple[date, date]:
+    """Primeiro e último dia do mês ou do ano que contém 'anchor'."""
+    if view == VIEW_MONTH:
+        return period_start(anchor, PERIOD_MONTH), next_period_start(anchor, PERIOD_MONTH) - timedelta(days=1)
+    if view == VIEW_YEAR:
+        return date(anchor.year, 1, 1), date(anchor.year, 12, 31)
+    raise ValueError(f"Visão desconhecida: {view!r}")
+
+
+def shift(view: str, anchor: date, steps: int) -> date:
+    """Primeiro dia do mês/ano 'steps' períodos depois (ou antes) do de 'anchor'."""
+    if view == VIEW_MONTH:
+        months = anchor.year * 12 + anchor.month - 1 + steps
+        return date(months // 12, months % 12 + 1, 1)
+    return date(anchor.year + steps, 1, 1)
+
+
+def weeks(start: date, end: date, values: list[int]) -> list[list[HeatmapCell]]:
+    """Arruma 'values' (um por dia, de 'start' a 'end') em semanas de segunda a domingo."""
+    first = start - timedelta(days=start.weekday())
+    result = []
+    week: list[HeatmapCell] = []
+    day = first
+    while day <= end:
+        week.append((day, values[(day - start).days]) if day >= start else None)
+        if len(week) == 7:
+            result.append(week)
+            week = []
+        day += timedelta(days=1)
+    if week:
+        result.append(week + [None] * (7 - len(week)))
+    return result
+
+
+def build(tracker: HabitTracker, start: date, end: date, names: list[str] | None = None) -> Heatmap:
+    """
+    Mapa de calor de 'start' a 'end' para os hábitos de 'names' (todos, se
+    None). Com um hábito, cada dia vale 0 ou 1; com vários, a cor mais forte
+    corresponde a todos concluídos no dia.
+    """
+    values = tracker.daily_totals(start, end, names)
+    maximum = len(names) if names is not None else len(tracker)
+    return Heatmap(start, end, weeks(start, end, values), maximum)
@@ -0,0 +1,346 @@
+# http_api.py
+"""
+API HTTP/JSON local sobre o HabitTracker, para integração com outras ferramentas.
+
+Só usa a biblioteca padrão (http.server). O tracker é carregado uma vez e fica
+em memória entre as requisições; cada alteração vai para o buffer do diário e é
+gravada em segundo plano pelo SaveScheduler (write-behind), então a resposta
+não espera o disco. As conexões são persistentes (HTTP/1.1 keep-alive) e
+POST /batch aplica várias operações numa só requisição.
+
+Rotas (datas no formato AAAA-MM-DD; sem data, vale hoje):
+    GET    /habits?prefix=&offset=&limit=     nomes em ordem alfabética
+    POST   /habits              {"name": ...}
+    DELETE /habits/<nome>
+    POST   /habits/<nome>/rename {"name": novo}
+    PUT    /habits/<nome>/days/<data>         marca o dia
+    DELETE /habits/<nome>/days/<data>         desmarca o dia
+    GET    /habits/<nome>/streak?date=
+    GET    /stats?date=
+    POST   /batch               [{"op": "mark", "habit": ..., "date": ...}, ...]
+
+No lote, cada item é uma operação (add, delete, rename, mark, unmark, list,
+streak, stats) com os mesmos campos; marcações seguidas são aplicadas juntas
+(HabitTracker.apply_operations) e viram uma única escrita no diário.
+
+Uso: python -m http_api [--host 127.0.0.1] [--port 8551] [--data habits_data.json]
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+import instrumentation
+import persistence
+from habit_summary import habit_stats
+from persistence import StorageBackend
+from save_scheduler import DEFAULT_DEBOUNCE, SaveScheduler
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8551
+HISTORY_WINDOW_DAYS = 90
+MAX_BODY_SIZE = 16 * 1024 * 1024  # bytes
+
+_MARK_OPS = ("mark", "unmark")
+
+
+class ApiError(Exception):
+    """Erro reportado ao cliente com o status HTTP 'status'."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_date(value) -> date:
+    if value is None:
+        return date.today()
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"Data inválida: {value!r} (use AAAA-MM-DD)") from None
+
+
+def _parse_int(value, field: str) -> int | None:
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{field}' deve ser um inteiro") from None
+    if number < 0:
+        raise ApiError(400, f"'{field}' não pode ser negativo")
+    return number
+
+
+def _field(op: dict, name: str) -> str:
+    value = op.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise ApiError(400, f"Campo '{name}' ausente ou vazio")
+    return value
+
+
+class HabitService:
+    """
+    Tracker em memória com gravação em segundo plano: as operações da API
+    (ver o docstring do módulo) chegam aqui como dicionários.
+    """
+
+    def __init__(self, backend: StorageBackend | None = None, window_days: int | None = HISTORY_WINDOW_DAYS,
+                 debounce: float = DEFAULT_DEBOUNCE):
+        self.backend = backend or persistence.get_backend()
+        self.tracker = self.backend.load(window_days=window_days)
+        self.recorder = self.backend.attach(self.tracker, autoflush=False)
+        self.scheduler = SaveScheduler(self.recorder.flush, debounce=debounce)
+
+    def close(self):
+        """Grava o que estiver pendente e libera o backend."""
+        self.scheduler.close()
+        self.recorder.close()
+        self.backend.close()
+
+    def execute(self, op: dict):
+        """Executa uma operação e retorna o resultado (serializável em JSON)."""
+        if not isinstance(op, dict):
+            raise ApiError(400, "Cada operação deve ser um objeto JSON")
+        kind = op.get("op")
+        handler = getattr(self, f"_op_{kind}", None) if isinstance(kind, str) else None
+        if handler is None:
+            raise ApiError(400, f"Operação desconhecida: {kind!r}")
+        return handler(op)
+
+    def execute_batch(self, ops: list) -> list:
+        """
+        Executa as operações em ordem. Marcações seguidas são aplicadas de uma
+        vez, num único evento do tracker. Retorna um resultado por operação; um
+        erro interrompe o lote, e as operações anteriores a ele continuam valendo.
+        """
+        if not isinstance(ops, list):
+            raise ApiError(400, "O lote deve ser uma lista de operações")
+        results = []
+        pending = []
+        try:
+            for op in ops:
+                if isinstance(op, dict) and op.get("op") in _MARK_OPS:
+                    name = _field(op, "habit")
+                    self._require(name)
+                    pending.append((name, _parse_date(op.get("date")), op["op"] == "mark"))
+                    results.append({"ok": True})
+                    continue
+                self._apply_marks(pending)
+                results.append(self.execute(op))
+        finally:
+            self._apply_marks(pending)
+        return results
+
+    def _apply_marks(self, pending: list):
+        if pending:
+            if self.tracker.apply_operations(pending):
+                self.scheduler.request_save()
+            pending.clear()
+
+    def _require(self, name: str):
+        habit = self.tracker.get_habit(name)
+        if habit is None:
+            raise ApiError(404, f"Hábito não encontrado: {name}")
+        return habit
+
+    def _changed(self, changed: bool) -> dict:
+        if changed:
+            self.scheduler.request_save()
+        return {"ok": True, "changed": changed}
+
+    # --- Operações ---
+
+    def _op_list(self, op: dict):
+        offset = _parse_int(op.get("offset"), "offset") or 0
+        limit = _parse_int(op.get("limit"), "limit")
+        return {"habits": self.tracker.find_by_prefix(op.get("prefix") or "", offset, limit),
+                "total": self.tracker.count_by_prefix(op.get("prefix") or "")}
+
+    def _op_add(self, op: dict):
+        return self._changed(self.tracker.add_habit(_field(op, "habit")))
+
+    def _op_delete(self, op: dict):
+        name = _field(op, "habit")
+        self._require(name)
+        self.tracker.delete_habit(name)
+        return self._changed(True)
+
+    def _op_rename(self, op: dict):
+        old, new = _field(op, "habit"), _field(op, "to")
+        self._require(old)
+        if not self.tracker.rename_habit(old, new):
+            raise ApiError(409, f"Já existe um hábito chamado {new}")
+        return self._changed(True)
+
+    def _op_mark(self, op: dict):
+        return self._mark(op, True)
+
+    def _op_unmark(self, op: dict):
+        return self._mark(op, False)
+
+    def _mark(self, op: dict, done: bool):
+        name = _field(op, "habit")
+        self._require(name)
+        changed = self.tracker.apply_operations([(name, _parse_date(op.get("date")), done)])
+        return self._changed(bool(changed))
+
+    def _op_streak(self, op: dict):
+        habit = self._require(_field(op, "habit"))
+        today = _parse_date(op.get("date"))
+        return {"habit": habit.name, "current_streak": habit.current_streak(today),
+                "longest_streak": habit.longest_streak()}
+
+    def _op_stats(self, op: dict):
+        try:
+            return {"habits": habit_stats(self.tracker, _parse_date(op.get("date")))}
+        except KeyError as error:
+            raise ApiError(404, f"Hábito não encontrado: {error.args[0]}") from None
+
+
+def _route(method: str, path: str, query: dict, body) -> dict | list:
+    """
+    Converte uma requisição REST em operação (ou lote) do HabitService. Os
+    parâmetros da query string vêm antes das chaves fixadas pela rota, para
+    que não possam trocar a operação (ex.: um GET que apagasse um hábito).
+    """
+    parts = [unquote(part) for part in path.strip("/").split("/")] if path.strip("/") else []
+    if parts == ["habits"]:
+        if method == "GET":
+            return {**query, "op": "list"}
+        if method == "POST":
+            return {"op": "add", "habit": (body or {}).get("name") if isinstance(body, dict) else None}
+    elif parts == ["stats"] and method == "GET":
+        return {**query, "op": "stats"}
+    elif parts == ["batch"] and method == "POST":
+        return body
+    elif len(parts) == 2 and parts[0] == "habits" and method == "DELETE":
+        return {"op": "delete", "habit": parts[1]}
+    elif len(parts) == 3 and parts[0] == "habits":
+        if parts[2] == "streak" and method == "GET":
+            return {**query, "op": "streak", "habit": parts[1]}
+        if parts[2] == "rename" and method == "POST":
+            return {"op": "rename", "habit": parts[1], "to": (body or {}).get("name") if isinstance(body, dict) else None}
+    elif len(parts) == 4 and parts[0] == "habits" and parts[2] == "days":
+        if method in ("PUT", "DELETE"):
+            return {"op": "mark" if method == "PUT" else "unmark", "habit": parts[1], "date": parts[3]}
+    raise ApiError(404, f"Rota não encontrada: {method} {path}")
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Traduz requisições HTTP em operações do HabitService do servidor."""
+    protocol_version = "HTTP/1.1"  # conexões persistentes (keep-alive)
+    # Cabeçalhos e corpo saem em escritas separadas: sem isto o algoritmo de
+    # Nagle atrasa cada resposta de uma conexão persistente em dezenas de ms.
+    disable_nagle_algorithm = True
+    server_version = "HabitTracker/1.0"
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method: str):
+        try:
+            body = self._read_body()
+            url = urlsplit(self.path)
+            request = _route(method, url.path, dict(parse_qsl(url.query)), body)
+            service: HabitService = self.server.service
+            if url.path.strip("/") == "batch":
+                result = {"results": service.execute_batch(request)}
+            else:
+                result = service.execute(request)
+            self._send(200, result)
+        except ApiError as error:
+            self._send(error.status, {"error": str(error)})
+        except Exception as error:
+            self.log_error("Erro ao tratar %s %s: %r", method, self.path, error)
+            self._send(500, {"error": "Erro interno"})
+
+    def _read_body(self):
+        length = self.headers.get("Content-Length")
+        if not length:
+            return None
+        try:
+            size = int(length)
+        except ValueError:
+            raise ApiError(400, "Content-Length inválido") from None
+        if size > MAX_BODY_SIZE:
+            self.close_connection = True
+            raise ApiError(413, "Corpo da requisição muito grande")
+        raw = self.rfile.read(size)
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise ApiError(400, "JSON inválido") from None
+
+    def _send(self, status: int, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Servidor HTTP (uma thread por conexão) que atende as rotas com 'service'."""
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: HabitService, verbose: bool = False):
+        super().__init__(address, ApiRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def start_server(service: HabitService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ApiServer:
+    """Inicia o servidor numa thread em segundo plano (port=0 escolhe uma porta livre)."""
+    server = ApiServer((host, port), service)
+    threading.Thread(target=server.serve_forever, name="http-api", daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m http_api", description="API HTTP/JSON do rastreador de hábitos.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data", help=f"arquivo de dados (padrão: {persistence.DATA_FILE})")
+    parser.add_argument("--verbose", action="store_true", help="registra cada requisição")
+    args = parser.parse_args(argv)
+    instrumentation.enable_from_env()
+    if args.data:
+        persistence.DATA_FILE = args.data
+
+    service = HabitService()
+    server = ApiServer((args.host, args.port), service, verbose=args.verbose)
+    print(f"Servindo em http://{args.host}:{server.server_address[1]}", flush=True)
+    # SIGTERM (ex.: systemd, kill) também passa pelo finally e grava o que está pendente.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
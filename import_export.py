@@ -0,0 +1,226 @@
+# import_export.py
+"""
+Importação e exportação do histórico em CSV e NDJSON, em fluxo.
+
+Os dados circulam como registros (nome do hábito, data), um por conclusão;
+um registro com data None só declara o hábito (assim hábitos sem conclusões
+também são exportados), e um com uma Schedule no lugar da data declara o
+hábito com essa agenda (só agendas diferentes da diária são exportadas).
+Leitura e escrita são geradores, linha a linha: o documento inteiro nunca
+fica em memória, e arquivos terminados em .gz são comprimidos/descomprimidos
+no caminho.
+
+CSV:    cabeçalho "habit,date,schedule"; data vazia declara o hábito, e a coluna
+        schedule (JSON de Schedule.to_dict) traz a agenda dele, se houver.
+        Arquivos antigos, só com "habit,date", continuam sendo lidos.
+NDJSON: {"habit": "Ler", "date": "2025-06-09"} por linha; sem "date" declara o
+        hábito, com a agenda em "schedule", se houver.
+
+Uso:
+    python -m import_export export backup.csv.gz
+    python -m import_export import backup.ndjson [--data habits_data.json]
+"""
+import argparse
+import csv
+import gzip
+import json
+import sys
+from collections.abc import Iterable, Iterator
+from datetime import date
+from functools import lru_cache
+from habit_logic import DAILY, HabitTracker, Schedule
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+CSV_HEADER = ("habit", "date", "schedule")
+LEGACY_CSV_HEADER = ("habit", "date")
+IMPORT_CHUNK = 10_000  # datas por lote na importação
+
+Record = tuple[str, date | Schedule | None]
+
+# Um histórico tem poucos milhares de dias distintos, repetidos entre os hábitos:
+# converter cada dia uma vez só (cache limitado) acelera bastante os arquivos grandes.
+_DATE_CACHE_SIZE = 1 << 14
+_date_from_ordinal = lru_cache(maxsize=_DATE_CACHE_SIZE)(date.fromordinal)
+_isoformat = lru_cache(maxsize=_DATE_CACHE_SIZE)(date.isoformat)
+_parse_date = lru_cache(maxsize=_DATE_CACHE_SIZE)(date.fromisoformat)
+
+
+def iter_records(tracker: HabitTracker) -> Iterator[Record]:
+    """Registros do tracker, hábito por hábito, com as datas em ordem."""
+    for habit in tracker:
+        yield habit.name, None if habit.schedule is DAILY else habit.schedule
+        for ordinal in habit.snapshot():
+            yield habit.name, _date_from_ordinal(ordinal)
+
+
+def write_csv(records: Iterable[Record], f) -> int:
+    """Escreve os registros em CSV no arquivo texto 'f'. Retorna quantos foram escritos."""
+    count = 0
+
+    def rows():
+        nonlocal count
+        for name, day in records:
+            count += 1
+            if isinstance(day, Schedule):
+                yield name, "", _encode_schedule(day)
+            else:
+                yield name, _isoformat(day) if day else "", ""
+
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(CSV_HEADER)
+    writer.writerows(rows())
+    return count
+
+
+def write_ndjson(records: Iterable[Record], f) -> int:
+    """Escreve os registros em NDJSON no arquivo texto 'f'. Retorna quantos foram escritos."""
+    count = 0
+    last_name, encoded_name = None, ""
+    for name, day in records:
+        if name != last_name:
+            # O nome é codificado uma vez por hábito, não uma vez por conclusão.
+            last_name, encoded_name = name, json.dumps(name, ensure_ascii=False)
+        if day is None:
+            f.write(f'{{"habit":{encoded_name}}}\n')
+        elif isinstance(day, Schedule):
+            f.write(f'{{"habit":{encoded_name},"schedule":{_encode_schedule(day)}}}\n')
+        else:
+            f.write(f'{{"habit":{encoded_name},"date":"{_isoformat(day)}"}}\n')
+        count += 1
+    return count
+
+
+def read_csv(f) -> Iterator[Record]:
+    """Registros de um CSV (arquivo texto 'f'), na ordem do arquivo."""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    if tuple(header) not in (CSV_HEADER, LEGACY_CSV_HEADER):
+        raise ValueError(f"Cabeçalho CSV inesperado: {header!r} (esperado {','.join(CSV_HEADER)})")
+    for line_number, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        try:
+            name, day, schedule = row if len(row) == 3 else (*row, "")
+            yield _record(name, day or None, json.loads(schedule) if schedule else None)
+        except (ValueError, TypeError) as error:
+            raise ValueError(f"Linha {line_number} inválida: {error}") from None
+
+
+def read_ndjson(f) -> Iterator[Record]:
+    """Registros de um NDJSON (arquivo texto 'f'), na ordem do arquivo."""
+    for line_number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            yield _record(item["habit"], item.get("date"), item.get("schedule"))
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            raise ValueError(f"Linha {line_number} inválida: {error}") from None
+
+
+def _encode_schedule(schedule: Schedule) -> str:
+    return json.dumps(schedule.to_dict(), separators=(",", ":"))
+
+
+def _record(name: str, day: str | None, schedule: dict | None = None) -> Record:
+    if not isinstance(name, str) or not name:
+        raise ValueError("nome do hábito vazio")
+    if day is not None and not isinstance(day, str):
+        raise ValueError(f"data inválida: {day!r}")
+    if schedule:
+        if day:
+            raise ValueError("a agenda vai só na linha que declara o hábito")
+        schedule = Schedule.from_dict(schedule)
+        return name, None if schedule is DAILY else schedule
+    return name, _parse_date(day) if day else None
+
+
+def import_records(tracker: HabitTracker, records: Iterable[Record], chunk_size: int = IMPORT_CHUNK) -> int:
+    """
+    Aplica os registros ao tracker (cria hábitos, define agendas, marca datas).
+    As datas vão em lotes de até 'chunk_size' (HabitTracker.apply_operations),
+    então a memória usada não depende do tamanho do arquivo. Retorna quantos
+    foram lidos.
+    """
+    count = 0
+    last_name = None
+    operations = []
+    for name, day in records:
+        if name != last_name:
+            # Registros do mesmo hábito costumam vir juntos: uma checagem por bloco.
+            tracker.add_habit(name)
+            last_name = name
+        if isinstance(day, Schedule):
+            tracker.set_schedule(name, day)
+        elif day is not None:
+            operations.append((name, day, True))
+            if len(operations) >= chunk_size:
+                tracker.apply_operations(operations)
+                operations = []
+        count += 1
+    tracker.apply_operations(operations)
+    return count
+
+
+def detect_format(path: str) -> str:
+    """Formato pelo nome do arquivo (.csv, .ndjson/.jsonl, com ou sem .gz)."""
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".csv"):
+        return FORMAT_CSV
+    if name.endswith((".ndjson", ".jsonl")):
+        return FORMAT_NDJSON
+    raise ValueError(f"Não foi possível deduzir o formato de {path!r}; use --format.")
+
+
+def open_text(path: str, mode: str):
+    """Abre 'path' em modo texto UTF-8, comprimindo/descomprimindo se terminar em .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", compresslevel=6, encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_file(tracker: HabitTracker, path: str, file_format: str | None = None) -> int:
+    """Exporta o tracker para 'path'. Retorna quantos registros foram escritos."""
+    writer = write_csv if (file_format or detect_format(path)) == FORMAT_CSV else write_ndjson
+    with open_text(path, "w") as f:
+        return writer(iter_records(tracker), f)
+
+
+def import_file(tracker: HabitTracker, path: str, file_format: str | None = None) -> int:
+    """Importa 'path' para o tracker. Retorna quantos registros foram lidos."""
+    reader = read_csv if (file_format or detect_format(path)) == FORMAT_CSV else read_ndjson
+    with open_text(path, "r") as f:
+        return import_records(tracker, reader(f))
+
+
+def main(argv: list[str] | None = None):
+    import persistence
+
+    parser = argparse.ArgumentParser(prog="python -m import_export",
+                                     description="Importa/exporta o histórico de hábitos em CSV ou NDJSON.")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path", help="arquivo .csv, .ndjson ou .jsonl (opcionalmente .gz)")
+    parser.add_argument("--format", choices=(FORMAT_CSV, FORMAT_NDJSON), help="formato, se não der para deduzir")
+    parser.add_argument("--data", help=f"arquivo de dados (padrão: {persistence.DATA_FILE})")
+    args = parser.parse_args(argv)
+    if args.data:
+        persistence.DATA_FILE = args.data
+
+    tracker = persistence.load_data()
+    try:
+        if args.command == "export":
+            count = export_file(tracker, args.path, args.format)
+            print(f"{count} registros exportados para {args.path}")
+        else:
+            count = import_file(tracker, args.path, args.format)
+            persistence.save_data(tracker)
+            print(f"{count} registros importados de {args.path}")
+    except (OSError, ValueError) as error:
+        sys.exit(f"Erro: {error}")
+
+
+if __name__ == "__main__":
+    main()
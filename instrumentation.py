@@ -0,0 +1,299 @@
+# instrumentation.py
+"""
+Instrumentação opcional: latência por chamada e contadores do tracker, da
+persistência e da interface, para descobrir para onde vai o tempo.
+
+Desligada por padrão e sem custo nesse caso: enable() envolve os métodos
+públicos do HabitTracker e os save/load/flush dos backends com funções que
+medem cada chamada, e disable() devolve os originais. Na interface, os trechos
+medidos usam timed(), que não faz nada com a instrumentação desligada.
+
+Para ligar, defina a variável de ambiente HABITS_PROFILE (lida por
+enable_from_env, chamada pelos pontos de entrada): "1" só coleta (o relatório
+aparece no painel de desempenho da interface); qualquer outro valor é o
+caminho do arquivo JSON onde o relatório é gravado ao sair.
+
+    HABITS_PROFILE=perfil.json python main_gui.py
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import persistence
+from habit_logic import HabitTracker
+
+ENV_VAR = "HABITS_PROFILE"
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"", "0", "false", "no", "off"}
+
+# Métodos medidos quando a instrumentação está ligada.
+TRACKER_METHODS = (
+    "add_habit", "delete_habit", "get_habit", "rename_habit", "merge_habits",
+    "mark_complete", "mark_incomplete", "apply_operations", "mark_range",
+    "is_complete_today", "get_current_streak", "get_longest_streak", "get_streak_history",
+    "completions_between", "count_between", "counts_by_period", "daily_totals",
+    "set_schedule", "get_adherence",
+    "find_by_prefix", "count_by_prefix", "snapshot", "snapshot_segments",
+)
+BACKEND_METHODS = ("save", "load")
+RECORDER_METHODS = ("flush", "compact")
+
+# Subdivisões de cada potência de 2 nos histogramas (erro relativo < 19%).
+_BUCKETS_PER_OCTAVE = 4
+
+
+class Histogram:
+    """Histograma de valores positivos em faixas logarítmicas, com total, mínimo e máximo."""
+    __slots__ = ("count", "total", "min", "max", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets: dict[int, int] = {}
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        bucket = math.floor(math.log2(value) * _BUCKETS_PER_OCTAVE) if value > 0 else None
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction: float) -> float:
+        """Estimativa do percentil (limite superior da faixa, dentro de [min, max])."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(self.count * fraction), 1)
+        seen = 0
+        for bucket in sorted(self._buckets, key=lambda b: -math.inf if b is None else b):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                upper = 0.0 if bucket is None else 2 ** ((bucket + 1) / _BUCKETS_PER_OCTAVE)
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class Registry:
+    """Histogramas de tempo (segundos), de tamanho (bytes) e contadores, por nome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timers: dict[str, Histogram] = {}
+        self.sizes: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+
+    def record_time(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = Histogram()
+            histogram.add(seconds)
+
+    def record_size(self, name: str, size: int):
+        with self._lock:
+            histogram = self.sizes.get(name)
+            if histogram is None:
+                histogram = self.sizes[name] = Histogram()
+            histogram.add(size)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.sizes.clear()
+            self.counters.clear()
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "timers": {name: h.summary() for name, h in sorted(self.timers.items())},
+                "sizes": {name: h.summary() for name, h in sorted(self.sizes.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+
+registry = Registry()
+_enabled = False
+_patches: list[tuple[type, str, object]] = []  # (classe, atributo, original)
+_state_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """True se a instrumentação está ligada."""
+    return _enabled
+
+
+def count(name: str, n: int = 1):
+    """Incrementa um contador (só com a instrumentação ligada)."""
+    if _enabled:
+        registry.count(name, n)
+
+
+@contextmanager
+def _timer(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.record_time(name, time.perf_counter() - start)
+
+
+_NOOP = nullcontext()
+
+
+def timed(name: str):
+    """Context manager que mede o bloco em 'name' (não faz nada se desligada)."""
+    return _timer(name) if _enabled else _NOOP
+
+
+def _timed_method(func, name: str):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registry.record_time(name, time.perf_counter() - start)
+    return wrapper
+
+
+def _file_size(backend) -> int | None:
+    path = getattr(backend, "path", None)
+    try:
+        return os.path.getsize(path) if path else None
+    except OSError:
+        return None
+
+
+def _backend_method(func, name: str):
+    # Além do tempo, registra o tamanho do arquivo gravado/lido.
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            registry.record_time(name, time.perf_counter() - start)
+            size = _file_size(self)
+            if size is not None:
+                registry.record_size(name, size)
+    return wrapper
+
+
+def _patch(owner: type, attr: str, wrap, name: str):
+    original = owner.__dict__.get(attr)
+    if original is None:
+        return
+    _patches.append((owner, attr, original))
+    setattr(owner, attr, wrap(original, name))
+
+
+def enable():
+    """Liga a instrumentação (idempotente)."""
+    global _enabled
+    import sharded_storage  # os backends precisam estar carregados para serem envolvidos
+    import sqlite_storage
+
+    with _state_lock:
+        if _enabled:
+            return
+        for method in TRACKER_METHODS:
+            _patch(HabitTracker, method, _timed_method, f"tracker.{method}")
+        # No ShardedBackend, 'path' é o manifesto: o tamanho registrado é o dele.
+        for backend in (persistence.JsonBackend, sqlite_storage.SqliteBackend, sharded_storage.ShardedBackend):
+            for method in BACKEND_METHODS:
+                _patch(backend, method, _backend_method, f"persistence.{backend.__name__}.{method}")
+        for recorder in (persistence.Journal, sqlite_storage.SqliteRecorder):
+            for method in RECORDER_METHODS:
+                _patch(recorder, method, _timed_method, f"persistence.{recorder.__name__}.{method}")
+        _enabled = True
+
+
+def disable():
+    """Desliga a instrumentação e restaura os métodos originais (os dados coletados ficam)."""
+    global _enabled
+    with _state_lock:
+        while _patches:
+            owner, attr, original = _patches.pop()
+            setattr(owner, attr, original)
+        _enabled = False
+
+
+def reset():
+    """Descarta os dados coletados."""
+    registry.reset()
+
+
+def report() -> dict:
+    """Relatório com os histogramas e contadores coletados até agora."""
+    return registry.report()
+
+
+def dump(path: str) -> dict:
+    """Grava o relatório em 'path' (JSON) e o retorna."""
+    data = report()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+def enable_from_env() -> bool:
+    """Liga a instrumentação conforme HABITS_PROFILE (ver o docstring do módulo)."""
+    value = os.environ.get(ENV_VAR, "").strip()
+    if value.lower() in _FALSE_VALUES:
+        return False
+    enable()
+    if value.lower() not in _TRUE_VALUES:
+        atexit.register(dump, value)
+    return True
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+def format_report(data: dict | None = None) -> str:
+    """Relatório em texto, uma linha por métrica (para o painel da interface ou o terminal)."""
+    data = data or report()
+    lines = []
+    if data["timers"]:
+        lines.append(f"{'tempo':<40} {'n':>7} {'total':>10} {'p50':>10} {'p99':>10} {'máx':>10}")
+        for name, s in data["timers"].items():
+            lines.append(f"{name:<40} {s['count']:>7} {_format_seconds(s['total']):>10} "
+                         f"{_format_seconds(s['p50']):>10} {_format_seconds(s['p99']):>10} "
+                         f"{_format_seconds(s['max']):>10}")
+    if data["sizes"]:
+        lines.append("")
+        lines.append(f"{'bytes':<40} {'n':>7} {'média':>10} {'máx':>10}")
+        for name, s in data["sizes"].items():
+            lines.append(f"{name:<40} {s['count']:>7} {s['mean']:>10.0f} {s['max']:>10.0f}")
+    if data["counters"]:
+        lines.append("")
+        for name, value in data["counters"].items():
+            lines.append(f"{name:<40} {value:>7}")
+    return "\n".join(lines) if lines else "Nenhuma medida coletada."
@@ -1,29 +1,62 @@
 # main_gui.py
+import atexit
+import os
+import sys
+import threading
+from contextlib import nullcontext
 import flet as ft
-from datetime import date # Manter para tipagem e fallback inicial
-from habit_logic import HabitTracker # Se HabitControl for ft.Column, importe Habit também
-from persistence import save_data, load_data
-from app_date_manager import get_current_app_date, advance_day, rewind_day, reset_to_today
+import heatmap
+import instrumentation
+from datetime import date, timedelta # Manter para tipagem e fallback inicial
+from habit_logic import HabitTracker, expand_event # Se HabitControl for ft.Column, importe Habit também
+from persistence import JsonBackend, load_data, get_backend
+from save_scheduler import SaveScheduler
+from session_store import TrackerStore, user_data_path
+from app_date_manager import DateContext, default_context
+from view_cache import DayState, DayViewCache
+
+# Dias de histórico convertidos na inicialização; o restante é lido sob demanda.
+HISTORY_WINDOW_DAYS = 90
+# Segundos sem novos cliques antes de gravar as alterações em segundo plano.
+SAVE_DEBOUNCE_SECONDS = 0.5
+# Hábitos por página na lista.
+HABITS_PER_PAGE = 50
+# Arquivo do relatório salvo pelo painel de desempenho (instrumentação ligada).
+PROFILE_REPORT_FILE = "habits_profile.json"
+# Modo servidor: pasta com um arquivo por usuário e usuários mantidos em memória.
+USERS_DATA_DIR = "users_data"
+MAX_LOADED_USERS = 256
+# Cores do mapa de calor do histórico, do nível 0 (nada concluído) ao máximo.
+HEATMAP_COLORS = [ft.Colors.with_opacity(0.08, ft.Colors.ON_SURFACE), ft.Colors.GREEN_200,
+                  ft.Colors.GREEN_400, ft.Colors.GREEN_600, ft.Colors.GREEN_800]
+WEEKDAY_LABELS = ["S", "T", "Q", "Q", "S", "S", "D"]
+MONTH_NAMES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho",
+               "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
 
 class HabitControl(ft.Row): # Mantendo ft.Row conforme o arquivo fornecido. Se você mudou para ft.Column, mantenha sua alteração.
     """Um controle de UI customizado para representar um único hábito."""
     # Modificar o construtor para aceitar a data atual do app
-    def __init__(self, habit_name: str, tracker: HabitTracker, current_app_date: date, on_change):
+    def __init__(self, habit_name: str, tracker: HabitTracker, current_app_date: date, on_change, lock=None,
+                 state: DayState | None = None, on_history=None):
         super().__init__()
         self.habit_name = habit_name
         self.tracker = tracker
         self.current_app_date = current_app_date # Usar a data passada
         self.on_change = on_change
+        # Lock do usuário no modo servidor (sessões dele compartilham o tracker).
+        self.lock = lock or nullcontext()
         # self.today = date.today() # Remover esta linha
+        # 'state' (concluído, streak) já calculado, ex.: vindo do DayViewCache.
+        done, streak = state or self._state(current_app_date)
 
         self.checkbox = ft.Checkbox(
             # Usar current_app_date
-            value=self.tracker.is_complete_today(self.habit_name, self.current_app_date),
+            value=done,
             label=self.habit_name,
             on_change=self.toggle_completion,
         )
         # Usar current_app_date
-        self.streak_text = ft.Text(f"🔥 {self.tracker.get_current_streak(self.habit_name, self.current_app_date)}")
+        self.streak_text = ft.Text(self._streak_label(streak))
         self.delete_button = ft.IconButton(
             icon=ft.Icons.DELETE_OUTLINE,
             tooltip="Deletar hábito",
@@ -32,35 +65,252 @@ class HabitControl(ft.Row): # Mantendo ft.Row conforme o arquivo fornecido. Se v
             icon_size=20
         )
 
-        self.controls = [self.checkbox, self.streak_text, self.delete_button]
+        # on_history(nome) abre o histórico do hábito (sem ele, o botão não aparece).
+        self.history_button = ft.IconButton(
+            icon=ft.Icons.CALENDAR_MONTH_OUTLINED,
+            tooltip="Histórico",
+            on_click=lambda e: on_history(self.habit_name),
+            icon_size=20,
+            visible=on_history is not None,
+        )
+
+        self.controls = [self.checkbox, self.streak_text, self.history_button, self.delete_button]
         self.alignment = ft.MainAxisAlignment.SPACE_BETWEEN
         self.vertical_alignment = ft.CrossAxisAlignment.CENTER
 
 
     def toggle_completion(self, e):
         """Marca ou desmarca o hábito como concluído para a data atual do app."""
-        if self.checkbox.value:
-            # Usar current_app_date
-            self.tracker.mark_complete(self.habit_name, self.current_app_date)
-        else:
-            # Usar current_app_date
-            self.tracker.mark_incomplete(self.habit_name, self.current_app_date)
-        self.on_change()
+        with self.lock:
+            if self.checkbox.value:
+                # Usar current_app_date
+                self.tracker.mark_complete(self.habit_name, self.current_app_date)
+            else:
+                # Usar current_app_date
+                self.tracker.mark_incomplete(self.habit_name, self.current_app_date)
+            self.on_change()
 
     def delete_habit_click(self, e):
         """Deleta o hábito."""
-        self.tracker.delete_habit(self.habit_name)
-        self.on_change()
+        with self.lock:
+            self.tracker.delete_habit(self.habit_name)
+            self.on_change()
+
+    def _state(self, current_app_date: date) -> DayState:
+        return (self.tracker.is_complete_today(self.habit_name, current_app_date),
+                self.tracker.get_current_streak(self.habit_name, current_app_date))
+
+    def _streak_label(self, streak: int) -> str:
+        # Com meta semanal (ver habit_logic.Schedule), a streak conta semanas.
+        schedule = self.tracker.get_schedule(self.habit_name)
+        return f"🔥 {streak}" + (" sem." if schedule is not None and schedule.per_week else "")
+
+    def refresh(self, current_app_date: date, state: DayState | None = None) -> bool:
+        """Atualiza só o checkbox e a streak, e só se mudaram. Retorna True se algo mudou."""
+        self.current_app_date = current_app_date
+        done, streak = state or self._state(current_app_date)
+        streak_label = self._streak_label(streak)
+        changed = False
+        if self.checkbox.value != done:
+            self.checkbox.value = done
+            changed = True
+        if self.streak_text.value != streak_label:
+            self.streak_text.value = streak_label
+            changed = True
+        return changed
+
+class HabitListView:
+    """
+    Mostra na ListView só a fatia visível dos hábitos (uma página, filtrada por
+    prefixo do nome), servida pelo índice ordenado do HabitTracker, de modo que
+    o custo de renderizar não depende do total de hábitos.
+
+    Os HabitControl são mantidos vivos por nome enquanto estão visíveis; a cada
+    renderização só são criadas as linhas que entraram na página, e checkbox e
+    streak são atualizados nas linhas afetadas por alterações. Quando a data
+    muda, as linhas visíveis são revisadas no lugar, sem serem recriadas, com os
+    valores do 'view_cache' (se houver), que guarda os dias já vistos.
+    """
+    def __init__(self, list_view: ft.ListView, tracker: HabitTracker, on_change, page_size: int = 50,
+                 lock=None, view_cache: DayViewCache | None = None, on_history=None):
+        self.list_view = list_view
+        self.tracker = tracker
+        self.on_change = on_change
+        self.page_size = page_size
+        self.lock = lock
+        self.view_cache = view_cache
+        self.on_history = on_history
+        self.prefix = ""
+        self.offset = 0
+        self.total = 0  # hábitos que casam com o filtro atual
+        self._controls: dict[str, HabitControl] = {}
+        self._names: list[str] = []  # nomes visíveis, espelhando list_view.controls
+        self._changed: set[str] = set()
+        self._date: date | None = None
+        tracker.subscribe(self._on_tracker_event)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def names(self) -> list[str]:
+        """Nomes visíveis na página atual."""
+        return list(self._names)
+
+    def _on_tracker_event(self, event: tuple):
+        for simple_event in expand_event(event):
+            if simple_event[0] == "rename":
+                self._changed.update(simple_event[1:])  # o nome antigo e o novo
+            else:
+                self._changed.add(simple_event[1])
+
+    def close(self):
+        """Para de acompanhar o tracker (ex.: quando a sessão termina)."""
+        self.tracker.unsubscribe(self._on_tracker_event)
+        if self.view_cache is not None:
+            self.view_cache.close()
+
+    def set_prefix(self, prefix: str):
+        """Filtra por prefixo do nome e volta para a primeira página."""
+        self.prefix = prefix
+        self.offset = 0
+
+    def next_page(self):
+        if self.offset + self.page_size < self.total:
+            self.offset += self.page_size
+
+    def previous_page(self):
+        self.offset = max(self.offset - self.page_size, 0)
+
+    def render(self, app_date: date):
+        """Sincroniza a página visível com o tracker para a data 'app_date'."""
+        self.total = self.tracker.count_by_prefix(self.prefix)
+        if self.offset >= self.total:
+            # A página atual ficou vazia (ex.: hábitos deletados): volta para a última.
+            self.offset = max((self.total - 1) // self.page_size * self.page_size, 0)
+        names = self.tracker.find_by_prefix(self.prefix, self.offset, self.page_size)
+        # Troca o conjunto antes de usá-lo: eventos de outras sessões que
+        # chegarem durante a renderização ficam para a próxima.
+        changed, self._changed = self._changed, set()
+        states = self.view_cache.get(app_date, names) if self.view_cache is not None else {}
+
+        created = set()
+        if names != self._names:
+            controls = {}
+            for name in names:
+                control = self._controls.get(name)
+                if control is None:
+                    control = HabitControl(name, self.tracker, app_date, self.on_change, self.lock,
+                                           states.get(name), self.on_history)
+                    created.add(name)
+                controls[name] = control
+            self._controls = controls
+            self._names = names
+            self.list_view.controls = list(controls.values())
+
+        date_changed = app_date != self._date
+        refreshed = 0
+        for name, control in self._controls.items():
+            if name not in created and (date_changed or name in changed):
+                control.refresh(app_date, states.get(name))
+                refreshed += 1
+        self._date = app_date
+        instrumentation.count("gui.rows_created", len(created))
+        instrumentation.count("gui.rows_refreshed", refreshed)
 
 def main(page: ft.Page):
-    page.title = "Rastreador de Hábitos"
-    page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
+    """Aplicativo desktop: um usuário, dados em persistence.DATA_FILE."""
     page.window_width = 420 
     page.window_height = 700 
+
+    tracker = load_data(window_days=HISTORY_WINDOW_DAYS)
+    # Cada alteração do tracker é registrada de forma incremental pelo backend
+    # (diário no JSON, uma linha no SQLite) e gravada em segundo plano pelo
+    # agendador, que junta cliques próximos em uma única gravação.
+    recorder = get_backend().attach(tracker, autoflush=False)
+    save_scheduler = SaveScheduler(recorder.flush, debounce=SAVE_DEBOUNCE_SECONDS)
+
+    def close_storage(e=None):
+        """Grava o que estiver pendente ao fechar a sessão ou o aplicativo."""
+        save_scheduler.close()
+        recorder.close()
+
+    page.on_disconnect = close_storage
+    atexit.register(save_scheduler.close)
+
+    build_page(page, tracker, default_context(), save_scheduler.request_save)
+
+# --- Modo servidor ---
+# Várias sessões web no mesmo processo: cada sessão tem o seu DateContext e
+# cada usuário o seu tracker (e arquivo), vindos do TrackerStore compartilhado.
+# O usuário é escolhido na URL (?user=nome); sem ele, a sessão é anônima e o
+# tracker fica só em memória (nenhum arquivo é criado), sumindo quando a aba
+# fecha. Atenção: ?user= não é autenticação, só separa os dados de cada nome:
+# quem souber (ou adivinhar) um nome vê e altera os dados dele. Não exponha o
+# modo servidor fora de uma rede confiável sem um proxy que autentique.
+
+def _user_backend(user_id: str) -> JsonBackend:
+    os.makedirs(USERS_DATA_DIR, exist_ok=True)
+    return JsonBackend(user_data_path(USERS_DATA_DIR, user_id))
+
+_tracker_store: TrackerStore | None = None
+_tracker_store_lock = threading.Lock()
+
+def get_tracker_store() -> TrackerStore:
+    """TrackerStore do processo, criado na primeira sessão."""
+    global _tracker_store
+    with _tracker_store_lock:
+        if _tracker_store is None:
+            _tracker_store = TrackerStore(_user_backend, capacity=MAX_LOADED_USERS,
+                                          window_days=HISTORY_WINDOW_DAYS,
+                                          debounce=SAVE_DEBOUNCE_SECONDS)
+            atexit.register(_tracker_store.close)
+        return _tracker_store
+
+def _session_user_id(page: ft.Page) -> str | None:
+    """Usuário pedido em ?user=, ou None para uma sessão anônima."""
+    try:
+        user_id = page.query.to_dict.get("user")
+    except Exception:
+        user_id = None
+    return (user_id or "").strip() or None
+
+def server_main(page: ft.Page):
+    """Uma sessão web no modo servidor."""
+    user_id = _session_user_id(page)
+    if user_id is None:
+        # Anônimo: ninguém conseguiria voltar a esses dados, então não são gravados.
+        habit_list = build_page(page, HabitTracker(), DateContext(), lambda: None)
+        page.on_close = lambda e=None: habit_list.close()
+        return
+    store = get_tracker_store()
+    entry = store.acquire(user_id)
+    habit_list = build_page(page, entry.tracker, DateContext(), entry.request_save, entry.lock)
+    released = False
+
+    def end_session(e=None):
+        nonlocal released
+        with entry.lock:
+            if released:
+                return
+            released = True
+            habit_list.close()
+        store.release(entry)
+
+    page.on_close = end_session
+
+def build_page(page: ft.Page, tracker: HabitTracker, dates: DateContext, request_save,
+               lock=None) -> HabitListView:
+    """
+    Monta a interface para 'tracker' na página. 'dates' é a data de referência
+    da sessão, 'request_save' agenda a gravação das alterações e 'lock' (modo
+    servidor) serializa as alterações de sessões que compartilham o tracker.
+    """
+    page.title = "Rastreador de Hábitos"
+    page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     page.padding = ft.padding.all(15)
     # page.theme_mode = ft.ThemeMode.DARK # Descomente para tema escuro
-
-    tracker = load_data()
+    lock = lock or nullcontext()
 
     # --- Controles de Data Estilizados ---
     current_date_display = ft.Text(
@@ -74,12 +324,12 @@ def main(page: ft.Page):
     # Botões são definidos antes para que update_date_controls_state possa referenciá-los
     prev_day_button = ft.IconButton(
         ft.Icons.ARROW_BACK_IOS_NEW_ROUNDED,
-        on_click=lambda e: handle_date_change(rewind_day),
+        on_click=lambda e: handle_date_change(dates.rewind_day),
         tooltip="Dia Anterior"
     )
     next_day_button = ft.IconButton(
         ft.Icons.ARROW_FORWARD_IOS_ROUNDED,
-        on_click=lambda e: handle_date_change(advance_day),
+        on_click=lambda e: handle_date_change(dates.advance_day),
         tooltip="Próximo Dia"
     )
     reset_day_button = ft.TextButton(
@@ -88,13 +338,13 @@ def main(page: ft.Page):
             alignment=ft.MainAxisAlignment.CENTER,
             spacing=5,
         ),
-        on_click=lambda e: handle_date_change(reset_to_today),
+        on_click=lambda e: handle_date_change(dates.reset_to_today),
         tooltip="Ir para Hoje"
     )
 
     def update_date_controls_visual_state():
         """Atualiza o texto da data e o estado (habilitado/desabilitado) dos botões de data."""
-        app_date = get_current_app_date()
+        app_date = dates.get_current_app_date()
         today_real = date.today()
 
         # Formato da data: "09/06/2025 (Seg)"
@@ -116,7 +366,7 @@ def main(page: ft.Page):
         """Executa a ação de mudança de data e atualiza toda a UI."""
         action_function() # Executa rewind_day, advance_day ou reset_to_today
         update_date_controls_visual_state() # Atualiza os botões de data primeiro
-        update_and_save() # Atualiza a lista de hábitos e salva
+        update_view() # Atualiza a lista de hábitos (mudar a data não altera dados)
 
     date_navigation_row = ft.Row(
         [
@@ -137,16 +387,33 @@ def main(page: ft.Page):
     )
     # --- Fim dos Controles de Data ---
 
+    def update_view():
+        """Atualiza a lista de hábitos e a página."""
+        with lock, instrumentation.timed("gui.build_habit_list"):
+            build_habit_list()
+        with instrumentation.timed("gui.page_update"):
+            page.update()
+        prefetch_adjacent_days()
+
+    def prefetch_adjacent_days():
+        """Prepara em segundo plano os dias vizinhos, para a navegação por datas ser imediata."""
+        app_date = dates.get_current_app_date()
+        days = [app_date - timedelta(days=1)]
+        if app_date < date.today():
+            days.append(app_date + timedelta(days=1))
+        page.run_thread(view_cache.prefetch, days, habit_list.names)
+
     def update_and_save():
-        """Função central que atualiza a lista de hábitos, salva os dados e atualiza a página."""
-        build_habit_list() 
-        save_data(tracker)
-        page.update()
+        """Função central que atualiza a lista de hábitos e agenda a gravação das alterações."""
+        update_view()
+        request_save()
 
     def add_habit_click(e):
         habit_name = new_habit_field.value.strip()
         if habit_name:
-            if tracker.add_habit(habit_name):
+            with lock:
+                added = tracker.add_habit(habit_name)
+            if added:
                 new_habit_field.value = ""
                 new_habit_field.error_text = None
                 new_habit_field.update()
@@ -190,10 +457,11 @@ def main(page: ft.Page):
         text_align=ft.TextAlign.CENTER,
         color=ft.Colors.PRIMARY
     )
+    # A ListView rola sozinha (a coluna da página não rola), assim ela só
+    # desenha as linhas que estão na tela; e só recebe uma página de hábitos.
     habits_view = ft.ListView(
         expand=True, 
         spacing=8, 
-        auto_scroll=True,
         padding=ft.padding.only(top=5)
     )
     no_habits_message = ft.Text(
@@ -204,20 +472,69 @@ def main(page: ft.Page):
         visible=False 
     )
 
+    # Estados (concluído, streak) dos dias já vistos nesta sessão; a lista os reutiliza.
+    view_cache = DayViewCache(tracker)
+    open_history = history_dialog(page, tracker, dates, lock)
+    habit_list = HabitListView(habits_view, tracker, update_and_save, HABITS_PER_PAGE, lock,
+                               view_cache, open_history) # Passa update_and_save como callback
+    history_button = ft.IconButton(
+        ft.Icons.CALENDAR_MONTH_OUTLINED,
+        on_click=lambda e: open_history(None),
+        tooltip="Histórico de todos os hábitos",
+    )
+
+    def on_search_change(e):
+        habit_list.set_prefix(search_field.value.strip())
+        update_view()
+
+    def change_page(action_function):
+        action_function()
+        update_view()
+
+    search_field = ft.TextField(
+        hint_text="Buscar hábito...",
+        prefix_icon=ft.Icons.SEARCH,
+        on_change=on_search_change,
+        border_radius=20,
+        dense=True,
+        content_padding=ft.padding.symmetric(horizontal=15, vertical=8)
+    )
+    prev_page_button = ft.IconButton(
+        ft.Icons.CHEVRON_LEFT_ROUNDED,
+        on_click=lambda e: change_page(habit_list.previous_page),
+        tooltip="Página Anterior"
+    )
+    next_page_button = ft.IconButton(
+        ft.Icons.CHEVRON_RIGHT_ROUNDED,
+        on_click=lambda e: change_page(habit_list.next_page),
+        tooltip="Próxima Página"
+    )
+    page_info = ft.Text("", size=12, color=ft.Colors.OUTLINE)
+    pagination_row = ft.Row(
+        [prev_page_button, page_info, next_page_button],
+        alignment=ft.MainAxisAlignment.CENTER,
+        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+    )
+
     def build_habit_list():
-        habits_view.controls.clear()
-        app_date = get_current_app_date()
-        
-        sorted_user_habits = sorted(tracker.habits, key=lambda h: h.name)
+        habit_list.render(dates.get_current_app_date())
 
-        if not sorted_user_habits:
+        if len(habit_list) == 0:
+            no_habits_message.value = (
+                "Nenhum hábito encontrado." if len(tracker) else "Nenhum hábito ainda. Adicione um novo!"
+            )
             no_habits_message.visible = True
             habits_view.visible = False
         else:
             no_habits_message.visible = False
             habits_view.visible = True
-            for habit in sorted_user_habits:
-                habits_view.controls.append(HabitControl(habit.name, tracker, app_date, update_and_save)) # Passa update_and_save como callback
+
+        first = habit_list.offset + 1 if habit_list.total else 0
+        last = habit_list.offset + len(habit_list)
+        page_info.value = f"{first}–{last} de {habit_list.total}"
+        prev_page_button.disabled = habit_list.offset == 0
+        next_page_button.disabled = last >= habit_list.total
+        pagination_row.visible = habit_list.total > habit_list.page_size
 
     # --- Layout da Página ---
     page.add(
@@ -231,19 +548,159 @@ def main(page: ft.Page):
                     vertical_alignment=ft.CrossAxisAlignment.CENTER
                 ),
                 ft.Divider(height=12, thickness=1),
-                habits_view_title,
+                ft.Row([habits_view_title, history_button], alignment=ft.MainAxisAlignment.CENTER),
+                search_field,
                 no_habits_message, 
                 habits_view, 
+                pagination_row,
+                *([profile_panel_button(page)] if instrumentation.enabled() else []),
             ],
             expand=True,
-            scroll=ft.ScrollMode.ADAPTIVE,
             spacing=10 
         )
     )
 
     # Configuração inicial da UI e estado dos controles de data
     update_date_controls_visual_state() # Define o texto da data e o estado dos botões
-    update_and_save() # Constrói a lista de hábitos e atualiza a página
+    update_view() # Constrói a lista de hábitos e atualiza a página
+    return habit_list
+
+def heatmap_grid(data: heatmap.Heatmap, view: str) -> ft.Control:
+    """
+    Grade do mapa de calor: na visão do mês, uma linha por semana, com o número
+    do dia; na do ano, uma coluna por semana, em quadradinhos.
+    """
+    def cell(day_value: heatmap.HeatmapCell, size: int, label: bool) -> ft.Control:
+        if day_value is None:
+            return ft.Container(width=size, height=size)
+        day, value = day_value
+        return ft.Container(
+            width=size,
+            height=size,
+            bgcolor=HEATMAP_COLORS[data.level(value)],
+            border_radius=3 if label else 2,
+            tooltip=f"{day:%d/%m/%Y}: {value}",
+            alignment=ft.alignment.center,
+            content=ft.Text(str(day.day), size=11) if label else None,
+        )
+
+    if view == heatmap.VIEW_MONTH:
+        header = ft.Row([ft.Container(ft.Text(d, size=11, color=ft.Colors.OUTLINE), width=32,
+                                      alignment=ft.alignment.center) for d in WEEKDAY_LABELS], spacing=4)
+        rows = [ft.Row([cell(c, 32, True) for c in week], spacing=4) for week in data.weeks]
+        return ft.Column([header, *rows], spacing=4)
+    columns = [ft.Column([cell(c, 10, False) for c in week], spacing=2) for week in data.weeks]
+    return ft.Row(columns, spacing=2, scroll=ft.ScrollMode.AUTO)
+
+def history_dialog(page: ft.Page, tracker: HabitTracker, dates: DateContext, lock=None):
+    """
+    Diálogo com o histórico em mapa de calor, por mês ou por ano. Retorna a
+    função que o abre: open_history(nome) para um hábito, open_history(None)
+    para todos (a cor indica quantos foram concluídos no dia).
+    """
+    lock = lock or nullcontext()
+    state = {"names": None, "view": heatmap.VIEW_MONTH, "anchor": date.today()}
+    title = ft.Text("", weight=ft.FontWeight.BOLD)
+    period_text = ft.Text("", size=16, weight=ft.FontWeight.W_500)
+    summary_text = ft.Text("", size=12, color=ft.Colors.OUTLINE)
+    grid = ft.Container()
+    month_button = ft.TextButton("Mês", on_click=lambda e: set_view(heatmap.VIEW_MONTH))
+    year_button = ft.TextButton("Ano", on_click=lambda e: set_view(heatmap.VIEW_YEAR))
+
+    def render():
+        view, anchor = state["view"], state["anchor"]
+        start, end = heatmap.view_range(view, anchor)
+        with lock, instrumentation.timed(f"gui.heatmap_{view}"):
+            data = heatmap.build(tracker, start, end, state["names"])
+        grid.content = heatmap_grid(data, view)
+        period_text.value = (f"{MONTH_NAMES[start.month - 1]} de {start.year}" if view == heatmap.VIEW_MONTH
+                             else str(start.year))
+        days = (end - start).days + 1
+        summary_text.value = (f"{data.total} de {days} dias concluídos" if state["names"]
+                              else f"{data.total} conclusões em {days} dias")
+        month_button.disabled = view == heatmap.VIEW_MONTH
+        year_button.disabled = view == heatmap.VIEW_YEAR
+        if dialog.open:
+            dialog.update()
+
+    def set_view(view: str):
+        state["view"] = view
+        render()
+
+    def move(steps: int):
+        state["anchor"] = heatmap.shift(state["view"], state["anchor"], steps)
+        render()
+
+    dialog = ft.AlertDialog(
+        title=title,
+        content=ft.Column(
+            [
+                ft.Row([month_button, year_button], alignment=ft.MainAxisAlignment.CENTER),
+                ft.Row(
+                    [
+                        ft.IconButton(ft.Icons.CHEVRON_LEFT_ROUNDED, on_click=lambda e: move(-1),
+                                      tooltip="Anterior"),
+                        period_text,
+                        ft.IconButton(ft.Icons.CHEVRON_RIGHT_ROUNDED, on_click=lambda e: move(1),
+                                      tooltip="Próximo"),
+                    ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
+                grid,
+                summary_text,
+            ],
+            tight=True,
+            width=620,
+        ),
+        actions=[ft.TextButton("Fechar", on_click=lambda e: page.close(dialog))],
+    )
+
+    def open_history(name: str | None):
+        state["names"] = [name] if name is not None else None
+        state["anchor"] = dates.get_current_app_date()
+        title.value = name if name is not None else "Todos os hábitos"
+        render()
+        page.open(dialog)
+
+    return open_history
+
+def profile_panel_button(page: ft.Page) -> ft.Control:
+    """Botão que abre o painel com o relatório da instrumentação (HABITS_PROFILE ligado)."""
+    report_text = ft.Text("", font_family="monospace", size=11, selectable=True)
+
+    def save_report(e):
+        instrumentation.dump(PROFILE_REPORT_FILE)
+        page.open(ft.SnackBar(ft.Text(f"Relatório salvo em {PROFILE_REPORT_FILE}")))
+
+    def reset_report(e):
+        instrumentation.reset()
+        report_text.value = instrumentation.format_report()
+        report_text.update()
+
+    dialog = ft.AlertDialog(
+        title=ft.Text("Desempenho"),
+        content=ft.Column([report_text], scroll=ft.ScrollMode.AUTO, height=400, width=700),
+        actions=[
+            ft.TextButton("Zerar", on_click=reset_report),
+            ft.TextButton("Salvar", on_click=save_report),
+            ft.TextButton("Fechar", on_click=lambda e: page.close(dialog)),
+        ],
+    )
+
+    def open_panel(e):
+        report_text.value = instrumentation.format_report()
+        page.open(dialog)
+
+    return ft.Row(
+        [ft.TextButton("Desempenho", icon=ft.Icons.SPEED_ROUNDED, on_click=open_panel)],
+        alignment=ft.MainAxisAlignment.END,
+    )
 
 if __name__ == "__main__":
-    ft.app(target=main)
\ No newline at end of file
+    instrumentation.enable_from_env()
+    # 'python main_gui.py --server [porta]' serve várias sessões pelo navegador.
+    if "--server" in sys.argv[1:]:
+        args = [a for a in sys.argv[1:] if a != "--server"]
+        ft.app(target=server_main, view=ft.AppView.WEB_BROWSER, port=int(args[0]) if args else 8550)
+    else:
+        ft.app(target=main)
\ No newline at end of file
@@ -1,35 +1,601 @@
 # persistence.py
 import json
-from datetime import date
-from habit_logic import Habit, HabitTracker
+import os
+import stat
+import tempfile
+import threading
+import weakref
+from bisect import bisect_left
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+import binary_format
+from habit_logic import Habit, HabitTracker, Schedule, expand_event
+from completion_store import CompletionStore
+
+if TYPE_CHECKING:
+    # Só para as anotações: asyncio é importado sob demanda pela API assíncrona,
+    # para não pesar na inicialização de quem não a usa (ex.: cli.py).
+    import asyncio
+    from concurrent.futures import Executor
 
 DATA_FILE = "habits_data.json"
+CORRUPT_SUFFIX = ".corrupt"  # um DATA_FILE ilegível é preservado com este sufixo
+
+# --- Diário (journal) ---
+# No modo diário cada alteração do tracker vira uma linha JSON compacta anexada
+# a DATA_FILE + JOURNAL_SUFFIX, em vez de regravar o arquivo inteiro a cada clique.
+# De tempos em tempos o diário é compactado: um snapshot completo é salvo em
+# DATA_FILE e o diário é esvaziado. load_data lê o snapshot e reaplica o diário.
+JOURNAL_SUFFIX = ".journal"
+COMPACT_EVERY = 500  # eventos no diário antes de compactar
+
+_EVENT_CODES = {"add": "+", "delete": "-", "complete": "c", "incomplete": "u", "rename": "r", "schedule": "s"}
+
+# --- Durabilidade ---
+# Os snapshots são gravados num arquivo temporário e renomeados por cima do
+# original (os.replace é atômico), então uma queda no meio da escrita nunca deixa
+# DATA_FILE truncado. A política de fsync define quando os dados são forçados
+# para o disco, trocando vazão por durabilidade:
+# - "always": fsync em toda gravação (snapshot ou linha do diário);
+# - "batch":  fsync a cada FSYNC_BATCH_SIZE gravações; uma queda do sistema
+#             pode perder as últimas gravações, mas não corrompe o arquivo;
+# - "never":  deixa a cargo do sistema operacional.
+FSYNC_ALWAYS = "always"
+FSYNC_BATCH = "batch"
+FSYNC_NEVER = "never"
+FSYNC_POLICY = FSYNC_ALWAYS
+FSYNC_BATCH_SIZE = 20
+
+_writes_since_fsync = 0
+# Saves assíncronos, threads dos shards e requisições HTTP gravam ao mesmo tempo.
+_fsync_lock = threading.Lock()
+
+def set_fsync_policy(policy: str, batch_size: int | None = None):
+    """Define a política de fsync ("always", "batch" ou "never")."""
+    global FSYNC_POLICY, FSYNC_BATCH_SIZE, _writes_since_fsync
+    if policy not in (FSYNC_ALWAYS, FSYNC_BATCH, FSYNC_NEVER):
+        raise ValueError(f"Política de fsync desconhecida: {policy!r}")
+    if batch_size is not None:
+        if batch_size < 1:
+            raise ValueError("O tamanho do lote deve ser positivo.")
+        FSYNC_BATCH_SIZE = batch_size
+    with _fsync_lock:
+        FSYNC_POLICY = policy
+        _writes_since_fsync = 0
+
+def _should_fsync() -> bool:
+    """Decide, segundo a política atual, se a gravação corrente deve ir ao disco."""
+    global _writes_since_fsync
+    if FSYNC_POLICY == FSYNC_ALWAYS:
+        return True
+    if FSYNC_POLICY == FSYNC_NEVER:
+        return False
+    with _fsync_lock:
+        _writes_since_fsync += 1
+        if _writes_since_fsync >= FSYNC_BATCH_SIZE:
+            _writes_since_fsync = 0
+            return True
+        return False
+
+# --- Formato do snapshot ---
+# - "json":   legível, uma data ISO por conclusão (padrão);
+# - "binary": binary_format, com as sequências de cada hábito em codificação
+#             delta (e zlib se BINARY_COMPRESS), bem menor e mais rápido de ler.
+# A carga detecta o formato pelo conteúdo do arquivo, então trocar de formato
+# não exige migração: o próximo snapshot já sai no formato novo.
+FORMAT_JSON = "json"
+FORMAT_BINARY = "binary"
+SNAPSHOT_FORMAT = FORMAT_JSON
+BINARY_COMPRESS = True
+
+def set_snapshot_format(snapshot_format: str, compress: bool | None = None):
+    """Define o formato dos próximos snapshots ("json" ou "binary")."""
+    global SNAPSHOT_FORMAT, BINARY_COMPRESS
+    if snapshot_format not in (FORMAT_JSON, FORMAT_BINARY):
+        raise ValueError(f"Formato de snapshot desconhecido: {snapshot_format!r}")
+    SNAPSHOT_FORMAT = snapshot_format
+    if compress is not None:
+        BINARY_COMPRESS = compress
+
+def _fsync_directory(directory: str):
+    """Garante que a renomeação em 'directory' chegou ao disco (só em POSIX)."""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _current_umask() -> int:
+    # Só dá para ler a umask trocando-a; por isso é lida uma vez, na importação.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+# Permissões de um arquivo novo, como as que open(path, "w") daria.
+_NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+def _atomic_write(path: str, data: str | bytes):
+    """Grava 'data' (texto em UTF-8 ou bytes) em 'path' via arquivo temporário + os.replace."""
+    sync = _should_fsync()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        # mkstemp cria o temporário só com permissão do dono (0600): o arquivo
+        # gravado fica com as permissões do que ele substitui ou, se for novo,
+        # com as de um open() comum (respeitando a umask).
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = _NEW_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if sync:
+        _fsync_directory(directory)
+
+def _preserve_corrupt(path: str) -> str:
+    """
+    Renomeia o arquivo ilegível 'path' para path + CORRUPT_SUFFIX, ou, se já
+    houver uma cópia de uma corrupção anterior, para path + ".N" + CORRUPT_SUFFIX
+    com o primeiro N livre: nenhuma cópia guardada é sobrescrita. Devolve o nome usado.
+    """
+    target = path + CORRUPT_SUFFIX
+    n = 1
+    while os.path.exists(target):
+        target = f"{path}.{n}{CORRUPT_SUFFIX}"
+        n += 1
+    os.replace(path, target)
+    return target
+
+# Um lock por arquivo de dados, compartilhado por todos os backends e diários
+# que apontam para ele: o snapshot e o esvaziamento do diário acontecem juntos,
+# sem que uma linha anexada no meio do caminho seja apagada.
+_file_locks: dict[str, threading.RLock] = {}
+_file_locks_guard = threading.Lock()
+
+def _file_lock(path: str) -> threading.RLock:
+    key = os.path.abspath(path)
+    with _file_locks_guard:
+        lock = _file_locks.get(key)
+        if lock is None:
+            lock = _file_locks[key] = threading.RLock()
+        return lock
+
+def journal_path(data_file: str | None = None) -> str:
+    """Caminho do diário associado a 'data_file' (por padrão, o DATA_FILE atual)."""
+    return (data_file or DATA_FILE) + JOURNAL_SUFFIX
+
+# --- Backends de armazenamento ---
+# save_data/load_data delegam ao backend configurado com set_backend. O padrão
+# é o JsonBackend (snapshot JSON + diário); sqlite_storage.SqliteBackend guarda
+# os dados em um banco SQLite.
+
+class StorageBackend:
+    """Interface dos backends usados por save_data/load_data."""
+
+    def save(self, tracker: HabitTracker):
+        """Grava o estado completo do tracker."""
+        raise NotImplementedError
+
+    def load(self, store: type[CompletionStore] = None, window_days: int | None = None,
+             today: date | None = None) -> HabitTracker:
+        """
+        Carrega um tracker com todos os hábitos salvos. Com 'window_days', só as
+        conclusões dos últimos 'window_days' dias (até 'today') são carregadas de
+        imediato; as mais antigas ficam pendentes e são lidas sob demanda
+        (ver Habit.set_lazy_history).
+        """
+        raise NotImplementedError
+
+    def attach(self, tracker: HabitTracker, autoflush: bool = True):
+        """
+        Passa a persistir cada alteração do tracker de forma incremental.
+        Retorna um objeto com flush() e close(); com autoflush=False as
+        alterações só são gravadas quando flush() for chamado.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Libera os recursos do backend (conexões, arquivos abertos)."""
+
+class JsonBackend(StorageBackend):
+    """Snapshot (JSON ou binário) em um arquivo, com diário de alterações ao lado."""
+
+    def __init__(self, path: str | None = None, snapshot_format: str | None = None):
+        # Sem 'path'/'snapshot_format', usa DATA_FILE/SNAPSHOT_FORMAT vigentes
+        # no momento de cada operação.
+        self._path = path
+        self._format = snapshot_format
+
+    @property
+    def path(self) -> str:
+        return self._path or DATA_FILE
+
+    @property
+    def snapshot_format(self) -> str:
+        return self._format or SNAPSHOT_FORMAT
+
+    def save(self, tracker: HabitTracker):
+        path = self.path
+        with _file_lock(path):
+            # Os snapshots do tracker não bloqueiam quem continua alterando os dados.
+            schedules = tracker.schedules()
+            if self.snapshot_format == FORMAT_BINARY:
+                payload = binary_format.encode(tracker.snapshot_segments(), compress=BINARY_COMPRESS,
+                                               schedules=schedule_fields(schedules))
+            else:
+                data_to_save = {
+                    "habits": [
+                        {
+                            "name": name,
+                            "completions": [date.fromordinal(o).isoformat() for o in ordinals],
+                            # Só hábitos com agenda têm a chave (ver habit_logic.Schedule).
+                            **({"schedule": schedules[name].to_dict()} if name in schedules else {}),
+                        }
+                        for name, ordinals in tracker.snapshot()
+                    ]
+                }
+                payload = json.dumps(data_to_save, indent=2)
+            _atomic_write(path, payload)
+            # O snapshot já contém tudo o que estava no diário; o que for anexado
+            # depois dele espera este lock e não é apagado.
+            if os.path.exists(journal_path(path)):
+                with open(journal_path(path), "r+", encoding="utf-8") as f:
+                    f.truncate(0)
+
+    def load(self, store: type[CompletionStore] = None, window_days: int | None = None,
+             today: date | None = None) -> HabitTracker:
+        tracker = HabitTracker(store=store)
+        cutoff = lazy_cutoff(window_days, today)
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            if binary_format.is_binary(raw):
+                self._load_binary(tracker, raw, cutoff)
+            else:
+                self._load_json(tracker, raw, cutoff)
+        except FileNotFoundError:
+            # Se o arquivo não existe, retorna um tracker vazio
+            pass
+        except ValueError:
+            # Arquivo corrompido (JSON inválido, binário truncado...): retorna um
+            # tracker vazio, mas guarda o arquivo com outro nome para que o
+            # próximo save não apague o que ainda resta dele.
+            tracker = HabitTracker(store=store)
+            _preserve_corrupt(self.path)
+        _replay_journal(tracker, journal_path(self.path))
+        return tracker
+
+    @staticmethod
+    def _load_json(tracker: HabitTracker, raw: bytes, cutoff: date | None):
+        data = json.loads(raw)
+        for habit_data in data.get("habits", []):
+            tracker.insert_habit(habit_from_iso(habit_data["name"], habit_data["completions"],
+                                                tracker.store, cutoff,
+                                                Schedule.from_dict(habit_data.get("schedule"))))
+
+    @staticmethod
+    def _load_binary(tracker: HabitTracker, raw: bytes, cutoff: date | None):
+        habits, schedules = binary_format.decode_with_schedules(raw)
+        for name, starts, ends in habits:
+            schedule = Schedule(*schedules[name]) if name in schedules else None
+            tracker.insert_habit(habit_from_segments(name, starts, ends, tracker.store, cutoff, schedule))
+
+    def attach(self, tracker: HabitTracker, autoflush: bool = True) -> "Journal":
+        return Journal(tracker, backend=self, autoflush=autoflush)
+
+def lazy_cutoff(window_days: int | None, today: date | None = None) -> date | None:
+    """Primeiro dia da janela carregada de imediato (None se a carga não é preguiçosa)."""
+    if window_days is None:
+        return None
+    if window_days < 1:
+        raise ValueError("A janela deve ter pelo menos um dia.")
+    return (today or date.today()) - timedelta(days=window_days - 1)
+
+def _iso_ordinals_loader(d_strs: list[str]):
+    return lambda: (date.fromisoformat(d_str).toordinal() for d_str in d_strs)
+
+def schedule_fields(schedules: dict[str, Schedule]) -> dict[str, binary_format.ScheduleFields]:
+    """Agendas no formato de binary_format.encode."""
+    return {name: (schedule.weekdays, schedule.per_week) for name, schedule in schedules.items()}
+
+def habit_from_iso(name: str, d_strs: list[str], store: type[CompletionStore] = None,
+                   cutoff: date | None = None, schedule: Schedule | None = None) -> Habit:
+    """
+    Hábito a partir das datas ISO de um snapshot JSON. Com 'cutoff', as datas
+    anteriores a ele ficam como histórico preguiçoso (ver Habit.set_lazy_history).
+    'schedule' é a agenda gravada (None: diária).
+    """
+    # Datas ISO comparam como strings, então separar as antigas não exige convertê-las.
+    cutoff_iso = cutoff.isoformat() if cutoff else ""
+    completions = {date.fromisoformat(d_str) for d_str in d_strs if d_str >= cutoff_iso}
+    habit = Habit(name=name, completions=completions, store=store)
+    if schedule is not None:
+        habit.set_schedule(schedule)
+    older = [d_str for d_str in d_strs if d_str < cutoff_iso] if cutoff else None
+    if older:
+        habit.set_lazy_history(cutoff, _iso_ordinals_loader(older))
+    return habit
+
+def habit_from_segments(name: str, starts, ends, store: type[CompletionStore] = None,
+                        cutoff: date | None = None, schedule: Schedule | None = None) -> Habit:
+    """Hábito a partir dos segmentos de um snapshot binário (com 'cutoff', como em habit_from_iso)."""
+    first = cutoff.toordinal() if cutoff else 0
+    # As sequências vêm em ordem: a janela recente é uma fatia delas,
+    # com a que atravessa o início da janela cortada em duas.
+    split = bisect_left(ends, first)
+    older_starts, older_ends = starts[:split], ends[:split]
+    starts, ends = starts[split:], ends[split:]
+    if starts and starts[0] < first:
+        older_starts.append(starts[0])
+        older_ends.append(first - 1)
+        starts[0] = first
+    habit = Habit.from_segments(name, starts, ends, store)
+    if schedule is not None:
+        habit.set_schedule(schedule)
+    if older_starts:
+        habit.set_lazy_history(cutoff, lambda: binary_format.segment_ordinals(older_starts, older_ends))
+    return habit
+
+_backend: StorageBackend | None = None
+
+def set_backend(backend: StorageBackend | None):
+    """Define o backend usado por save_data/load_data (None volta ao JSON padrão)."""
+    global _backend
+    _backend = backend
+
+def get_backend() -> StorageBackend:
+    """Backend atual; por padrão, JSON em DATA_FILE."""
+    return _backend or JsonBackend()
 
 def save_data(tracker: HabitTracker):
-    """Salva os dados dos hábitos em um arquivo JSON."""
-    data_to_save = {
-        "habits": [
-            {
-                "name": habit.name,
-                "completions": [d.isoformat() for d in habit.completions]
-            }
-            for habit in tracker.habits
-        ]
-    }
-    with open(DATA_FILE, "w") as f:
-        json.dump(data_to_save, f, indent=2)
-
-def load_data() -> HabitTracker:
-    """Carrega os dados dos hábitos do arquivo JSON."""
-    tracker = HabitTracker()
+    """Salva os dados dos hábitos (por padrão, em um arquivo JSON)."""
+    get_backend().save(tracker)
+
+def load_data(store: type[CompletionStore] = None, window_days: int | None = None) -> HabitTracker:
+    """
+    Carrega os dados dos hábitos (por padrão, do arquivo JSON e do seu diário).
+    'store' escolhe o armazenamento das conclusões (ex.: ArrayCompletionStore).
+    'window_days' ativa a carga preguiçosa: só os dias recentes são convertidos
+    na inicialização e o histórico mais antigo é lido quando for necessário.
+    """
+    return get_backend().load(store, window_days=window_days)
+
+# --- API assíncrona ---
+# Para handlers async (Flet) e servidores asyncio: a serialização e a E/S rodam
+# num executor, sem travar o event loop. Pedidos de gravação do mesmo tracker
+# são agrupados: enquanto um save roda, os pedidos que chegam são atendidos
+# juntos pelo save seguinte, que já enxerga todas as alterações feitas até ele
+# começar. Cancelar quem está esperando não cancela a gravação em andamento.
+
+class _AsyncSaves:
+    """Estado dos saves assíncronos de um tracker (um por tracker e event loop)."""
+
+    def __init__(self, loop: "asyncio.AbstractEventLoop"):
+        self.loop = loop
+        self.waiters: list[asyncio.Future] = []  # esperam o próximo save a começar
+        self.task: asyncio.Task | None = None
+
+_async_saves: "weakref.WeakKeyDictionary[HabitTracker, _AsyncSaves]" = weakref.WeakKeyDictionary()
+
+async def save_data_async(tracker: HabitTracker, executor: "Executor | None" = None):
+    """
+    Versão assíncrona de save_data: retorna quando um save iniciado depois
+    desta chamada terminar. 'executor' é o do event loop, se não for dado.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    state = _async_saves.get(tracker)
+    if state is None or state.loop is not loop:
+        state = _async_saves[tracker] = _AsyncSaves(loop)
+    done = loop.create_future()
+    state.waiters.append(done)
+    if state.task is None:
+        state.task = loop.create_task(_run_async_saves(tracker, state, executor))
+    await asyncio.shield(done)
+
+async def _run_async_saves(tracker: HabitTracker, state: _AsyncSaves, executor: "Executor | None"):
+    try:
+        while state.waiters:
+            waiters, state.waiters = state.waiters, []
+            try:
+                await state.loop.run_in_executor(executor, get_backend().save, tracker)
+            except Exception as error:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(error)
+                        # Evita o aviso de exceção não lida se quem esperava foi cancelado.
+                        waiter.add_done_callback(lambda f: f.exception())
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+    finally:
+        state.task = None
+
+async def load_data_async(store: type[CompletionStore] = None, window_days: int | None = None,
+                          executor: "Executor | None" = None) -> HabitTracker:
+    """Versão assíncrona de load_data (a leitura roda em 'executor')."""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    backend = get_backend()
+    return await loop.run_in_executor(executor, lambda: backend.load(store, window_days=window_days))
+
+def _encode_event(event: tuple) -> str:
+    kind, name, *rest = event
+    record = [_EVENT_CODES[kind], name] + [
+        v.isoformat() if isinstance(v, date) else v.to_dict() if isinstance(v, Schedule) else v for v in rest
+    ]
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+def _replay_journal(tracker: HabitTracker, path: str) -> int:
+    """Reaplica os eventos do diário sobre o tracker. Retorna quantos foram aplicados."""
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return 0
+    applied = 0
+    # Marcações consecutivas (ex.: as de um lote) são reaplicadas juntas.
+    operations: list[tuple[str, date, bool]] = []
+    with f:
+        for line in f:
+            try:
+                code, name, *rest = json.loads(line)
+                if code in ("c", "u"):
+                    operations.append((name, date.fromisoformat(rest[0]), code == "c"))
+                    applied += 1
+                    continue
+                argument = rest[0] if code == "r" else Schedule.from_dict(rest[0]) if code == "s" else None
+            except (ValueError, TypeError, IndexError):
+                # Linha incompleta (ex.: queda no meio da escrita): ignora.
+                continue
+            if code not in ("+", "-", "r", "s"):
+                continue
+            if operations:
+                tracker.apply_operations(operations)
+                operations = []
+            if code == "+":
+                tracker.add_habit(name)
+            elif code == "-":
+                tracker.delete_habit(name)
+            elif code == "r":
+                tracker.rename_habit(name, argument)
+            elif code == "s":
+                tracker.set_schedule(name, argument)
+            applied += 1
+        if operations:
+            tracker.apply_operations(operations)
+    return applied
+
+def _repair_journal(path: str) -> int:
+    """
+    Corta do diário uma última linha incompleta (queda no meio da escrita),
+    para que o próximo evento anexado não seja colado nela e perdido junto.
+    Retorna quantas linhas completas o diário tem.
+    """
     try:
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-            for habit_data in data.get("habits", []):
-                completions = {date.fromisoformat(d_str) for d_str in habit_data["completions"]}
-                habit = Habit(name=habit_data["name"], completions=completions)
-                tracker.habits.append(habit)
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Se o arquivo não existe ou está corrompido, retorna um tracker vazio
-        pass
-    return tracker
\ No newline at end of file
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+            return data.count(b"\n")
+    except FileNotFoundError:
+        return 0
+
+class Journal:
+    """
+    Anexa ao diário cada alteração feita no tracker (custo O(1) por clique)
+    e compacta em um snapshot a cada 'compact_every' eventos.
+
+    Com autoflush=False os eventos ficam num buffer em memória e só vão para o
+    disco em flush() (ex.: chamado por um save_scheduler.SaveScheduler numa
+    thread em segundo plano), várias linhas de uma vez. Com autoflush=True cada
+    evento é gravado na hora, e a compactação roda numa thread própria: record()
+    é chamado dentro do _write_lock do tracker, e um snapshot completo ali
+    travaria todas as alterações enquanto o arquivo é gravado.
+    """
+    def __init__(self, tracker: HabitTracker, compact_every: int = COMPACT_EVERY,
+                 backend: JsonBackend | None = None, autoflush: bool = True):
+        self.tracker = tracker
+        self.compact_every = compact_every
+        self.autoflush = autoflush
+        # O backend é fixado aqui para que diário e snapshot fiquem no mesmo lugar.
+        self.backend = backend or JsonBackend(DATA_FILE)
+        self.path = journal_path(self.backend.path)
+        with _file_lock(self.backend.path):
+            self.events = _repair_journal(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._buffer: list[str] = []
+        # _lock protege o buffer e _compactor (segurado só por instantes); _io_lock
+        # ordena as escritas no arquivo, a compactação e os saves do mesmo arquivo de dados.
+        self._lock = threading.Lock()
+        self._io_lock = _file_lock(self.backend.path)
+        self._compactor: threading.Thread | None = None
+        tracker.subscribe(self.record)
+
+    def record(self, event: tuple):
+        """Registra um evento do tracker no diário (um lote vira várias linhas, gravadas juntas)."""
+        lines = [_encode_event(e) + "\n" for e in expand_event(event)]
+        with self._lock:
+            self._buffer.extend(lines)
+            self.events += len(lines)
+            # Sem autoflush, quem grava é flush() (ex.: na thread do SaveScheduler),
+            # e a compactação também fica para ele.
+            if not self.autoflush:
+                return
+            # Durante a compactação as linhas ficam no buffer: a thread dela as
+            # grava depois do snapshot, sem que este evento espere pelo arquivo.
+            compacting = self._compactor is not None
+            if not compacting and self.events >= self.compact_every:
+                self._compactor = threading.Thread(target=self._compact_in_background,
+                                                   name="journal-compact", daemon=True)
+                self._compactor.start()
+                compacting = True
+        if not compacting:
+            self._write_buffer()
+
+    def _compact_in_background(self):
+        try:
+            self.compact()
+        finally:
+            with self._lock:
+                self._compactor = None
+            self._write_buffer()
+
+    def _wait_for_compaction(self):
+        with self._lock:
+            compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+
+    def flush(self):
+        """
+        Grava no arquivo os eventos ainda em memória (ou compacta, se o diário
+        cresceu demais), depois de esperar uma compactação em andamento.
+        """
+        self._wait_for_compaction()
+        with self._io_lock:
+            with self._lock:
+                should_compact = self.events >= self.compact_every
+            if should_compact:
+                self.compact()
+            else:
+                self._write_buffer()
+
+    def _write_buffer(self):
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            self._file.write("".join(lines))
+            self._file.flush()
+            if _should_fsync():
+                os.fsync(self._file.fileno())
+
+    def compact(self):
+        """Salva um snapshot completo e esvazia o diário."""
+        with self._io_lock:
+            with self._lock:
+                self._buffer.clear()
+                self.events = 0
+            self.backend.save(self.tracker)
+
+    def close(self):
+        """Para de registrar eventos, grava o que falta e fecha o arquivo do diário."""
+        self.tracker.unsubscribe(self.record)
+        self.flush()
+        self._file.close()
@@ -0,0 +1,131 @@
+# save_scheduler.py
+"""
+Agendador de gravações em segundo plano.
+
+Em vez de gravar no disco a cada clique (na thread que trata os eventos da
+interface), quem altera os dados chama request_save(): o agendador marca que há
+algo pendente e, numa thread própria, espera 'debounce' segundos sem novos
+pedidos antes de gravar. Rajadas de cliques viram uma única gravação.
+flush()/close() garantem a gravação pendente (ex.: ao fechar o aplicativo).
+
+Com a instrumentação ligada, pedidos, gravações, pedidos absorvidos por uma
+gravação já pendente e erros aparecem nos contadores save_scheduler.* do
+relatório (painel Desempenho, instrumentation.dump).
+"""
+import threading
+import time
+from collections.abc import Callable
+import instrumentation
+
+DEFAULT_DEBOUNCE = 0.5  # segundos sem novos pedidos antes de gravar
+MAX_DELAY_FACTOR = 10   # uma gravação nunca espera mais que debounce * MAX_DELAY_FACTOR
+
+
+class SaveScheduler:
+    """Agrupa pedidos de gravação e executa 'save()' numa thread em segundo plano."""
+
+    def __init__(self, save: Callable[[], None], debounce: float = DEFAULT_DEBOUNCE):
+        self._save = save
+        self.debounce = debounce
+        self.requested = 0   # pedidos recebidos
+        self.performed = 0   # gravações efetivamente executadas
+        self.errors = 0
+        self.last_error: Exception | None = None
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._saving = False
+        self._closed = False
+        self._first_request = 0.0
+        self._last_request = 0.0
+        self._thread = threading.Thread(target=self._run, name="save-scheduler", daemon=True)
+        self._thread.start()
+
+    def request_save(self):
+        """Marca os dados como alterados; a gravação acontece depois do debounce."""
+        with self._cond:
+            now = time.monotonic()
+            coalesced = self._dirty
+            if not coalesced:
+                self._first_request = now
+            self._dirty = True
+            self._last_request = now
+            self.requested += 1
+            self._cond.notify_all()
+        instrumentation.count("save_scheduler.requested")
+        if coalesced:
+            instrumentation.count("save_scheduler.coalesced")
+
+    def flush(self):
+        """Grava agora o que estiver pendente e espera a gravação terminar."""
+        with self._cond:
+            while self._saving:
+                self._cond.wait()
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._saving = True
+        self._perform()
+
+    def close(self):
+        """Garante a última gravação e encerra a thread do agendador."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+
+    def stats(self) -> dict[str, int]:
+        """Contadores de pedidos e gravações (coalesced = pedidos absorvidos por outra gravação)."""
+        with self._cond:
+            return {
+                "requested": self.requested,
+                "performed": self.performed,
+                "coalesced": max(self.requested - self.performed, 0),
+                "errors": self.errors,
+                "pending": int(self._dirty),
+            }
+
+    def _deadline(self) -> float:
+        return min(self._last_request + self.debounce,
+                   self._first_request + self.debounce * MAX_DELAY_FACTOR)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._dirty or self._saving):
+                    self._cond.wait()
+                if self._closed:
+                    return  # close() faz a gravação final
+                while self._dirty and not self._closed:
+                    remaining = self._deadline() - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed or not self._dirty or self._saving:
+                    continue
+                self._dirty = False
+                self._saving = True
+            self._perform()
+
+    def _perform(self):
+        """Executa a gravação; chamada com _saving já marcado."""
+        try:
+            self._save()
+        except Exception as error:
+            # Mantém os dados como pendentes para a próxima tentativa.
+            with self._cond:
+                self.errors += 1
+                self.last_error = error
+                self._dirty = True
+                self._first_request = self._last_request = time.monotonic()
+            instrumentation.count("save_scheduler.errors")
+        else:
+            with self._cond:
+                self.performed += 1
+            instrumentation.count("save_scheduler.performed")
+        finally:
+            with self._cond:
+                self._saving = False
+                self._cond.notify_all()
@@ -0,0 +1,170 @@
+# session_store.py
+"""
+Cache em processo dos trackers de vários usuários, para o modo servidor.
+
+Cada usuário tem uma entrada com o seu tracker, o backend onde ele é salvo,
+o gravador incremental + agendador de gravações e um lock próprio, de modo
+que sessões de usuários diferentes nunca esperam umas pelas outras. Várias
+sessões do mesmo usuário compartilham a entrada. Quando há mais usuários
+carregados que 'capacity', os menos usados recentemente e sem sessões abertas
+são gravados e descarregados (LRU).
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from habit_logic import HabitTracker
+from persistence import StorageBackend
+from save_scheduler import DEFAULT_DEBOUNCE, SaveScheduler
+
+DEFAULT_CAPACITY = 256
+
+_SAFE_USER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def user_data_path(directory: str, user_id: str, suffix: str = ".json") -> str:
+    """Caminho do arquivo de um usuário; ids fora de [A-Za-z0-9_-] viram um hash."""
+    if not _SAFE_USER_ID.match(user_id):
+        user_id = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(directory, user_id + suffix)
+
+
+class UserEntry:
+    """Tracker carregado de um usuário e o que é preciso para persisti-lo."""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        # Serializa as alterações do usuário e a carga/descarga da entrada.
+        self.lock = threading.RLock()
+        self.sessions = 0
+        self.tracker: HabitTracker | None = None
+        self.backend: StorageBackend | None = None
+        self.recorder = None
+        self.scheduler: SaveScheduler | None = None
+        # Sinalizado quando a entrada, já fora do TrackerStore, terminou de gravar e descarregar.
+        self.unloaded = threading.Event()
+
+    def request_save(self):
+        """Agenda a gravação das alterações do usuário em segundo plano."""
+        self.scheduler.request_save()
+
+    def _load(self, backend: StorageBackend, window_days: int | None, debounce: float):
+        self.backend = backend
+        self.tracker = backend.load(window_days=window_days)
+        self.recorder = backend.attach(self.tracker, autoflush=False)
+        self.scheduler = SaveScheduler(self.recorder.flush, debounce=debounce)
+
+    def _unload(self):
+        self.scheduler.close()
+        self.recorder.close()
+        self.backend.close()
+        self.tracker = self.backend = self.recorder = self.scheduler = None
+
+
+class TrackerStore:
+    """Entradas por usuário com lock próprio e descarte LRU (ver o docstring do módulo)."""
+
+    def __init__(self, backend_factory: Callable[[str], StorageBackend],
+                 capacity: int = DEFAULT_CAPACITY, window_days: int | None = None,
+                 debounce: float = DEFAULT_DEBOUNCE):
+        self.backend_factory = backend_factory
+        self.capacity = capacity
+        self.window_days = window_days
+        self.debounce = debounce
+        self.loads = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, UserEntry] = OrderedDict()
+        # Entradas descartadas que ainda estão gravando o que tinham pendente:
+        # uma nova carga do mesmo usuário espera por elas para ler o arquivo completo.
+        self._unloading: dict[str, UserEntry] = {}
+        # Protege só os dicionários de entradas; carga e gravação usam o lock da entrada.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def acquire(self, user_id: str) -> UserEntry:
+        """
+        Abre uma sessão do usuário: retorna a entrada com o tracker carregado.
+        Cada acquire deve ter um release correspondente.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(user_id)
+                if entry is None:
+                    entry = UserEntry(user_id)
+                    self._entries[user_id] = entry
+                self._entries.move_to_end(user_id)
+                entry.sessions += 1
+                previous = self._unloading.get(user_id)
+            with entry.lock:
+                if self._entries.get(user_id) is not entry:
+                    # A entrada foi descartada enquanto esperávamos: tenta de novo.
+                    entry.sessions -= 1
+                    continue
+                if entry.tracker is None:
+                    if previous is not None:
+                        previous.unloaded.wait()
+                    entry._load(self.backend_factory(user_id), self.window_days, self.debounce)
+                    self.loads += 1
+            self._evict_if_needed()
+            return entry
+
+    def release(self, entry: UserEntry):
+        """Fecha uma sessão do usuário; a gravação pendente segue em segundo plano."""
+        with self._lock:
+            entry.sessions -= 1
+        self._evict_if_needed()
+
+    def flush_all(self):
+        """Grava agora as alterações pendentes de todos os usuários."""
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            with entry.lock:
+                if entry.scheduler is not None:
+                    entry.scheduler.flush()
+
+    def close(self):
+        """Grava e descarrega todos os usuários (ex.: ao encerrar o servidor)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._unloading.update((entry.user_id, entry) for entry in entries)
+        for entry in entries:
+            self._unload(entry)
+
+    def _unload(self, entry: UserEntry) -> bool:
+        """Grava e descarrega uma entrada já retirada de _entries; True se ela estava carregada."""
+        try:
+            with entry.lock:
+                if entry.tracker is None:
+                    return False
+                entry._unload()
+                return True
+        finally:
+            with self._lock:
+                if self._unloading.get(entry.user_id) is entry:
+                    del self._unloading[entry.user_id]
+            entry.unloaded.set()
+
+    def _evict_if_needed(self):
+        victims = []
+        with self._lock:
+            excess = len(self._entries) - self.capacity
+            if excess <= 0:
+                return
+            for user_id, entry in list(self._entries.items()):
+                if excess <= 0:
+                    break
+                if entry.sessions == 0:
+                    del self._entries[user_id]
+                    self._unloading[user_id] = entry
+                    victims.append(entry)
+                    excess -= 1
+        for entry in victims:
+            if self._unload(entry):
+                self.evictions += 1
@@ -0,0 +1,235 @@
+# sharded_storage.py
+"""
+Backend em diretório: um manifesto com a lista de hábitos e um arquivo
+(shard) por hábito.
+
+    <diretório>/manifest.json          {"version": 1, "habits": [{"name": ..., "file": ...}, ...]}
+    <diretório>/habits/<arquivo>       um hábito (conclusões e agenda), em JSON ou no formato binário
+    <diretório>/manifest.json.journal  diário de alterações (como no JsonBackend)
+
+save() só regrava os shards dos hábitos alterados desde a última gravação
+(comparando Habit.revision) e o manifesto só quando a lista de hábitos muda;
+assim a compactação do diário custa proporcional ao que mudou, não ao total.
+Um shard corrompido perde só aquele hábito (o arquivo é preservado com o
+sufixo .corrupt), e sem manifesto legível os hábitos são recuperados dos shards.
+load() lê os shards em paralelo num pool de threads.
+
+Cada diretório guarda um tracker. Para migrar um habits_data.json existente:
+    python -m sharded_storage habits_data.json habits_data/
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import binary_format
+import persistence
+from completion_store import CompletionStore
+from habit_logic import DAILY, Habit, HabitTracker, Schedule
+from persistence import CORRUPT_SUFFIX, FORMAT_BINARY, journal_path
+
+MANIFEST_FILE = "manifest.json"
+SHARDS_DIR = "habits"
+MANIFEST_VERSION = 1
+LOAD_WORKERS = min(8, os.cpu_count() or 1)
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+def shard_file_name(name: str, snapshot_format: str) -> str:
+    """Nome do arquivo do hábito: parte legível do nome + hash (único e seguro em qualquer sistema)."""
+    slug = _UNSAFE_CHARS.sub("_", name)[:40].strip("_") or "habito"
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+    return f"{slug}-{digest}{'.bin' if snapshot_format == FORMAT_BINARY else '.json'}"
+
+
+class _SavedState:
+    """O que já está no disco para o último tracker gravado/carregado."""
+
+    def __init__(self, tracker: HabitTracker):
+        self.tracker = weakref.ref(tracker)
+        self.shards: dict[str, tuple[int, str]] = {}  # nome -> (revisão, arquivo)
+        self.manifest: list[tuple[str, str]] | None = None  # None: regravar o manifesto
+
+
+class ShardedBackend(persistence.StorageBackend):
+    """Manifesto + um arquivo por hábito em 'directory' (ver o docstring do módulo)."""
+
+    def __init__(self, directory: str, snapshot_format: str | None = None, workers: int | None = None):
+        self.directory = directory
+        self.workers = workers or LOAD_WORKERS
+        self.shards_written = 0  # shards gravados pelo último save()
+        self._format = snapshot_format
+        self._state: _SavedState | None = None
+        self._state_lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """Caminho do manifesto (o diário fica ao lado dele, como no JsonBackend)."""
+        return os.path.join(self.directory, MANIFEST_FILE)
+
+    @property
+    def snapshot_format(self) -> str:
+        return self._format or persistence.SNAPSHOT_FORMAT
+
+    @property
+    def shards_directory(self) -> str:
+        return os.path.join(self.directory, SHARDS_DIR)
+
+    def _state_for(self, tracker: HabitTracker) -> _SavedState:
+        with self._state_lock:
+            if self._state is None or self._state.tracker() is not tracker:
+                # Outro tracker (ou nenhum) foi o último gravado: tudo é regravado.
+                self._state = _SavedState(tracker)
+            return self._state
+
+    def save(self, tracker: HabitTracker):
+        os.makedirs(self.shards_directory, exist_ok=True)
+        snapshot_format = self.snapshot_format
+        with persistence._file_lock(self.path):
+            state = self._state_for(tracker)
+            shards: dict[str, tuple[int, str]] = {}
+            manifest = []
+            written = 0
+            for habit in tracker:
+                # Revisão e nome são lidos antes do conteúdo: uma alteração feita
+                # durante a gravação muda a revisão e fica para o próximo save.
+                name, revision = habit.name, habit.revision
+                file_name = shard_file_name(name, snapshot_format)
+                if state.shards.get(name) != (revision, file_name):
+                    persistence._atomic_write(os.path.join(self.shards_directory, file_name),
+                                              self._encode_shard(name, habit, snapshot_format))
+                    written += 1
+                shards[name] = (revision, file_name)
+                manifest.append((name, file_name))
+            if manifest != state.manifest:
+                persistence._atomic_write(self.path, json.dumps({
+                    "version": MANIFEST_VERSION,
+                    "habits": [{"name": name, "file": file_name} for name, file_name in manifest],
+                }, ensure_ascii=False, indent=1))
+                self._remove_orphans({file_name for _, file_name in manifest})
+            state.shards, state.manifest = shards, manifest
+            self.shards_written = written
+            if os.path.exists(journal_path(self.path)):
+                with open(journal_path(self.path), "r+", encoding="utf-8") as f:
+                    f.truncate(0)
+
+    @staticmethod
+    def _encode_shard(name: str, habit: Habit, snapshot_format: str) -> str | bytes:
+        schedule = habit.schedule
+        schedules = {name: schedule} if schedule is not DAILY else {}
+        if snapshot_format == FORMAT_BINARY:
+            starts, ends = habit.snapshot_segments()
+            return binary_format.encode([(name, starts, ends)], compress=persistence.BINARY_COMPRESS,
+                                        schedules=persistence.schedule_fields(schedules))
+        return json.dumps({
+            "name": name,
+            "completions": [date.fromordinal(o).isoformat() for o in habit.snapshot()],
+            **({"schedule": schedule.to_dict()} if schedules else {}),
+        }, ensure_ascii=False)
+
+    def _remove_orphans(self, keep: set[str]):
+        """Apaga shards de hábitos removidos/renomeados (os .corrupt ficam)."""
+        for file_name in os.listdir(self.shards_directory):
+            if file_name not in keep and not file_name.endswith(CORRUPT_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.shards_directory, file_name))
+                except OSError:
+                    pass
+
+    def load(self, store: type[CompletionStore] = None, window_days: int | None = None,
+             today: date | None = None) -> HabitTracker:
+        tracker = HabitTracker(store=store)
+        cutoff = persistence.lazy_cutoff(window_days, today)
+        entries, manifest_ok = self._read_manifest()
+        if len(entries) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shard-load") as pool:
+                habits = list(pool.map(lambda entry: self._read_shard(entry[1], tracker.store, cutoff), entries))
+        else:
+            habits = [self._read_shard(file_name, tracker.store, cutoff) for _, file_name in entries]
+
+        state = self._state_for(tracker)
+        snapshot_format = self.snapshot_format
+        manifest = []
+        for (name, file_name), habit in zip(entries, habits):
+            if habit is None or habit.name != name or not tracker.insert_habit(habit):
+                manifest_ok = False  # shard perdido ou inconsistente: o manifesto será refeito
+                continue
+            manifest.append((name, file_name))
+            if file_name == shard_file_name(name, snapshot_format):
+                state.shards[name] = (habit.revision, file_name)
+        state.manifest = manifest if manifest_ok else None
+        # Alterações do diário mudam as revisões: esses hábitos serão regravados.
+        persistence._replay_journal(tracker, journal_path(self.path))
+        return tracker
+
+    def _read_manifest(self) -> tuple[list[tuple[str, str]], bool]:
+        """Entradas (nome, arquivo) do manifesto e se ele estava íntegro."""
+        try:
+            with open(self.path, "rb") as f:
+                data = json.loads(f.read())
+            entries = [(item["name"], item["file"]) for item in data["habits"]]
+            if any(os.path.basename(file_name) != file_name for _, file_name in entries):
+                raise ValueError("caminho de shard inválido no manifesto")
+            return entries, True
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError):
+            persistence._preserve_corrupt(self.path)
+        return self._scan_shards(), False
+
+    def _scan_shards(self) -> list[tuple[str, str]]:
+        """Sem manifesto: os hábitos são recuperados dos próprios shards (o nome está neles)."""
+        try:
+            file_names = sorted(os.listdir(self.shards_directory))
+        except FileNotFoundError:
+            return []
+        entries = []
+        for file_name in file_names:
+            if not file_name.endswith((".json", ".bin")):
+                continue
+            habit = self._read_shard(file_name, None, None)
+            if habit is not None:
+                entries.append((habit.name, file_name))
+        return entries
+
+    def _read_shard(self, file_name: str, store: type[CompletionStore], cutoff: date | None) -> Habit | None:
+        path = os.path.join(self.shards_directory, file_name)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            if binary_format.is_binary(raw):
+                [(name, starts, ends)], schedules = binary_format.decode_with_schedules(raw)
+                schedule = Schedule(*schedules[name]) if name in schedules else None
+                return persistence.habit_from_segments(name, starts, ends, store, cutoff, schedule)
+            data = json.loads(raw)
+            return persistence.habit_from_iso(data["name"], data["completions"], store, cutoff,
+                                              Schedule.from_dict(data.get("schedule")))
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            # Só este hábito se perde; o arquivo fica guardado para inspeção.
+            persistence._preserve_corrupt(path)
+            return None
+
+    def attach(self, tracker: HabitTracker, autoflush: bool = True) -> persistence.Journal:
+        os.makedirs(self.directory, exist_ok=True)  # o diário fica no diretório
+        return persistence.Journal(tracker, backend=self, autoflush=autoflush)
+
+
+def migrate_json(json_path: str, directory: str) -> HabitTracker:
+    """Copia um arquivo JSON (snapshot + diário) para um diretório com shards."""
+    tracker = persistence.JsonBackend(json_path).load()
+    ShardedBackend(directory).save(tracker)
+    return tracker
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Uso: python -m sharded_storage <habits_data.json> <diretório>")
+    migrated = migrate_json(sys.argv[1], sys.argv[2])
+    print(f"{len(migrated)} hábitos migrados para {sys.argv[2]}")
@@ -0,0 +1,233 @@
+# sqlite_storage.py
+"""
+Backend de armazenamento em SQLite.
+
+Os hábitos ficam na tabela 'habits' e cada conclusão é uma linha de
+'completions', cuja chave primária (habit_id, day) serve de índice. O dia é
+guardado como ordinal (date.toordinal), então filtros por período são
+comparações de inteiros. Com attach(), cada clique vira uma única linha
+inserida ou removida, em vez de regravar todos os dados. A agenda de cada
+hábito (habit_logic.Schedule) fica nas colunas 'weekdays' e 'per_week'.
+
+Para migrar um habits_data.json existente:
+    python -m sqlite_storage habits_data.json habits.db
+"""
+import sqlite3
+import sys
+import threading
+from datetime import date
+import persistence
+from completion_store import CompletionStore
+from habit_logic import ALL_WEEKDAYS, DAILY, Habit, HabitTracker, Schedule, expand_event
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS habits (
+    id       INTEGER PRIMARY KEY,
+    name     TEXT NOT NULL UNIQUE,
+    weekdays INTEGER NOT NULL DEFAULT 127,
+    per_week INTEGER
+);
+CREATE TABLE IF NOT EXISTS completions (
+    habit_id INTEGER NOT NULL REFERENCES habits(id) ON DELETE CASCADE,
+    day      INTEGER NOT NULL,
+    PRIMARY KEY (habit_id, day)
+) WITHOUT ROWID;
+"""
+# Bancos criados antes das agendas ganham as colunas ao serem abertos.
+SCHEDULE_COLUMNS = {
+    "weekdays": f"INTEGER NOT NULL DEFAULT {ALL_WEEKDAYS}",
+    "per_week": "INTEGER",
+}
+
+# Política de fsync de persistence -> PRAGMA synchronous do SQLite.
+_SYNCHRONOUS = {
+    persistence.FSYNC_ALWAYS: "FULL",
+    persistence.FSYNC_BATCH: "NORMAL",
+    persistence.FSYNC_NEVER: "OFF",
+}
+
+
+class SqliteBackend(persistence.StorageBackend):
+    """Guarda os hábitos em um banco SQLite (ver o docstring do módulo)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute(f"PRAGMA synchronous = {_SYNCHRONOUS[persistence.FSYNC_POLICY]}")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(habits)")}
+        for column, definition in SCHEDULE_COLUMNS.items():
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE habits ADD COLUMN {column} {definition}")
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
+
+    def save(self, tracker: HabitTracker):
+        """Sincroniza o banco com o estado completo do tracker, em uma transação."""
+        # O snapshot é tirado antes do lock: ele pode carregar o histórico
+        # preguiçoso, cuja consulta (_older_loader) também usa o lock.
+        schedules = tracker.schedules()
+        snapshot = tracker.snapshot()
+        with self._lock, self._transaction() as conn:
+            existing = dict(conn.execute("SELECT name, id FROM habits"))
+            names = {name for name, _ in snapshot}
+            conn.executemany("DELETE FROM habits WHERE id = ?",
+                             ((i,) for n, i in existing.items() if n not in names))
+            for name, ordinals in snapshot:
+                habit_id = existing.get(name)
+                schedule = schedules.get(name, DAILY)
+                if habit_id is None:
+                    habit_id = conn.execute("INSERT INTO habits (name) VALUES (?)", (name,)).lastrowid
+                else:
+                    conn.execute("DELETE FROM completions WHERE habit_id = ?", (habit_id,))
+                conn.execute("UPDATE habits SET weekdays = ?, per_week = ? WHERE id = ?",
+                             (schedule.weekdays, schedule.per_week, habit_id))
+                conn.executemany(
+                    "INSERT INTO completions (habit_id, day) VALUES (?, ?)",
+                    ((habit_id, o) for o in ordinals),
+                )
+
+    def load(self, store: type[CompletionStore] = None, window_days: int | None = None,
+             today: date | None = None, since: date | None = None) -> HabitTracker:
+        """
+        Carrega os hábitos na ordem em que foram criados. Com 'since' ou
+        'window_days', só as conclusões a partir dessa data (ou da janela) são
+        lidas de imediato; as anteriores são buscadas no banco apenas quando o
+        hábito precisar delas. Assim um tracker carregado em parte continua
+        completo para save(), que regrava todas as conclusões de cada hábito.
+        """
+        tracker = HabitTracker(store=store)
+        cutoff = persistence.lazy_cutoff(window_days, today)
+        first = max(since.toordinal() if since else 0, cutoff.toordinal() if cutoff else 0)
+        with self._lock:
+            habits = self._conn.execute("SELECT id, name, weekdays, per_week FROM habits ORDER BY id").fetchall()
+            rows = self._conn.execute(
+                "SELECT habit_id, day FROM completions WHERE day >= ? ORDER BY habit_id, day", (first,)
+            ).fetchall()
+        by_habit: dict[int, list[int]] = {}
+        for habit_id, day in rows:
+            by_habit.setdefault(habit_id, []).append(day)
+        for habit_id, name, weekdays, per_week in habits:
+            habit = Habit.from_ordinals(name, by_habit.get(habit_id, ()), tracker.store)
+            habit.set_schedule(Schedule(weekdays, per_week))
+            if first:
+                # A consulta pelo índice (habit_id, day) só acontece se o hábito precisar.
+                habit.set_lazy_history(date.fromordinal(first), self._older_loader(habit_id, first))
+            tracker.insert_habit(habit)
+        return tracker
+
+    def _older_loader(self, habit_id: int, first: int):
+        def load_older() -> list[int]:
+            with self._lock:
+                return [day for (day,) in self._conn.execute(
+                    "SELECT day FROM completions WHERE habit_id = ? AND day < ? ORDER BY day",
+                    (habit_id, first))]
+        return load_older
+
+    def attach(self, tracker: HabitTracker, autoflush: bool = True) -> "SqliteRecorder":
+        return SqliteRecorder(self, tracker, autoflush)
+
+    def apply_event(self, event: tuple):
+        """Aplica um evento do tracker ao banco com um único comando."""
+        self.apply_events([event])
+
+    def apply_events(self, events: list[tuple]):
+        """Aplica vários eventos do tracker em uma única transação."""
+        with self._lock, self._transaction() as conn:
+            for event in events:
+                for simple_event in expand_event(event):
+                    self._apply(conn, simple_event)
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, event: tuple):
+        kind, name, *rest = event
+        if kind == "add":
+            conn.execute("INSERT OR IGNORE INTO habits (name) VALUES (?)", (name,))
+        elif kind == "delete":
+            conn.execute("DELETE FROM habits WHERE name = ?", (name,))
+        elif kind == "rename":
+            conn.execute("UPDATE habits SET name = ? WHERE name = ?", (rest[0], name))
+        elif kind == "schedule":
+            conn.execute("UPDATE habits SET weekdays = ?, per_week = ? WHERE name = ?",
+                         (rest[0].weekdays, rest[0].per_week, name))
+        elif kind == "complete":
+            conn.execute(
+                "INSERT OR IGNORE INTO completions (habit_id, day) "
+                "SELECT id, ? FROM habits WHERE name = ?", (rest[0].toordinal(), name))
+        elif kind == "incomplete":
+            conn.execute(
+                "DELETE FROM completions WHERE day = ? "
+                "AND habit_id = (SELECT id FROM habits WHERE name = ?)", (rest[0].toordinal(), name))
+
+    def _transaction(self):
+        return _Transaction(self._conn)
+
+
+class _Transaction:
+    """BEGIN/COMMIT explícitos (a conexão está em modo autocommit)."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class SqliteRecorder:
+    """
+    Grava no banco cada alteração do tracker. Com autoflush=False os eventos
+    são acumulados e aplicados em uma única transação a cada flush().
+    """
+
+    def __init__(self, backend: SqliteBackend, tracker: HabitTracker, autoflush: bool = True):
+        self.backend = backend
+        self.tracker = tracker
+        self.autoflush = autoflush
+        self._pending: list[tuple] = []
+        self._lock = threading.Lock()
+        tracker.subscribe(self.record)
+
+    def record(self, event: tuple):
+        if self.autoflush:
+            self.backend.apply_event(event)
+            return
+        with self._lock:
+            self._pending.append(event)
+
+    def flush(self):
+        with self._lock:
+            events, self._pending = self._pending, []
+        if events:
+            self.backend.apply_events(events)
+
+    def close(self):
+        self.tracker.unsubscribe(self.record)
+        self.flush()
+
+
+def migrate_json(json_path: str, db_path: str) -> HabitTracker:
+    """Copia um arquivo JSON (snapshot + diário) para um banco SQLite."""
+    tracker = persistence.JsonBackend(json_path).load()
+    backend = SqliteBackend(db_path)
+    try:
+        backend.save(tracker)
+    finally:
+        backend.close()
+    return tracker
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Uso: python -m sqlite_storage <habits_data.json> <banco.db>")
+    migrated = migrate_json(sys.argv[1], sys.argv[2])
+    print(f"{len(migrated)} hábitos migrados para {sys.argv[2]}")
@@ -0,0 +1,78 @@
+# test_analytics.py
+import random
+from datetime import date, timedelta
+import pytest
+from completion_store import ArrayCompletionStore, SetCompletionStore
+from habit_logic import HabitTracker
+
+np = pytest.importorskip("numpy")
+from analytics import compute_stats
+
+TODAY = date(2025, 6, 9)
+
+def random_tracker(store, n_habits=20, days=200, seed=7) -> HabitTracker:
+    rng = random.Random(seed)
+    tracker = HabitTracker(store=store)
+    for i in range(n_habits):
+        name = f"hábito {i}"
+        tracker.add_habit(name)
+        density = rng.random()
+        for offset in range(days):
+            if rng.random() < density:
+                tracker.mark_complete(name, TODAY - timedelta(days=offset))
+    return tracker
+
+@pytest.mark.parametrize("store", [SetCompletionStore, ArrayCompletionStore])
+def test_bulk_stats_match_per_habit_computation(store):
+    tracker = random_tracker(store)
+    stats = compute_stats(tracker, TODAY, window_days=30)
+    for habit in tracker:
+        row = stats.for_habit(habit.name)
+        assert row["current_streak"] == tracker.get_current_streak(habit.name, TODAY)
+        assert row["longest_streak"] == habit.longest_streak()
+        last_30 = sum(TODAY - timedelta(days=k) in habit.completions for k in range(30))
+        assert row["completion_rate"] == pytest.approx(last_30 / 30)
+        weekdays = [0] * 7
+        for day in habit.completions:
+            weekdays[day.weekday()] += 1
+        assert row["weekday_counts"] == weekdays
+
+def test_bulk_stats_ignore_days_after_today():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    for offset in [-1, 0, 1, 2]:
+        tracker.mark_complete("Ler", TODAY - timedelta(days=offset))
+    row = compute_stats(tracker, TODAY, window_days=7).for_habit("Ler")
+    assert row["current_streak"] == 3
+    assert row["longest_streak"] == 3
+    assert row["completion_rate"] == pytest.approx(3 / 7)
+
+def test_bulk_stats_empty_tracker():
+    stats = compute_stats(HabitTracker(), TODAY)
+    assert len(stats) == 0
+    assert stats.for_habit("Ler") is None
+
+def test_start_bounds_only_longest_streak_and_weekday_counts():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    for offset in range(30):
+        tracker.mark_complete("Ler", TODAY - timedelta(days=offset))
+    row = compute_stats(tracker, TODAY, window_days=30, start=TODAY - timedelta(days=9)).for_habit("Ler")
+    assert row["current_streak"] == 30
+    assert row["completion_rate"] == pytest.approx(1.0)
+    assert row["longest_streak"] == 10
+    assert sum(row["weekday_counts"]) == 10
+
+def test_old_stray_completion_does_not_change_the_result():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.add_habit("Correr")
+    tracker.mark_complete("Ler", date(1, 1, 1))
+    for offset in range(1, 4):
+        tracker.mark_complete("Correr", TODAY - timedelta(days=offset))
+    stats = compute_stats(tracker, TODAY, window_days=7)
+    assert stats.start == date(1, 1, 1)
+    assert stats.for_habit("Ler")["current_streak"] == 0
+    assert stats.for_habit("Ler")["longest_streak"] == 1
+    assert stats.for_habit("Correr")["current_streak"] == 3
+    assert stats.for_habit("Correr")["completion_rate"] == pytest.approx(3 / 7)
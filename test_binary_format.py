@@ -0,0 +1,70 @@
+# test_binary_format.py
+import random
+from datetime import date
+import pytest
+import binary_format
+from habit_logic import HabitTracker
+
+
+def random_tracker(seed=3) -> HabitTracker:
+    rng = random.Random(seed)
+    tracker = HabitTracker()
+    base = date(2021, 1, 1).toordinal()
+    for i in range(20):
+        name = f"Hábito {i} 🏃"
+        tracker.add_habit(name)
+        for offset in range(5 * 365):
+            if rng.random() < 0.6:
+                tracker.mark_complete(name, date.fromordinal(base + offset))
+    tracker.add_habit("Vazio")
+    return tracker
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_roundtrip_preserves_every_completion(compress):
+    tracker = random_tracker()
+    data = binary_format.encode(tracker.snapshot_segments(), compress=compress)
+
+    assert binary_format.is_binary(data)
+    decoded = [(name, list(binary_format.segment_ordinals(s, e))) for name, s, e in binary_format.decode(data)]
+    assert decoded == [(name, list(o)) for name, o in tracker.snapshot()]
+
+
+def test_large_gaps_use_wide_values():
+    tracker = HabitTracker()
+    tracker.add_habit("Raro")
+    tracker.mark_complete("Raro", date(1900, 1, 1))
+    tracker.mark_complete("Raro", date(2025, 1, 1))
+    decoded = binary_format.decode(binary_format.encode(tracker.snapshot_segments(), compress=False))
+    name, starts, ends = decoded[0]
+    assert list(starts) == list(ends) == [date(1900, 1, 1).toordinal(), date(2025, 1, 1).toordinal()]
+
+
+def test_binary_is_much_smaller_than_json_dates():
+    tracker = random_tracker()
+    data = binary_format.encode(tracker.snapshot_segments())
+    iso_bytes = sum(len(o) for _, o in tracker.snapshot()) * len('"2025-01-01", ')
+    assert len(data) * 10 < iso_bytes
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:-7],
+    lambda data: binary_format.MAGIC + bytes([99, 0]) + data[6:],
+    lambda data: data[:6] + b"\x00" * 20,
+])
+def test_corrupt_data_raises_format_error(corrupt):
+    data = binary_format.encode(random_tracker().snapshot_segments())
+    with pytest.raises(binary_format.FormatError):
+        binary_format.decode(corrupt(data))
+
+
+def test_schedules_roundtrip_and_are_optional():
+    habits = [("Ler", [10, 20], [12, 25]), ("Correr", [], [])]
+    plain = binary_format.encode(habits)
+    assert binary_format.decode_with_schedules(plain)[1] == {}
+
+    data = binary_format.encode(habits, schedules={"Correr": (0b0010101, 2)})
+    decoded, schedules = binary_format.decode_with_schedules(data)
+    assert schedules == {"Correr": (0b0010101, 2)}
+    assert [(name, list(s), list(e)) for name, s, e in decoded] == [(n, list(s), list(e)) for n, s, e in habits]
+    assert binary_format.decode(data) == decoded
@@ -0,0 +1,137 @@
+# test_cli.py
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+import pytest
+import cli
+import habit_summary
+import persistence
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    # main() altera persistence.DATA_FILE; o monkeypatch restaura o valor original.
+    monkeypatch.setattr(persistence, "DATA_FILE", persistence.DATA_FILE)
+    return str(tmp_path / "habits.json")
+
+
+def run(data_file, *args) -> int:
+    return cli.main(["--data", data_file, *args])
+
+
+def test_add_mark_and_streak(data_file, capsys):
+    assert run(data_file, "add", "Ler", "Correr") == 0
+    assert run(data_file, "mark", "Ler", "2025-06-01", "--to", "2025-06-05") == 0
+    assert run(data_file, "unmark", "Ler", "2025-06-03") == 0
+    capsys.readouterr()
+
+    assert run(data_file, "streak", "Ler", "--date", "2025-06-05") == 0
+    assert capsys.readouterr().out.strip() == "2"
+
+    # Cada chamada só anexou ao diário; uma carga nova enxerga tudo.
+    tracker = persistence.JsonBackend(data_file).load()
+    assert [h.name for h in tracker] == ["Ler", "Correr"]
+    assert tracker.get_streak_history("Ler") == [(date(2025, 6, 1), date(2025, 6, 2)),
+                                                 (date(2025, 6, 4), date(2025, 6, 5))]
+
+
+def test_stats_json_includes_history_outside_the_load_window(data_file, capsys):
+    run(data_file, "add", "Ler")
+    run(data_file, "mark", "Ler", "2020-01-01", "--to", "2020-01-10")
+    run(data_file, "mark", "Ler", "2025-06-01")
+    capsys.readouterr()
+
+    assert run(data_file, "stats", "--json", "--date", "2025-06-01") == 0
+    [stats] = json.loads(capsys.readouterr().out)
+    assert stats == {"habit": "Ler", "completions": 11, "current_streak": 1,
+                     "longest_streak": 10, "done_today": True, "schedule": None,
+                     "adherence": [1, habit_summary.ADHERENCE_DAYS]}
+
+
+def test_schedule_changes_streak_units(data_file, capsys):
+    run(data_file, "add", "Academia", "Correr")
+    run(data_file, "mark", "Academia", "2025-06-02")  # segunda
+    run(data_file, "mark", "Academia", "2025-06-04")  # quarta
+    run(data_file, "mark", "Correr", "2025-06-02", "--to", "2025-06-04")
+    assert run(data_file, "schedule", "Academia", "seg,qua,sex") == 0
+    assert run(data_file, "schedule", "Correr", "--per-week", "3") == 0
+    assert run(data_file, "schedule", "Correr", "--per-week", "8") == 1
+    capsys.readouterr()
+
+    assert run(data_file, "schedule", "Academia") == 0
+    assert capsys.readouterr().out.strip() == "Academia: seg, qua, sex"
+    # Terça e quinta não estão na agenda: não interrompem a streak.
+    assert run(data_file, "streak", "Academia", "--date", "2025-06-05") == 0
+    assert capsys.readouterr().out.strip() == "2"
+    assert run(data_file, "stats", "--json", "--date", "2025-06-05", "Correr") == 0
+    [stats] = json.loads(capsys.readouterr().out)
+    assert stats["schedule"] == {"weekdays": [0, 1, 2, 3, 4, 5, 6], "per_week": 3}
+    assert stats["current_streak"] == 1  # uma semana cumprida
+
+
+def test_add_strips_the_name(data_file, capsys):
+    run(data_file, "add", "  Ler ")
+    assert "Hábito adicionado: Ler" in capsys.readouterr().out
+    run(data_file, "add", "Ler")
+    assert "Hábito já existe: Ler" in capsys.readouterr().out
+    run(data_file, "list")
+    assert capsys.readouterr().out == "Ler\n"
+
+
+def test_rename_delete_and_list(data_file, capsys):
+    run(data_file, "add", "Ler", "Correr", "Meditar")
+    run(data_file, "rename", "Ler", "Leitura")
+    run(data_file, "delete", "Correr")
+    capsys.readouterr()
+
+    run(data_file, "list")
+    assert capsys.readouterr().out.split("\n")[:-1] == ["Leitura", "Meditar"]
+
+
+def test_errors_exit_with_status_1(data_file, capsys):
+    run(data_file, "add", "Ler", "Correr")
+    assert run(data_file, "mark", "Inexistente") == 1
+    assert "Hábito não encontrado" in capsys.readouterr().err
+    assert run(data_file, "stats", "Inexistente") == 1
+    assert "Hábito não encontrado: Inexistente" in capsys.readouterr().err
+    assert run(data_file, "rename", "Ler", "Correr") == 1
+    assert run(data_file, "mark", "Ler", "2025-06-05", "--to", "2025-06-01") == 1
+    with pytest.raises(SystemExit):
+        run(data_file, "mark", "Ler", "05/06/2025")
+
+
+def test_export_and_import(data_file, tmp_path):
+    run(data_file, "add", "Ler")
+    run(data_file, "mark", "Ler", "2025-06-01", "--to", "2025-06-03")
+    export_path = str(tmp_path / "backup.ndjson")
+    assert run(data_file, "export", export_path) == 0
+
+    other = str(tmp_path / "other.json")
+    assert run(other, "import", export_path) == 0
+    tracker = persistence.JsonBackend(other).load()
+    assert len(list(tracker.get_habit("Ler").snapshot())) == 3
+
+
+def test_large_import_writes_one_snapshot(data_file, tmp_path, monkeypatch):
+    csv_path = tmp_path / "big.csv"
+    rows = [f"H{i % 3},{date.fromordinal(date(2020, 1, 1).toordinal() + i // 3).isoformat()}"
+            for i in range(3 * persistence.COMPACT_EVERY)]
+    csv_path.write_text("habit,date\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    saves = []
+    original_save = persistence.JsonBackend.save
+    monkeypatch.setattr(persistence.JsonBackend, "save",
+                        lambda self, tracker: (saves.append(1), original_save(self, tracker))[1])
+
+    assert run(data_file, "import", str(csv_path)) == 0
+    assert len(saves) == 1
+    assert not os.path.exists(persistence.journal_path(data_file))
+    tracker = persistence.JsonBackend(data_file).load()
+    assert len(tracker.get_habit("H0").snapshot()) == persistence.COMPACT_EVERY
+
+
+def test_cli_does_not_import_the_gui():
+    code = "import sys, cli; print(any(m.split('.')[0] in ('flet', 'main_gui', 'asyncio') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,54 @@
+# test_completion_store.py
+import pytest
+from datetime import date, timedelta
+from completion_store import ArrayCompletionStore, SetCompletionStore
+from habit_logic import Habit, HabitTracker
+
+TODAY = date(2025, 6, 9)
+STORES = [SetCompletionStore, ArrayCompletionStore]
+
+@pytest.mark.parametrize("store", STORES)
+def test_store_add_discard_and_membership(store):
+    completions = store()
+    assert completions.add(TODAY)
+    assert not completions.add(TODAY)
+    assert completions.add(TODAY - timedelta(days=3))
+    assert TODAY in completions and len(completions) == 2
+    assert completions.discard(TODAY)
+    assert not completions.discard(TODAY)
+    assert completions == {TODAY - timedelta(days=3)}
+
+def test_array_store_keeps_ordinals_sorted():
+    completions = ArrayCompletionStore()
+    for offset in [5, 1, 9, 3, 7]:
+        completions.add(TODAY + timedelta(days=offset))
+    assert list(completions.ordinals()) == sorted(completions.ordinals())
+    assert list(completions) == sorted(completions)
+    assert "2025-06-09" not in completions
+
+@pytest.mark.parametrize("store", STORES)
+def test_habit_streaks_with_store(store):
+    tracker = HabitTracker(store=store)
+    tracker.add_habit("Ler")
+    for offset in range(4):
+        tracker.mark_complete("Ler", TODAY - timedelta(days=offset))
+    assert isinstance(tracker.get_habit("Ler").completions, store)
+    assert tracker.get_current_streak("Ler", TODAY) == 4
+    tracker.mark_incomplete("Ler", TODAY - timedelta(days=2))
+    assert tracker.get_current_streak("Ler", TODAY) == 2
+
+def test_segments_resync_after_direct_store_change():
+    habit = Habit("Correr", {TODAY}, store=ArrayCompletionStore)
+    habit.completions.add(TODAY - timedelta(days=1))
+    assert habit.current_streak(TODAY) == 2
+
+def test_habit_has_no_instance_dict():
+    with pytest.raises(AttributeError):
+        Habit("Nadar").extra = 1
+
+@pytest.mark.parametrize("store", STORES)
+def test_habit_from_ordinals(store):
+    ordinals = [TODAY.toordinal() - 1, TODAY.toordinal()]
+    habit = Habit.from_ordinals("Ler", ordinals, store)
+    assert habit.completions == {TODAY, TODAY - timedelta(days=1)}
+    assert habit.current_streak(TODAY) == 2
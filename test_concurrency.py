@@ -0,0 +1,166 @@
+# test_concurrency.py
+import random
+import sys
+import threading
+from datetime import date, timedelta
+import pytest
+import persistence
+from completion_store import ArrayCompletionStore, SetCompletionStore
+from habit_logic import HabitTracker, _index_key
+from persistence import JsonBackend, Journal
+
+NAMES = [f"Hábito {i}" for i in range(8)]
+DAYS = [date(2025, 6, 1) + timedelta(days=i) for i in range(40)]
+
+
+@pytest.fixture(autouse=True)
+def fast_thread_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    persistence.set_fsync_policy(persistence.FSYNC_NEVER)
+    yield
+    sys.setswitchinterval(interval)
+    persistence.set_fsync_policy(persistence.FSYNC_ALWAYS)
+
+
+def state_of(tracker: HabitTracker) -> dict[str, list[int]]:
+    return {name: list(ordinals) for name, ordinals in tracker.snapshot()}
+
+
+def check_invariants(tracker: HabitTracker):
+    assert tracker._name_index == sorted(_index_key(name) for name in tracker._habits)
+    for habit in tracker:
+        ordinals = list(habit.snapshot())
+        assert ordinals == sorted(set(ordinals))
+        segments = []
+        for o in ordinals:
+            if segments and segments[-1][1] == o - 1:
+                segments[-1][1] = o
+            else:
+                segments.append([o, o])
+        habit._sync_segments()
+        assert [[s, e] for s, e in zip(habit._starts, habit._ends)] == segments
+
+
+def hammer(tracker: HabitTracker, seed: int, ops: int, errors: list):
+    rng = random.Random(seed)
+    try:
+        for _ in range(ops):
+            name, day = rng.choice(NAMES), rng.choice(DAYS)
+            op = rng.random()
+            if op < 0.4:
+                tracker.mark_complete(name, day)
+            elif op < 0.75:
+                tracker.mark_incomplete(name, day)
+            elif op < 0.9:
+                tracker.add_habit(name)
+            else:
+                tracker.delete_habit(name)
+    except Exception as error:  # pragma: no cover - só aparece se houver corrida
+        errors.append(error)
+
+
+@pytest.mark.parametrize("store", [SetCompletionStore, ArrayCompletionStore])
+def test_concurrent_mutations_saves_and_reads_keep_state_consistent(tmp_path, store):
+    backend = JsonBackend(str(tmp_path / "habits.json"))
+    tracker = HabitTracker(store=store)
+    for name in NAMES:
+        tracker.add_habit(name)
+    journal = Journal(tracker, compact_every=50, backend=backend)
+    errors: list = []
+    stop = threading.Event()
+
+    def saver():
+        try:
+            while not stop.is_set():
+                backend.save(tracker)
+        except Exception as error:  # pragma: no cover
+            errors.append(error)
+
+    def reader():
+        try:
+            while not stop.is_set():
+                for habit in tracker:
+                    habit.current_streak(DAYS[-1])
+                    habit.longest_streak()
+                tracker.find_by_prefix("háb", 0, 5)
+        except Exception as error:  # pragma: no cover
+            errors.append(error)
+
+    writers = [threading.Thread(target=hammer, args=(tracker, seed, 1500, errors)) for seed in range(6)]
+    background = [threading.Thread(target=saver), threading.Thread(target=reader)]
+    for t in writers + background:
+        t.start()
+    for t in writers:
+        t.join()
+    stop.set()
+    for t in background:
+        t.join()
+    journal.close()
+
+    assert errors == []
+    check_invariants(tracker)
+    # Snapshot + diário gravados em paralelo reproduzem exatamente o estado final.
+    assert state_of(backend.load(store)) == state_of(tracker)
+
+
+def test_events_reach_listeners_in_application_order():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    replica = HabitTracker()
+    replica.add_habit("Ler")
+
+    def replicate(event):
+        kind, name, *rest = event
+        if kind == "complete":
+            replica.get_habit(name).add_completion(rest[0])
+        elif kind == "incomplete":
+            replica.get_habit(name).remove_completion(rest[0])
+
+    tracker.subscribe(replicate)
+
+    def toggle(seed):
+        rng = random.Random(seed)
+        for _ in range(2000):
+            day = rng.choice(DAYS[:3])
+            if rng.random() < 0.5:
+                tracker.mark_complete("Ler", day)
+            else:
+                tracker.mark_incomplete("Ler", day)
+
+    threads = [threading.Thread(target=toggle, args=(seed,)) for seed in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert state_of(replica) == state_of(tracker)
+
+
+def test_autoflush_compaction_does_not_block_writers(tmp_path):
+    started, release, saved = threading.Event(), threading.Event(), threading.Event()
+
+    class SlowBackend(JsonBackend):
+        def save(self, tracker):
+            started.set()
+            release.wait(2)
+            super().save(tracker)
+            saved.set()
+
+    backend = SlowBackend(str(tmp_path / "habits.json"))
+    tracker = HabitTracker()
+    journal = Journal(tracker, compact_every=3, backend=backend)
+    for name in ("Ler", "Correr", "Nadar"):  # 3º evento: compacta em segundo plano
+        tracker.add_habit(name)
+    assert started.wait(5)
+    assert not saved.is_set()  # quem alterou o tracker não esperou o snapshot
+
+    # Com o snapshot ainda sendo gravado, outras alterações seguem sem esperar.
+    done = threading.Event()
+    writer = threading.Thread(target=lambda: (tracker.mark_complete("Ler", DAYS[0]), done.set()))
+    writer.start()
+    assert done.wait(5)
+    release.set()
+    writer.join()
+    journal.close()
+    assert state_of(JsonBackend(backend.path).load()) == state_of(tracker)
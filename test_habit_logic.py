@@ -1,7 +1,7 @@
 # test_habit_logic.py
 import pytest
 from datetime import date, timedelta
-from habit_logic import Habit, HabitTracker
+from habit_logic import DAILY, Habit, HabitTracker, Schedule
 
 TODAY = date(2025, 6, 9)
 YESTERDAY = TODAY - timedelta(days=1)
@@ -39,6 +39,65 @@ def test_get_habit_by_name():
     assert habit is not None
     assert habit.name == "Meditar"
 
+def test_habits_keep_insertion_order():
+    tracker = HabitTracker()
+    for name in ["Correr", "Ler", "Beber água"]:
+        tracker.add_habit(name)
+    tracker.delete_habit("Ler")
+    tracker.add_habit("Ler")
+    assert [h.name for h in tracker.habits] == ["Correr", "Beber água", "Ler"]
+    assert [h.name for h in tracker] == ["Correr", "Beber água", "Ler"]
+
+def test_habits_view_is_read_only():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    with pytest.raises(AttributeError):
+        tracker.habits.append(Habit("Correr"))
+    tracker.habits = [*tracker.habits, Habit("Correr")]
+    assert tracker.get_habit("Correr") is not None
+
+def test_insert_existing_habit_object():
+    tracker = HabitTracker()
+    habit = Habit("Nadar", {TODAY})
+    assert tracker.insert_habit(habit)
+    assert not tracker.insert_habit(Habit("Nadar"))
+    assert tracker.get_habit("Nadar") is habit
+    assert "Nadar" in tracker and len(tracker) == 1
+
+def test_listeners_receive_only_effective_changes():
+    tracker = HabitTracker()
+    events = []
+    tracker.subscribe(events.append)
+    tracker.add_habit("Ler")
+    tracker.add_habit("Ler")
+    tracker.mark_complete("Ler", TODAY)
+    tracker.mark_complete("Ler", TODAY)
+    tracker.mark_incomplete("Ler", YESTERDAY)
+    tracker.mark_complete("Inexistente", TODAY)
+    tracker.delete_habit("Ler")
+    tracker.delete_habit("Ler")
+    tracker.unsubscribe(events.append)
+    tracker.add_habit("Correr")
+    assert events == [("add", "Ler"), ("complete", "Ler", TODAY), ("delete", "Ler")]
+
+def test_find_by_prefix_is_sorted_and_case_insensitive():
+    tracker = HabitTracker()
+    for name in ["ler jornal", "Correr", "Ler livro", "Lavar louça", "meditar"]:
+        tracker.add_habit(name)
+    assert tracker.find_by_prefix() == ["Correr", "Lavar louça", "ler jornal", "Ler livro", "meditar"]
+    assert tracker.find_by_prefix("LE") == ["ler jornal", "Ler livro"]
+    assert tracker.count_by_prefix("l") == 3
+    tracker.delete_habit("Ler livro")
+    assert tracker.find_by_prefix("le") == ["ler jornal"]
+    assert tracker.find_by_prefix("x") == [] and tracker.count_by_prefix("x") == 0
+
+def test_find_by_prefix_pagination():
+    tracker = HabitTracker()
+    for i in range(25):
+        tracker.add_habit(f"hábito {i:02d}")
+    assert tracker.find_by_prefix("hábito", offset=20, limit=10) == [f"hábito {i}" for i in range(20, 25)]
+    assert tracker.find_by_prefix("", offset=5, limit=2) == ["hábito 05", "hábito 06"]
+
 # Testes de Conclusão de Hábitos
 def test_mark_habit_complete():
     tracker = HabitTracker()
@@ -127,4 +186,272 @@ def test_streak_across_month_boundary_not_done_today():
 
 def test_invalid_habit_name_value_raises_error():
     with pytest.raises(ValueError):
-        Habit(name="")
\ No newline at end of file
+        Habit(name="")
+
+# Testes dos Segmentos de Sequência
+def test_segments_merge_and_split():
+    habit = Habit("Ler")
+    for day in [DAY_BEFORE, TODAY, YESTERDAY]:
+        habit.add_completion(day)
+    assert habit.streak_history() == [(DAY_BEFORE, TODAY)]
+    habit.remove_completion(YESTERDAY)
+    assert habit.streak_history() == [(DAY_BEFORE, DAY_BEFORE), (TODAY, TODAY)]
+    assert habit.longest_streak() == 1
+
+def test_segments_match_day_by_day_walk():
+    import random
+    rng = random.Random(42)
+    habit = Habit("Aleatório")
+    expected = set()
+    start = date(2024, 1, 1)
+    for _ in range(2000):
+        day = start + timedelta(days=rng.randrange(120))
+        if rng.random() < 0.6:
+            habit.add_completion(day)
+            expected.add(day)
+        else:
+            habit.remove_completion(day)
+            expected.discard(day)
+    assert habit.completions == expected
+    for offset in range(-1, 122):
+        today = start + timedelta(days=offset)
+        walk = today if today in expected else today - timedelta(days=1)
+        streak = 0
+        while walk in expected:
+            streak += 1
+            walk -= timedelta(days=1)
+        assert habit.current_streak(today) == streak
+
+def test_longest_streak_and_history_window():
+    tracker = HabitTracker()
+    tracker.add_habit("Correr")
+    for offset in [0, 1, 2, 5, 6, 10]:
+        tracker.mark_complete("Correr", date(2025, 1, 1) + timedelta(days=offset))
+    assert tracker.get_longest_streak("Correr") == 3
+    assert tracker.get_streak_history("Correr", date(2025, 1, 6), date(2025, 1, 11)) == [
+        (date(2025, 1, 6), date(2025, 1, 7)),
+        (date(2025, 1, 11), date(2025, 1, 11)),
+    ]
+    assert tracker.get_longest_streak("Inexistente") == 0
+
+
+# Testes do Histórico Preguiçoso
+def lazy_habit(loaded_days, older_days, cutoff):
+    """Hábito com 'loaded_days' em memória e 'older_days' pendentes antes de 'cutoff'."""
+    calls = []
+    habit = Habit("Ler", set(loaded_days))
+    def loader():
+        calls.append(1)
+        return [d.toordinal() for d in older_days]
+    habit.set_lazy_history(cutoff, loader)
+    return habit, calls
+
+def test_lazy_history_not_loaded_for_recent_queries():
+    habit, calls = lazy_habit([TODAY], [DAY_BEFORE - timedelta(days=3)], YESTERDAY)
+    assert habit.current_streak(TODAY) == 1
+    assert habit.is_complete(TODAY)
+    assert calls == [] and not habit.history_loaded
+
+def test_lazy_history_loaded_when_streak_reaches_window_edge():
+    habit, calls = lazy_habit([TODAY, YESTERDAY], [DAY_BEFORE], YESTERDAY)
+    assert habit.current_streak(TODAY) == 3
+    assert calls == [1] and habit.history_loaded
+
+def test_lazy_history_loaded_for_old_dates_and_full_views():
+    old_day = DAY_BEFORE - timedelta(days=10)
+    habit, calls = lazy_habit([TODAY], [old_day], YESTERDAY)
+    assert not habit.add_completion(old_day)
+    assert calls == [1]
+    habit, calls = lazy_habit([TODAY], [old_day], YESTERDAY)
+    assert habit.completions == {TODAY, old_day}
+    habit, calls = lazy_habit([TODAY], [old_day], YESTERDAY)
+    assert habit.streak_history(date(2025, 5, 20), TODAY) == [(old_day, old_day), (TODAY, TODAY)]
+    assert calls == [1]
+
+def test_habit_from_segments_matches_habit_from_dates():
+    days = [date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3), date(2025, 3, 10)]
+    expected = Habit("Ler", set(days))
+    habit = Habit.from_segments("Ler", [days[0].toordinal(), days[3].toordinal()],
+                                [days[2].toordinal(), days[3].toordinal()])
+
+    assert set(habit.completions) == set(days)
+    assert habit.streak_history() == expected.streak_history()
+    assert habit.current_streak(date(2025, 3, 4)) == 3
+    habit.remove_completion(date(2025, 3, 2))
+    assert habit.longest_streak() == 1
+
+def test_mark_range_emits_single_batch_event():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.mark_complete("Ler", TODAY - timedelta(days=2))
+    events = []
+    tracker.subscribe(events.append)
+
+    assert tracker.mark_range("Ler", TODAY - timedelta(days=4), TODAY) == 4
+    assert tracker.get_current_streak("Ler", TODAY) == 5
+    assert len(events) == 1 and events[0][0] == "batch"
+    assert sorted(e[2] for e in events[0][1]) == [TODAY - timedelta(days=d) for d in (4, 3, 1, 0)]
+
+    assert tracker.mark_range("Ler", TODAY - timedelta(days=1), TODAY, done=False) == 2
+    assert tracker.get_longest_streak("Ler") == 3
+    assert tracker.mark_range("Inexistente", TODAY, TODAY) == 0
+    assert len(events) == 2
+
+def test_apply_operations_last_operation_wins():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.add_habit("Correr")
+    changed = tracker.apply_operations([
+        ("Ler", TODAY, True),
+        ("Correr", TODAY, True),
+        ("Ler", TODAY, False),
+        ("Ler", YESTERDAY, True),
+        ("Inexistente", TODAY, True),
+    ])
+    assert changed == 2
+    assert not tracker.is_complete_today("Ler", TODAY)
+    assert tracker.is_complete_today("Ler", YESTERDAY)
+    assert tracker.is_complete_today("Correr", TODAY)
+
+def test_bulk_update_keeps_segments_consistent():
+    habit = Habit("Ler")
+    days = [TODAY - timedelta(days=d) for d in range(200) if d % 7 != 3]
+    added, _ = habit.update_days(days)  # muitas mudanças: reconstrói os segmentos
+    assert len(added) == len(days)
+    _, removed = habit.update_days(remove=[TODAY - timedelta(days=11), TODAY])  # poucas: incremental
+    assert len(removed) == 2
+    expected = Habit("Ler", set(days) - {TODAY - timedelta(days=11), TODAY})
+    assert habit.streak_history() == expected.streak_history()
+    assert habit.longest_streak() == 6
+
+def test_rename_and_merge_habits():
+    tracker = HabitTracker()
+    for name in ("Ler", "Correr", "Corrida"):
+        tracker.add_habit(name)
+    tracker.mark_complete("Correr", TODAY)
+    tracker.mark_complete("Corrida", YESTERDAY)
+    tracker.mark_complete("Corrida", TODAY)
+    events = []
+    tracker.subscribe(events.append)
+
+    assert tracker.rename_habit("Ler", "Ler livros")
+    assert not tracker.rename_habit("Ler", "Outro")
+    assert not tracker.rename_habit("Correr", "Corrida")
+    assert [h.name for h in tracker] == ["Ler livros", "Correr", "Corrida"]
+    assert tracker.find_by_prefix("ler") == ["Ler livros"]
+
+    assert tracker.merge_habits("Corrida", "Correr")
+    assert not tracker.merge_habits("Correr", "Correr")
+    assert [h.name for h in tracker] == ["Ler livros", "Correr"]
+    assert tracker.get_current_streak("Correr", TODAY) == 2
+    assert events == [
+        ("rename", "Ler", "Ler livros"),
+        ("batch", (("complete", "Correr", YESTERDAY), ("delete", "Corrida"))),
+    ]
+
+def test_range_queries_match_day_by_day():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.mark_range("Ler", date(2025, 2, 25), date(2025, 3, 4))
+    tracker.mark_complete("Ler", date(2025, 3, 31))
+    tracker.mark_complete("Ler", date(2025, 4, 1))
+    start, end = date(2025, 3, 1), date(2025, 3, 31)
+    expected = [start + timedelta(days=i) for i in range(31)
+                if tracker.is_complete_today("Ler", start + timedelta(days=i))]
+
+    assert tracker.completions_between("Ler", start, end) == expected
+    assert tracker.count_between("Ler", start, end) == 5
+    assert tracker.count_between("Outro", start, end) == 0
+    assert tracker.counts_by_period("Ler", start, end, "week") == [
+        (date(2025, 2, 24), 2), (date(2025, 3, 3), 2), (date(2025, 3, 10), 0),
+        (date(2025, 3, 17), 0), (date(2025, 3, 24), 0), (date(2025, 3, 31), 1),
+    ]
+    assert tracker.counts_by_period("Ler", date(2025, 2, 1), date(2025, 4, 30), "month") == [
+        (date(2025, 2, 1), 4), (date(2025, 3, 1), 5), (date(2025, 4, 1), 1),
+    ]
+    with pytest.raises(ValueError):
+        tracker.counts_by_period("Ler", start, end, "day")
+
+def test_daily_totals_counts_habits_per_day():
+    tracker = HabitTracker()
+    for name in ("Ler", "Correr"):
+        tracker.add_habit(name)
+    tracker.mark_range("Ler", DAY_BEFORE, TODAY)
+    tracker.mark_complete("Correr", YESTERDAY)
+
+    assert tracker.daily_totals(DAY_BEFORE - timedelta(days=1), TODAY) == [0, 1, 2, 1]
+    assert tracker.daily_totals(YESTERDAY, TODAY, ["Correr", "Outro"]) == [1, 0]
+    assert tracker.daily_totals(TODAY, YESTERDAY) == []
+
+def test_weekday_schedule_skips_unscheduled_days():
+    tracker = HabitTracker()
+    tracker.add_habit("Academia")
+    events = []
+    tracker.subscribe(events.append)
+    monday = date(2025, 6, 2)
+    for offset in (0, 2, 4, 7):  # seg, qua, sex, seg
+        tracker.mark_complete("Academia", monday + timedelta(days=offset))
+    assert tracker.get_current_streak("Academia", monday + timedelta(days=7)) == 1
+
+    assert tracker.set_schedule("Academia", Schedule.from_days([0, 2, 4]))
+    assert not tracker.set_schedule("Academia", Schedule.from_days([0, 2, 4]))
+    assert events[-1] == ("schedule", "Academia", Schedule.from_days([0, 2, 4]))
+    assert tracker.get_current_streak("Academia", monday + timedelta(days=7)) == 4
+    # Terça (fora da agenda) mostra a streak até segunda; quarta ainda não concluída também.
+    assert tracker.get_current_streak("Academia", monday + timedelta(days=8)) == 4
+    assert tracker.get_current_streak("Academia", monday + timedelta(days=9)) == 4
+    assert tracker.get_current_streak("Academia", monday + timedelta(days=11)) == 0
+    assert tracker.get_longest_streak("Academia") == 4
+    assert tracker.get_adherence("Academia", monday, monday + timedelta(days=13)) == (4, 6)
+
+    tracker.set_schedule("Academia", Schedule())
+    assert tracker.get_schedule("Academia") is DAILY
+    assert tracker.get_current_streak("Academia", monday + timedelta(days=7)) == 1
+
+def test_weekly_target_counts_weeks():
+    habit = Habit("Correr")
+    habit.set_schedule(Schedule(per_week=3))
+    monday = date(2025, 6, 2)
+    for week in range(3):
+        for offset in (0, 3, 5):
+            habit.add_completion(monday + timedelta(days=7 * week + offset))
+    habit.remove_completion(monday + timedelta(days=7 + 5))  # segunda semana: só 2
+
+    third_week = monday + timedelta(days=14)
+    assert habit.current_streak(third_week + timedelta(days=4)) == 0  # semana em andamento, anterior falhou
+    assert habit.current_streak(third_week + timedelta(days=5)) == 1  # a meta foi atingida no sábado
+    assert habit.current_streak(monday + timedelta(days=6)) == 1
+    assert habit.longest_streak() == 1
+    habit.add_completion(monday + timedelta(days=7 + 6))
+    assert habit.current_streak(third_week + timedelta(days=6)) == 3
+    assert habit.longest_streak() == 3
+    # Semanas que terminam no intervalo: a terceira ainda não terminou em 'third_week'.
+    assert habit.adherence(monday, third_week) == (2, 2)
+
+def test_schedule_validation_and_encoding():
+    with pytest.raises(ValueError):
+        Schedule(0)
+    with pytest.raises(ValueError):
+        Schedule.from_days([0, 1], per_week=3)
+    with pytest.raises(ValueError):
+        Schedule.from_days([7])
+    schedule = Schedule.from_days([4, 0], per_week=1)
+    assert schedule.days == [0, 4]
+    assert Schedule.from_dict(schedule.to_dict()) == schedule
+    assert Schedule.from_dict(None) is DAILY
+    assert Schedule.from_dict(Schedule().to_dict()) is DAILY
+    with pytest.raises(AttributeError):
+        schedule.per_week = 2
+
+def test_scheduled_streak_loads_history_only_at_the_window_edge():
+    calls = []
+    monday = date(2025, 6, 2)
+    habit = Habit.from_ordinals("Academia", [(monday + timedelta(days=o)).toordinal() for o in (0, 2, 4, 7)])
+    old_days = [(monday - timedelta(days=o)).toordinal() for o in (10, 5, 3)]  # sex, qua, sex anteriores
+    habit.set_lazy_history(monday, lambda: calls.append(1) or old_days)
+    habit.set_schedule(Schedule.from_days([0, 2, 4]))
+
+    assert habit.current_streak(monday + timedelta(days=14)) == 0
+    assert habit.history_loaded is False
+    assert habit.current_streak(monday + timedelta(days=7)) == 6
+    assert calls == [1]
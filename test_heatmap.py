@@ -0,0 +1,41 @@
+# test_heatmap.py
+from datetime import date
+import heatmap
+from habit_logic import HabitTracker
+
+
+def test_level_scale():
+    assert [heatmap.level(v, 4) for v in range(5)] == [0, 1, 2, 3, 4]
+    assert heatmap.level(1, 1) == heatmap.LEVELS - 1
+    assert heatmap.level(1, 100) == 1
+    assert heatmap.level(0, 0) == 0
+
+
+def test_view_range_and_shift():
+    assert heatmap.view_range(heatmap.VIEW_MONTH, date(2024, 2, 10)) == (date(2024, 2, 1), date(2024, 2, 29))
+    assert heatmap.view_range(heatmap.VIEW_YEAR, date(2024, 2, 10)) == (date(2024, 1, 1), date(2024, 12, 31))
+    assert heatmap.shift(heatmap.VIEW_MONTH, date(2024, 1, 31), -1) == date(2023, 12, 1)
+    assert heatmap.shift(heatmap.VIEW_MONTH, date(2024, 12, 5), 1) == date(2025, 1, 1)
+    assert heatmap.shift(heatmap.VIEW_YEAR, date(2024, 12, 5), 1) == date(2025, 1, 1)
+
+
+def test_build_month_for_one_habit_and_for_all():
+    tracker = HabitTracker()
+    for name in ("Ler", "Correr"):
+        tracker.add_habit(name)
+    tracker.mark_range("Ler", date(2025, 5, 30), date(2025, 6, 2))
+    tracker.mark_complete("Correr", date(2025, 6, 1))
+    start, end = heatmap.view_range(heatmap.VIEW_MONTH, date(2025, 6, 9))
+
+    single = heatmap.build(tracker, start, end, ["Ler"])
+    # Junho de 2025 começa num domingo: a primeira semana só tem o último dia.
+    assert single.weeks[0] == [None] * 6 + [(date(2025, 6, 1), 1)]
+    assert single.weeks[1][0] == (date(2025, 6, 2), 1)
+    assert single.weeks[-1] == [(date(2025, 6, 30), 0)] + [None] * 6
+    assert single.total == 2 and single.maximum == 1
+
+    combined = heatmap.build(tracker, start, end)
+    assert combined.weeks[0][6] == (date(2025, 6, 1), 2)
+    assert combined.level(2) == heatmap.LEVELS - 1
+    assert combined.total == 3
+    assert all(len(week) == 7 for week in combined.weeks)
@@ -0,0 +1,101 @@
+# test_http_api.py
+import http.client
+import json
+import pytest
+import persistence
+from http_api import HabitService, start_server
+
+
+@pytest.fixture
+def api(tmp_path):
+    service = HabitService(persistence.JsonBackend(str(tmp_path / "habits.json")), debounce=0.01)
+    server = start_server(service, port=0)
+    conn = http.client.HTTPConnection(*server.server_address)
+
+    def request(method, path, body=None):
+        conn.request(method, path, body=None if body is None else json.dumps(body),
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    yield request, service
+    conn.close()
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_crud_and_queries_over_one_keep_alive_connection(api):
+    request, service = api
+    assert request("POST", "/habits", {"name": "Ler"}) == (200, {"ok": True, "changed": True})
+    assert request("POST", "/habits", {"name": "Ler"})[1]["changed"] is False
+    assert request("POST", "/habits", {"name": "Beber água"})[0] == 200
+    for day in ("2025-06-01", "2025-06-02", "2025-06-03"):
+        assert request("PUT", f"/habits/Ler/days/{day}")[0] == 200
+    assert request("DELETE", "/habits/Ler/days/2025-06-01")[1]["changed"] is True
+
+    assert request("GET", "/habits/Ler/streak?date=2025-06-03") == (
+        200, {"habit": "Ler", "current_streak": 2, "longest_streak": 2})
+    assert request("GET", "/habits?prefix=b") == (200, {"habits": ["Beber água"], "total": 1})
+    assert request("POST", "/habits/Beber%20%C3%A1gua/rename", {"name": "Água"})[0] == 200
+    assert request("DELETE", "/habits/Ler")[0] == 200
+    status, body = request("GET", "/stats?date=2025-06-03")
+    assert [item["habit"] for item in body["habits"]] == ["Água"]
+
+
+def test_batch_applies_marks_as_one_event_and_persists_in_background(api, tmp_path):
+    request, service = api
+    events = []
+    service.tracker.subscribe(events.append)
+    status, body = request("POST", "/batch", [
+        {"op": "add", "habit": "Ler"},
+        {"op": "mark", "habit": "Ler", "date": "2025-06-01"},
+        {"op": "mark", "habit": "Ler", "date": "2025-06-02"},
+        {"op": "streak", "habit": "Ler", "date": "2025-06-02"},
+    ])
+    assert status == 200
+    assert body["results"][-1]["current_streak"] == 2
+    assert [event[0] for event in events] == ["add", "batch"]
+
+    service.scheduler.flush()
+    tracker = persistence.JsonBackend(str(tmp_path / "habits.json")).load()
+    assert len(tracker.get_habit("Ler").snapshot()) == 2
+
+
+def test_errors_are_reported_as_json(api):
+    request, _ = api
+    assert request("PUT", "/habits/Nada/days/2025-06-01")[0] == 404
+    assert request("GET", "/nada")[0] == 404
+    request("POST", "/habits", {"name": "Ler"})
+    assert request("PUT", "/habits/Ler/days/ontem") == (400, {"error": "Data inválida: 'ontem' (use AAAA-MM-DD)"})
+    assert request("POST", "/batch", [{"op": "voar"}])[0] == 400
+    request("POST", "/habits", {"name": "Correr"})
+    assert request("POST", "/habits/Ler/rename", {"name": "Correr"})[0] == 409
+    # A conexão continua utilizável depois dos erros.
+    assert request("GET", "/habits")[1]["total"] == 2
+
+
+def test_query_string_cannot_change_the_operation(api):
+    request, service = api
+    request("POST", "/habits", {"name": "Ler"})
+    assert request("GET", "/stats?op=delete&habit=Ler")[0] == 200
+    assert request("GET", "/habits?op=add&habit=Outro") == (200, {"habits": ["Ler"], "total": 1})
+    assert request("GET", "/habits/Ler/streak?op=delete&habit=Outro")[1]["habit"] == "Ler"
+    assert [habit.name for habit in service.tracker] == ["Ler"]
+
+
+def test_stats_survives_a_habit_deleted_while_it_runs(api, monkeypatch):
+    from habit_logic import Habit
+    request, service = api
+    for name in ("Correr", "Ler"):
+        request("POST", "/habits", {"name": name})
+    current_streak = Habit.current_streak
+
+    def streak_and_delete(habit, today):
+        service.tracker.delete_habit("Ler")  # outra requisição apagando no meio do caminho
+        return current_streak(habit, today)
+
+    monkeypatch.setattr(Habit, "current_streak", streak_and_delete)
+    status, body = request("GET", "/stats")
+    assert status == 200
+    assert [item["habit"] for item in body["habits"]] == ["Correr", "Ler"]
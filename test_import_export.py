@@ -0,0 +1,97 @@
+# test_import_export.py
+import io
+import types
+from datetime import date
+import pytest
+import import_export
+from habit_logic import HabitTracker, Schedule
+
+
+def sample_tracker() -> HabitTracker:
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.add_habit('Beber "água", 2L')
+    tracker.add_habit("Sem conclusões")
+    tracker.mark_complete("Ler", date(2025, 6, 2))
+    tracker.mark_complete("Ler", date(2025, 6, 1))
+    tracker.mark_complete('Beber "água", 2L', date(2025, 6, 1))
+    tracker.set_schedule("Sem conclusões", Schedule.from_days([0, 2, 4], per_week=2))
+    return tracker
+
+
+def state_of(tracker: HabitTracker) -> dict[str, list[int]]:
+    return {name: list(ordinals) for name, ordinals in tracker.snapshot()}
+
+
+@pytest.mark.parametrize("writer, reader", [
+    (import_export.write_csv, import_export.read_csv),
+    (import_export.write_ndjson, import_export.read_ndjson),
+])
+def test_roundtrip_keeps_habits_and_completions(writer, reader):
+    tracker = sample_tracker()
+    buffer = io.StringIO()
+    assert writer(import_export.iter_records(tracker), buffer) == 6
+
+    imported = HabitTracker()
+    buffer.seek(0)
+    assert import_export.import_records(imported, reader(buffer)) == 6
+    assert state_of(imported) == state_of(tracker)
+    assert imported.schedules() == tracker.schedules()
+
+
+def test_records_are_generated_lazily():
+    records = import_export.iter_records(sample_tracker())
+    assert isinstance(records, types.GeneratorType)
+    assert next(records) == ("Ler", None)
+    assert next(records) == ("Ler", date(2025, 6, 1))
+
+
+def test_import_merges_into_existing_tracker():
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.mark_complete("Ler", date(2025, 5, 31))
+    csv_text = "habit,date\nLer,2025-06-01\nCorrer,\n"
+    import_export.import_records(tracker, import_export.read_csv(io.StringIO(csv_text)))
+
+    assert [h.name for h in tracker] == ["Ler", "Correr"]
+    assert tracker.get_current_streak("Ler", date(2025, 6, 1)) == 2
+
+
+def test_schedules_are_exported_on_the_declaration_line():
+    tracker = HabitTracker()
+    tracker.add_habit("Academia")
+    tracker.set_schedule("Academia", Schedule.from_days([0, 2, 4]))
+    tracker.mark_complete("Academia", date(2025, 6, 2))
+    buffer = io.StringIO()
+    import_export.write_csv(import_export.iter_records(tracker), buffer)
+    assert buffer.getvalue() == ('habit,date,schedule\n'
+                                 'Academia,,"{""weekdays"":[0,2,4]}"\n'
+                                 'Academia,2025-06-02,\n')
+    buffer = io.StringIO()
+    import_export.write_ndjson(import_export.iter_records(tracker), buffer)
+    assert buffer.getvalue().split("\n")[0] == '{"habit":"Academia","schedule":{"weekdays":[0,2,4]}}'
+
+
+@pytest.mark.parametrize("reader, text, line", [
+    (import_export.read_csv, "habit,date\nLer,2025-06-01\nLer,ontem\n", 3),
+    (import_export.read_csv, "habit,date\n,2025-06-01\n", 2),
+    (import_export.read_ndjson, '{"habit": "Ler"}\n{"habit": "Ler", "date": 5}\n', 2),
+    (import_export.read_ndjson, '{"habit": "Ler"\n', 1),
+    (import_export.read_ndjson, '{"habit": "Ler", "schedule": {"weekdays": [9]}}\n', 1),
+    (import_export.read_csv, 'habit,date,schedule\nLer,,"[1]"\n', 2),
+])
+def test_invalid_lines_report_line_number(reader, text, line):
+    with pytest.raises(ValueError, match=f"Linha {line}"):
+        list(reader(io.StringIO(text)))
+
+
+def test_gzip_files_and_format_detection(tmp_path):
+    tracker = sample_tracker()
+    for name in ("backup.csv.gz", "backup.ndjson.gz", "backup.jsonl"):
+        path = str(tmp_path / name)
+        import_export.export_file(tracker, path)
+        imported = HabitTracker()
+        import_export.import_file(imported, path)
+        assert state_of(imported) == state_of(tracker)
+    with pytest.raises(ValueError):
+        import_export.detect_format("backup.txt")
@@ -0,0 +1,101 @@
+# test_instrumentation.py
+import json
+import os
+from datetime import date
+import pytest
+import instrumentation
+import persistence
+from habit_logic import HabitTracker
+from instrumentation import Histogram
+
+
+@pytest.fixture
+def profiling():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_histogram_percentiles_are_within_a_bucket():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.add(value / 1000)
+    summary = histogram.summary()
+    assert summary["count"] == 1000
+    assert summary["min"] == 0.001 and summary["max"] == 1.0
+    assert 0.5 <= summary["p50"] <= 0.5 * 1.19
+    assert 0.99 <= summary["p99"] <= 1.0
+    assert Histogram().percentile(0.5) == 0.0
+
+
+def test_disabled_by_default_and_restores_original_methods():
+    original = HabitTracker.__dict__["mark_complete"]
+    assert not instrumentation.enabled()
+    assert instrumentation.timed("x") is instrumentation.timed("y")  # o mesmo no-op
+
+    instrumentation.enable()
+    try:
+        assert HabitTracker.__dict__["mark_complete"] is not original
+        instrumentation.enable()  # idempotente: não envolve duas vezes
+        assert HabitTracker.__dict__["mark_complete"].__wrapped__ is original
+    finally:
+        instrumentation.disable()
+    assert HabitTracker.__dict__["mark_complete"] is original
+
+
+def test_records_tracker_calls_persistence_sizes_and_counters(profiling, tmp_path):
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.mark_complete("Ler", date(2025, 6, 1))
+    tracker.get_current_streak("Ler", date(2025, 6, 1))
+    backend = persistence.JsonBackend(str(tmp_path / "habits.json"))
+    backend.save(tracker)
+    backend.load()
+    with instrumentation.timed("gui.build_habit_list"):
+        instrumentation.count("gui.rows_created", 3)
+
+    data = instrumentation.report()
+    assert data["timers"]["tracker.mark_complete"]["count"] == 1
+    assert data["timers"]["tracker.get_current_streak"]["count"] == 1
+    assert data["timers"]["gui.build_habit_list"]["count"] == 1
+    size = (tmp_path / "habits.json").stat().st_size
+    assert data["sizes"]["persistence.JsonBackend.save"]["max"] == size
+    assert data["sizes"]["persistence.JsonBackend.load"]["max"] == size
+    assert data["counters"] == {"gui.rows_created": 3}
+    assert "tracker.mark_complete" in instrumentation.format_report()
+
+
+def test_sharded_backend_is_instrumented(profiling, tmp_path):
+    from sharded_storage import ShardedBackend
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    backend = ShardedBackend(str(tmp_path / "shards"))
+    backend.save(tracker)
+    backend.load()
+
+    data = instrumentation.report()
+    assert data["timers"]["persistence.ShardedBackend.save"]["count"] == 1
+    assert data["timers"]["persistence.ShardedBackend.load"]["count"] == 1
+    assert data["sizes"]["persistence.ShardedBackend.save"]["max"] == os.path.getsize(backend.path)
+
+
+def test_enable_from_env_dumps_report_at_exit(monkeypatch, tmp_path):
+    registered = []
+    monkeypatch.setattr(instrumentation.atexit, "register", lambda *args: registered.append(args))
+    monkeypatch.setenv(instrumentation.ENV_VAR, "0")
+    assert instrumentation.enable_from_env() is False
+
+    path = str(tmp_path / "perfil.json")
+    monkeypatch.setenv(instrumentation.ENV_VAR, path)
+    try:
+        assert instrumentation.enable_from_env() is True
+        HabitTracker().add_habit("Ler")
+        func, target = registered[0]
+        func(target)
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["timers"]["tracker.add_habit"]["count"] == 1
@@ -1,9 +1,10 @@
 # test_integration.py
 import os
 import json
+import pytest
 from datetime import date, timedelta
-from habit_logic import HabitTracker
-from persistence import save_data, load_data
+from habit_logic import HabitTracker, Schedule
+from persistence import save_data, load_data, Journal
 import app_date_manager
 
 # --- Fixture para gerenciar o ambiente de teste ---
@@ -13,16 +14,23 @@ def setup_function(function):
     """Executado antes de cada função de teste."""
     import persistence
     persistence.DATA_FILE = "test_habits_data.json"
-    if os.path.exists(persistence.DATA_FILE):
-        os.remove(persistence.DATA_FILE)
+    for path in (persistence.DATA_FILE, persistence.journal_path(),
+                 persistence.DATA_FILE + persistence.CORRUPT_SUFFIX,
+                 persistence.DATA_FILE + ".1" + persistence.CORRUPT_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
     app_date_manager._today_func = app_date_manager._get_real_today
     app_date_manager.reset_to_today()
 
 def teardown_function(function):
     """Executado após cada função de teste."""
-    if os.path.exists(TEST_DATA_FILE):
-        os.remove(TEST_DATA_FILE)
     import persistence
+    for path in (TEST_DATA_FILE, persistence.journal_path(),
+                 TEST_DATA_FILE + persistence.CORRUPT_SUFFIX,
+                 TEST_DATA_FILE + ".1" + persistence.CORRUPT_SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+    persistence.set_fsync_policy(persistence.FSYNC_ALWAYS)
     persistence.DATA_FILE = "habits_data.json"
     app_date_manager._today_func = app_date_manager._get_real_today
 
@@ -161,3 +169,314 @@ def test_streak_calculation_with_date_manager_integration():
 
     app_date_manager.advance_day() 
     assert app_date_manager.get_current_app_date() == date(2025, 7, 2)
+
+
+def test_journal_replays_changes_without_snapshot():
+    """
+    Testa se as alterações registradas no diário são recuperadas por load_data
+    mesmo sem nenhum save_data depois delas.
+    Componentes: HabitTracker <-> persistence.Journal <-> File System
+    """
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    save_data(tracker)
+    journal = Journal(tracker)
+
+    dia = date(2025, 7, 1)
+    tracker.add_habit("Correr")
+    tracker.mark_complete("Ler", dia)
+    tracker.mark_complete("Correr", dia)
+    tracker.mark_incomplete("Correr", dia)
+    tracker.delete_habit("Ler")
+    tracker.add_habit("Ler")
+    tracker.mark_complete("Ler", dia - timedelta(days=1))
+    journal.close()
+
+    tracker_carregado = load_data()
+    assert [h.name for h in tracker_carregado.habits] == ["Correr", "Ler"]
+    assert tracker_carregado.get_habit("Ler").completions == {dia - timedelta(days=1)}
+    assert len(tracker_carregado.get_habit("Correr").completions) == 0
+
+def test_journal_compaction_and_torn_line():
+    """
+    Testa se o diário é compactado em um snapshot após 'compact_every' eventos
+    e se uma última linha incompleta é ignorada na leitura e cortada antes
+    de o diário receber novos eventos.
+    Componentes: persistence.Journal <-> File System
+    """
+    import persistence
+    tracker = HabitTracker()
+    journal = Journal(tracker, compact_every=3)
+    tracker.add_habit("Yoga")
+    tracker.mark_complete("Yoga", date(2025, 6, 1))
+    tracker.mark_complete("Yoga", date(2025, 6, 2))  # 3º evento: compacta em segundo plano
+    journal.flush()  # espera a compactação
+    assert os.path.getsize(persistence.journal_path()) == 0
+    tracker.mark_complete("Yoga", date(2025, 6, 3))
+    journal.close()
+    with open(persistence.journal_path(), "a", encoding="utf-8") as f:
+        f.write('["c","Yoga","2025-06')
+
+    tracker_carregado = load_data()
+    assert tracker_carregado.get_current_streak("Yoga", date(2025, 6, 3)) == 3
+
+    # Um evento anexado depois da linha incompleta não se perde com ela.
+    journal = Journal(tracker_carregado)
+    tracker_carregado.mark_complete("Yoga", date(2025, 6, 4))
+    journal.close()
+    assert load_data().get_current_streak("Yoga", date(2025, 6, 4)) == 4
+
+def test_save_is_atomic_and_corrupt_file_is_preserved():
+    """
+    Testa se save_data não deixa arquivos temporários para trás e se um arquivo
+    corrompido é preservado (em vez de ser sobrescrito no próximo save).
+    Componentes: persistence.py <-> File System
+    """
+    import persistence
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    for policy in (persistence.FSYNC_ALWAYS, persistence.FSYNC_BATCH, persistence.FSYNC_NEVER):
+        persistence.set_fsync_policy(policy, batch_size=2)
+        save_data(tracker)
+        assert load_data().get_habit("Ler") is not None
+    assert not [f for f in os.listdir(".") if f.startswith(TEST_DATA_FILE) and f.endswith(".tmp")]
+
+    with open(TEST_DATA_FILE, "w") as f:
+        f.write('{"habits": [{"name": "Ler", "compl')
+    assert len(load_data().habits) == 0
+    assert os.path.exists(TEST_DATA_FILE + persistence.CORRUPT_SUFFIX)
+    assert not os.path.exists(TEST_DATA_FILE)
+
+    # Uma segunda corrupção não apaga a cópia guardada da primeira.
+    with open(TEST_DATA_FILE, "w") as f:
+        f.write("{segunda")
+    assert len(load_data().habits) == 0
+    with open(TEST_DATA_FILE + persistence.CORRUPT_SUFFIX) as f:
+        assert f.read().startswith('{"habits"')
+    with open(TEST_DATA_FILE + ".1" + persistence.CORRUPT_SUFFIX) as f:
+        assert f.read() == "{segunda"
+
+@pytest.mark.skipif(os.name != "posix", reason="permissões POSIX")
+def test_save_keeps_the_file_permissions():
+    import persistence
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    save_data(tracker)
+    # Arquivo novo: as permissões de um open() comum (0666 menos a umask), não as 0600 do mkstemp.
+    assert os.stat(TEST_DATA_FILE).st_mode & 0o777 == persistence._NEW_FILE_MODE
+    os.chmod(TEST_DATA_FILE, 0o640)
+    save_data(tracker)
+    assert os.stat(TEST_DATA_FILE).st_mode & 0o777 == 0o640
+
+def test_fsync_batch_counts_concurrent_writes():
+    import threading
+    import persistence
+    persistence.set_fsync_policy(persistence.FSYNC_BATCH, batch_size=10)
+    results = []
+
+    def write():
+        results.extend(persistence._should_fsync() for _ in range(1000))
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(results) == 800
+
+def test_unknown_fsync_policy_raises_error():
+    import persistence
+    with pytest.raises(ValueError):
+        persistence.set_fsync_policy("sometimes")
+
+def test_lazy_load_keeps_old_history_pending():
+    """
+    Testa se load_data com janela carrega só os dias recentes e busca o resto
+    quando uma consulta precisa dele.
+    Componentes: persistence.py <-> HabitTracker <-> File System
+    """
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.add_habit("Correr")
+    hoje = date.today()
+    for offset in range(60):
+        tracker.mark_complete("Ler", hoje - timedelta(days=offset))
+    tracker.mark_complete("Correr", hoje)
+    tracker.mark_complete("Correr", hoje - timedelta(days=40))
+    save_data(tracker)
+
+    tracker_carregado = load_data(window_days=7)
+    correr = tracker_carregado.get_habit("Correr")
+    assert tracker_carregado.get_current_streak("Correr", hoje) == 1
+    assert not correr.history_loaded
+    assert tracker_carregado.get_current_streak("Ler", hoje) == 60
+    assert tracker_carregado.get_habit("Ler").history_loaded
+    assert len(correr.completions) == 2
+
+class SlowCountingBackend:
+    """Backend JSON que demora para salvar e conta quantos saves fez."""
+    def __init__(self, delay=0.05):
+        import persistence
+        self.json = persistence.JsonBackend()
+        self.delay = delay
+        self.saves = 0
+
+    def save(self, tracker):
+        import time
+        time.sleep(self.delay)
+        self.json.save(tracker)
+        self.saves += 1
+
+    def load(self, store=None, window_days=None, today=None):
+        return self.json.load(store, window_days=window_days, today=today)
+
+def test_async_saves_are_coalesced_and_survive_cancellation():
+    """
+    Testa se vários save_data_async simultâneos viram poucas gravações e se
+    cancelar quem espera não interrompe a gravação.
+    Componentes: persistence.py (API assíncrona) <-> File System
+    """
+    import asyncio
+    import persistence
+    backend = SlowCountingBackend()
+    persistence.set_backend(backend)
+    tracker = HabitTracker()
+    hoje = date.today()
+
+    async def scenario():
+        tracker.add_habit("Ler")
+        first = asyncio.create_task(persistence.save_data_async(tracker))
+        await asyncio.sleep(0.01)  # o primeiro save já começou
+        tracker.mark_complete("Ler", hoje)
+        others = [asyncio.create_task(persistence.save_data_async(tracker)) for _ in range(10)]
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.gather(*others)
+        return await persistence.load_data_async()
+
+    try:
+        carregado = asyncio.run(scenario())
+    finally:
+        persistence.set_backend(None)
+
+    assert backend.saves == 2
+    assert carregado.is_complete_today("Ler", hoje)
+
+def test_async_save_errors_reach_every_waiter():
+    import asyncio
+    import persistence
+
+    class FailingBackend(SlowCountingBackend):
+        def save(self, tracker):
+            raise OSError("disco cheio")
+
+    persistence.set_backend(FailingBackend())
+    tracker = HabitTracker()
+
+    async def scenario():
+        return await asyncio.gather(*(persistence.save_data_async(tracker) for _ in range(3)),
+                                    return_exceptions=True)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        persistence.set_backend(None)
+    assert all(isinstance(r, OSError) for r in results)
+
+def test_binary_snapshot_is_detected_on_load():
+    """
+    Testa se o snapshot binário é lido de volta (com diário e carga
+    preguiçosa) e se a troca de formato é detectada na carga.
+    Componentes: persistence.py <-> binary_format.py <-> File System
+    """
+    import persistence
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    hoje = date.today()
+    for offset in range(30):
+        tracker.mark_complete("Ler", hoje - timedelta(days=offset))
+    try:
+        persistence.set_snapshot_format(persistence.FORMAT_BINARY)
+        save_data(tracker)
+        with open(TEST_DATA_FILE, "rb") as f:
+            assert f.read(4) == b"HTRK"
+        journal = Journal(tracker)
+        tracker.add_habit("Correr")
+        tracker.mark_complete("Correr", hoje)
+        journal.close()
+
+        carregado = load_data(window_days=7)
+        assert not carregado.get_habit("Ler").history_loaded
+        assert carregado.get_current_streak("Ler", hoje) == 30
+        assert carregado.is_complete_today("Correr", hoje)
+
+        # De volta ao JSON: o arquivo binário continua legível até o próximo save.
+        persistence.set_snapshot_format(persistence.FORMAT_JSON)
+        save_data(carregado)
+        assert json.load(open(TEST_DATA_FILE))["habits"][0]["name"] == "Ler"
+        assert load_data().get_longest_streak("Ler") == 30
+    finally:
+        persistence.set_snapshot_format(persistence.FORMAT_JSON)
+
+def test_corrupt_binary_snapshot_is_preserved():
+    import persistence
+    with open(TEST_DATA_FILE, "wb") as f:
+        f.write(b"HTRK\x01\x01" + b"lixo")
+    assert len(load_data()) == 0
+    assert os.path.exists(TEST_DATA_FILE + persistence.CORRUPT_SUFFIX)
+    with pytest.raises(ValueError):
+        persistence.set_snapshot_format("xml")
+
+def test_journal_writes_batches_at_once_and_replays_them():
+    """
+    Testa se operações em lote e renomeações vão para o diário numa única
+    escrita e são reaplicadas na carga.
+    Componentes: HabitTracker (lote) <-> Journal <-> File System
+    """
+    hoje = date(2025, 6, 30)
+    tracker = HabitTracker()
+    tracker.add_habit("Yoga")
+    save_data(tracker)
+    journal = Journal(tracker)
+    writes = []
+    original_write = journal._file.write
+    journal._file.write = lambda text: (writes.append(text), original_write(text))[1]
+
+    tracker.mark_range("Yoga", hoje - timedelta(days=29), hoje)
+    tracker.rename_habit("Yoga", "Ioga")
+    tracker.apply_operations([("Ioga", hoje, False)])
+    journal.close()
+
+    assert len(writes) == 3
+    assert writes[0].count("\n") == 30
+    carregado = load_data()
+    assert [h.name for h in carregado] == ["Ioga"]
+    assert carregado.get_current_streak("Ioga", hoje) == 29
+    assert not carregado.is_complete_today("Ioga", hoje)
+
+@pytest.mark.parametrize("snapshot_format", ["json", "binary"])
+def test_schedules_survive_snapshot_and_journal(snapshot_format):
+    """
+    Testa se as agendas dos hábitos são gravadas no snapshot (JSON ou
+    binário) e no diário, e reaplicadas na carga.
+    Componentes: HabitTracker <-> Journal <-> persistence <-> File System
+    """
+    import persistence
+    persistence.set_snapshot_format(snapshot_format)
+    try:
+        tracker = HabitTracker()
+        for name in ("Academia", "Correr", "Ler"):
+            tracker.add_habit(name)
+        tracker.set_schedule("Academia", Schedule.from_days([0, 2, 4]))
+        save_data(tracker)
+        journal = Journal(tracker)
+        tracker.set_schedule("Correr", Schedule(per_week=3))
+        tracker.set_schedule("Academia", Schedule())
+        journal.close()
+
+        carregado = load_data()
+        assert carregado.schedules() == {"Correr": Schedule(per_week=3)}
+        save_data(carregado)
+        assert load_data().schedules() == {"Correr": Schedule(per_week=3)}
+    finally:
+        persistence.set_snapshot_format(persistence.FORMAT_JSON)
@@ -0,0 +1,111 @@
+# test_main_gui.py
+from datetime import date, timedelta
+import flet as ft
+import pytest
+from habit_logic import HabitTracker
+from main_gui import HabitControl, HabitListView
+
+DAY = date(2025, 6, 10)
+
+
+@pytest.fixture
+def refreshed(monkeypatch):
+    """Nomes dos HabitControl revisados por refresh, na ordem."""
+    names = []
+    original = HabitControl.refresh
+
+    def refresh(self, current_app_date, state=None):
+        names.append(self.habit_name)
+        return original(self, current_app_date, state)
+
+    monkeypatch.setattr(HabitControl, "refresh", refresh)
+    return names
+
+
+def make_view(names, page_size: int = 50) -> tuple[HabitTracker, HabitListView]:
+    tracker = HabitTracker()
+    for name in names:
+        tracker.add_habit(name)
+    # A ListView não precisa estar numa página: a reconciliação só mexe em .controls.
+    return tracker, HabitListView(ft.ListView(), tracker, lambda: None, page_size=page_size)
+
+
+def controls_by_name(view: HabitListView) -> dict[str, HabitControl]:
+    return {control.habit_name: control for control in view.list_view.controls}
+
+
+def test_render_reuses_controls(refreshed):
+    tracker, view = make_view(["Correr", "Ler"])
+    view.render(DAY)
+    before = controls_by_name(view)
+    assert list(before) == ["Correr", "Ler"] == view.names
+
+    tracker.add_habit("Meditar")
+    view.render(DAY)
+    after = controls_by_name(view)
+    assert list(after) == ["Correr", "Ler", "Meditar"]
+    assert after["Correr"] is before["Correr"] and after["Ler"] is before["Ler"]
+    assert refreshed == []  # a linha nova já nasce atualizada
+
+
+def test_render_refreshes_only_changed_names(refreshed):
+    tracker, view = make_view(["Correr", "Ler", "Nadar"])
+    view.render(DAY)
+    tracker.mark_complete("Ler", DAY)
+    view.render(DAY)
+    assert refreshed == ["Ler"]
+    assert controls_by_name(view)["Ler"].checkbox.value is True
+
+    refreshed.clear()
+    view.render(DAY)
+    assert refreshed == []
+
+    view.render(DAY + timedelta(days=1))  # com a data nova, todas as linhas são revisadas
+    assert sorted(refreshed) == ["Correr", "Ler", "Nadar"]
+    assert controls_by_name(view)["Ler"].checkbox.value is False
+
+
+def test_rename_and_delete_drop_the_old_rows(refreshed):
+    tracker, view = make_view(["Correr", "Ler", "Nadar"])
+    view.render(DAY)
+    before = controls_by_name(view)
+
+    tracker.rename_habit("Ler", "Yoga")
+    tracker.delete_habit("Correr")
+    view.render(DAY)
+    after = controls_by_name(view)
+    assert list(after) == ["Nadar", "Yoga"]
+    assert after["Nadar"] is before["Nadar"]
+    assert after["Yoga"] not in before.values()
+    assert refreshed == []
+
+
+def test_page_is_clamped_when_it_becomes_empty():
+    tracker, view = make_view([f"h{i:02d}" for i in range(5)], page_size=2)
+    view.render(DAY)
+    view.next_page()
+    view.next_page()
+    view.next_page()  # não passa da última página
+    view.render(DAY)
+    assert (view.offset, view.names) == (4, ["h04"])
+
+    tracker.delete_habit("h04")
+    view.render(DAY)
+    assert (view.offset, view.names) == (2, ["h02", "h03"])
+
+    for name in ("h00", "h01", "h02", "h03"):
+        tracker.delete_habit(name)
+    view.render(DAY)
+    assert (view.offset, view.names, len(view.list_view.controls)) == (0, [], 0)
+
+
+def test_session_without_user_is_anonymous():
+    from types import SimpleNamespace
+    from main_gui import _session_user_id
+
+    def page(query):
+        return SimpleNamespace(query=SimpleNamespace(to_dict=query), session_id="s1")
+
+    assert _session_user_id(page({"user": " ana "})) == "ana"
+    assert _session_user_id(page({"user": "  "})) is None
+    assert _session_user_id(page({})) is None
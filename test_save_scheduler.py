@@ -0,0 +1,120 @@
+# test_save_scheduler.py
+import threading
+import time
+from datetime import date
+import persistence
+from habit_logic import HabitTracker
+from save_scheduler import SaveScheduler
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+def test_burst_of_requests_becomes_one_save():
+    saves = []
+    scheduler = SaveScheduler(lambda: saves.append(1), debounce=0.05)
+    for _ in range(20):
+        scheduler.request_save()
+    assert wait_until(lambda: saves == [1])
+    time.sleep(0.1)
+    assert scheduler.stats() == {"requested": 20, "performed": 1, "coalesced": 19,
+                                 "errors": 0, "pending": 0}
+    scheduler.close()
+
+def test_counters_reach_the_instrumentation_report():
+    import instrumentation
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        failures = [RuntimeError("disco cheio")]
+        def save():
+            if failures:
+                raise failures.pop()
+        scheduler = SaveScheduler(save, debounce=60)
+        for _ in range(3):
+            scheduler.request_save()
+        scheduler.flush()  # falha: continua pendente
+        scheduler.flush()
+        scheduler.close()
+        assert instrumentation.report()["counters"] == {
+            "save_scheduler.requested": 3, "save_scheduler.coalesced": 2,
+            "save_scheduler.errors": 1, "save_scheduler.performed": 1}
+    finally:
+        instrumentation.disable()
+        instrumentation.reset()
+
+def test_close_flushes_pending_save():
+    saves = []
+    scheduler = SaveScheduler(lambda: saves.append(1), debounce=60)
+    scheduler.request_save()
+    scheduler.close()
+    assert saves == [1]
+    scheduler.close()
+    assert saves == [1]
+
+def test_flush_waits_for_save_in_progress():
+    started, release, saves = threading.Event(), threading.Event(), []
+    def slow_save():
+        started.set()
+        release.wait()
+        saves.append(1)
+    scheduler = SaveScheduler(slow_save, debounce=0)
+    scheduler.request_save()
+    assert started.wait(1)
+    flusher = threading.Thread(target=scheduler.flush)
+    flusher.start()
+    time.sleep(0.05)
+    assert flusher.is_alive()
+    release.set()
+    flusher.join(1)
+    assert saves == [1]
+    scheduler.close()
+
+def test_failed_save_stays_pending():
+    attempts = []
+    def failing_save():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("disco cheio")
+    scheduler = SaveScheduler(failing_save, debounce=60)
+    scheduler.request_save()
+    scheduler.flush()
+    assert scheduler.errors == 1 and scheduler.stats()["pending"] == 1
+    scheduler.close()
+    assert len(attempts) == 2 and scheduler.performed == 1
+
+def test_buffered_journal_written_by_scheduler(tmp_path):
+    backend = persistence.JsonBackend(str(tmp_path / "habits_data.json"))
+    tracker = HabitTracker()
+    recorder = backend.attach(tracker, autoflush=False)
+    scheduler = SaveScheduler(recorder.flush, debounce=60)
+    tracker.add_habit("Ler")
+    tracker.mark_complete("Ler", date(2025, 6, 9))
+    scheduler.request_save()
+    assert backend.load().get_habit("Ler") is None
+    scheduler.close()
+    recorder.close()
+    assert backend.load().is_complete_today("Ler", date(2025, 6, 9))
+
+def test_buffered_journal_compacts_in_flush_not_in_record(tmp_path):
+    backend = persistence.JsonBackend(str(tmp_path / "habits_data.json"))
+    saves = []
+    original_save = backend.save
+    backend.save = lambda tracker: (saves.append(threading.current_thread()), original_save(tracker))[1]
+    tracker = HabitTracker()
+    recorder = persistence.Journal(tracker, compact_every=3, backend=backend, autoflush=False)
+    tracker.add_habit("Ler")
+    for day in range(1, 6):
+        tracker.mark_complete("Ler", date(2025, 6, day))
+    assert saves == []  # o clique não paga pelo snapshot
+
+    scheduler = SaveScheduler(recorder.flush, debounce=0.01)
+    scheduler.request_save()
+    assert wait_until(lambda: len(saves) == 1)
+    scheduler.close()
+    assert len(saves) == 1 and saves[0] is not threading.current_thread()
+    assert recorder.events == 0
+    recorder.close()
+    assert backend.load().get_current_streak("Ler", date(2025, 6, 5)) == 5
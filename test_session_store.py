@@ -0,0 +1,133 @@
+# test_session_store.py
+import os
+import threading
+from datetime import date
+import pytest
+import app_date_manager
+from app_date_manager import DateContext
+from persistence import JsonBackend
+from session_store import TrackerStore, user_data_path
+
+HOJE = date(2025, 7, 10)
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    stores = []
+
+    def make(capacity=8):
+        store = TrackerStore(lambda user_id: JsonBackend(user_data_path(str(tmp_path), user_id)),
+                             capacity=capacity, debounce=0.01)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_users_have_separate_trackers_and_files(make_store, tmp_path):
+    store = make_store()
+    ana, bia = store.acquire("ana"), store.acquire("bia")
+    ana.tracker.add_habit("Ler")
+    ana.request_save()
+    bia.tracker.add_habit("Correr")
+    bia.request_save()
+    store.flush_all()
+
+    assert [h.name for h in JsonBackend(user_data_path(str(tmp_path), "ana")).load()] == ["Ler"]
+    assert [h.name for h in JsonBackend(user_data_path(str(tmp_path), "bia")).load()] == ["Correr"]
+
+
+def test_sessions_of_same_user_share_tracker(make_store):
+    store = make_store()
+    first, second = store.acquire("ana"), store.acquire("ana")
+    assert first is second
+    assert first.sessions == 2
+    assert store.loads == 1
+
+
+def test_lru_eviction_saves_and_skips_open_sessions(make_store, tmp_path):
+    store = make_store(capacity=2)
+    ana = store.acquire("ana")  # sessão aberta: não pode ser descartada
+    for user in ("bia", "caio", "duda"):
+        entry = store.acquire(user)
+        entry.tracker.add_habit(f"Hábito de {user}")
+        entry.tracker.mark_complete(f"Hábito de {user}", HOJE)
+        store.release(entry)
+
+    assert len(store) == 2
+    assert store.evictions == 2
+    assert ana.tracker is not None
+    # O usuário descartado foi gravado e volta do disco na próxima sessão.
+    caio = store.acquire("caio")
+    assert caio.tracker.is_complete_today("Hábito de caio", HOJE)
+    assert store.loads == 5
+
+
+def test_concurrent_acquire_loads_user_once(make_store):
+    store = make_store()
+    entries = []
+    threads = [threading.Thread(target=lambda: entries.append(store.acquire("ana"))) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert store.loads == 1
+    assert len({id(e) for e in entries}) == 1
+    assert entries[0].sessions == 16
+
+
+def test_acquire_waits_for_an_unload_in_progress(make_store, monkeypatch):
+    import session_store
+    store = make_store(capacity=1)
+    ana = store.acquire("ana")
+    ana.tracker.add_habit("Ler")
+    ana.request_save()  # ainda no buffer quando a entrada é descartada
+    store.release(ana)
+
+    unloading, proceed = threading.Event(), threading.Event()
+    original_unload = session_store.UserEntry._unload
+
+    def slow_unload(entry):
+        if entry is ana:
+            unloading.set()
+            proceed.wait(2)
+        original_unload(entry)
+    monkeypatch.setattr(session_store.UserEntry, "_unload", slow_unload)
+
+    evictor = threading.Thread(target=lambda: store.release(store.acquire("bia")))
+    evictor.start()
+    assert unloading.wait(2)
+    result = {}
+    loader = threading.Thread(target=lambda: result.update(entry=store.acquire("ana")))
+    loader.start()
+    loader.join(0.1)
+    assert loader.is_alive()  # espera a gravação da entrada descartada
+    proceed.set()
+    loader.join(2)
+    evictor.join(2)
+    assert "Ler" in result["entry"].tracker
+    store.release(result["entry"])
+
+
+def test_user_data_path_hashes_unsafe_ids(tmp_path):
+    assert user_data_path("dados", "ana_1") == os.path.join("dados", "ana_1.json")
+    unsafe = user_data_path("dados", "../../etc/passwd")
+    assert ".." not in unsafe
+    assert unsafe != user_data_path("dados", "../../etc/shadow")
+
+
+def test_date_contexts_are_independent():
+    hoje_falso = HOJE
+    first = DateContext(lambda: hoje_falso)
+    second = DateContext(lambda: hoje_falso)
+    first.rewind_day()
+    first.rewind_day()
+    second.advance_day()  # não passa de hoje
+
+    assert first.get_current_app_date() == date(2025, 7, 8)
+    assert second.get_current_app_date() == HOJE
+    # O contexto padrão do módulo não é afetado pelas sessões.
+    assert app_date_manager.get_current_app_date() == app_date_manager.default_context().get_current_app_date()
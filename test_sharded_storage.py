@@ -0,0 +1,145 @@
+# test_sharded_storage.py
+import os
+from datetime import date, timedelta
+import pytest
+import persistence
+from habit_logic import HabitTracker, Schedule
+from sharded_storage import ShardedBackend, migrate_json, shard_file_name
+
+TODAY = date(2025, 7, 1)
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "habits_data")
+
+
+def sample_tracker() -> HabitTracker:
+    tracker = HabitTracker()
+    for name in ("Ler", "Correr", "Água/2L"):
+        tracker.add_habit(name)
+    for offset in range(200):
+        tracker.mark_complete("Ler", TODAY - timedelta(days=offset))
+    tracker.mark_complete("Correr", TODAY)
+    return tracker
+
+
+def state_of(tracker: HabitTracker) -> list[tuple[str, list[int]]]:
+    return [(name, list(ordinals)) for name, ordinals in tracker.snapshot()]
+
+
+@pytest.mark.parametrize("snapshot_format", [persistence.FORMAT_JSON, persistence.FORMAT_BINARY])
+@pytest.mark.parametrize("workers", [1, 4])
+def test_round_trip_keeps_order_and_supports_lazy_window(directory, snapshot_format, workers):
+    tracker = sample_tracker()
+    ShardedBackend(directory, snapshot_format).save(tracker)
+
+    backend = ShardedBackend(directory, workers=workers)
+    assert state_of(backend.load()) == state_of(tracker)
+    lazy = backend.load(window_days=30, today=TODAY)
+    assert not lazy.get_habit("Ler").history_loaded
+    assert lazy.get_current_streak("Ler", TODAY) == 200
+
+
+def test_save_rewrites_only_dirty_shards(directory):
+    backend = ShardedBackend(directory)
+    tracker = sample_tracker()
+    backend.save(tracker)
+    assert backend.shards_written == 3
+    manifest_mtime = os.stat(backend.path).st_mtime_ns
+
+    tracker.mark_complete("Correr", TODAY - timedelta(days=1))
+    backend.save(tracker)
+    assert backend.shards_written == 1
+    assert os.stat(backend.path).st_mtime_ns == manifest_mtime  # a lista de hábitos não mudou
+
+    backend.save(tracker)
+    assert backend.shards_written == 0
+
+
+def test_rename_and_delete_update_manifest_and_remove_old_shards(directory):
+    backend = ShardedBackend(directory)
+    tracker = sample_tracker()
+    backend.save(tracker)
+    tracker.rename_habit("Ler", "Leitura")
+    tracker.delete_habit("Correr")
+    backend.save(tracker)
+
+    assert backend.shards_written == 1
+    assert sorted(os.listdir(backend.shards_directory)) == sorted(
+        shard_file_name(name, persistence.FORMAT_JSON) for name in ("Leitura", "Água/2L"))
+    assert state_of(ShardedBackend(directory).load()) == state_of(tracker)
+
+
+def test_loaded_tracker_is_clean_until_changed(directory):
+    ShardedBackend(directory).save(sample_tracker())
+    backend = ShardedBackend(directory)
+    tracker = backend.load()
+    backend.save(tracker)
+    assert backend.shards_written == 0
+
+
+def test_corrupt_shard_loses_only_that_habit(directory):
+    backend = ShardedBackend(directory)
+    backend.save(sample_tracker())
+    corrupt = os.path.join(backend.shards_directory, shard_file_name("Correr", persistence.FORMAT_JSON))
+    with open(corrupt, "w", encoding="utf-8") as f:
+        f.write('{"name": "Correr", "compl')
+
+    reloaded = ShardedBackend(directory)
+    tracker = reloaded.load()
+    assert [h.name for h in tracker] == ["Ler", "Água/2L"]
+    assert os.path.exists(corrupt + persistence.CORRUPT_SUFFIX)
+    reloaded.save(tracker)
+    assert [h.name for h in ShardedBackend(directory).load()] == ["Ler", "Água/2L"]
+
+
+def test_habits_are_recovered_from_shards_without_manifest(directory):
+    backend = ShardedBackend(directory)
+    tracker = sample_tracker()
+    backend.save(tracker)
+    with open(backend.path, "w", encoding="utf-8") as f:
+        f.write("{corrompido")
+
+    recovered = ShardedBackend(directory).load()
+    assert sorted(state_of(recovered)) == sorted(state_of(tracker))
+    assert os.path.exists(backend.path + persistence.CORRUPT_SUFFIX)
+
+
+def test_journal_and_compaction(directory):
+    backend = ShardedBackend(directory)
+    tracker = sample_tracker()
+    backend.save(tracker)
+    journal = persistence.Journal(tracker, compact_every=3, backend=backend)
+    tracker.mark_complete("Correr", TODAY - timedelta(days=1))
+    tracker.add_habit("Meditar")
+    assert state_of(ShardedBackend(directory).load()) == state_of(tracker)
+
+    tracker.mark_complete("Meditar", TODAY)  # terceiro evento: compacta em segundo plano
+    journal.flush()  # espera a compactação
+    assert backend.shards_written == 2  # Correr e Meditar
+    assert os.path.getsize(persistence.journal_path(backend.path)) == 0
+    journal.close()
+    assert state_of(ShardedBackend(directory).load()) == state_of(tracker)
+
+
+def test_migrate_json(tmp_path, directory):
+    json_path = str(tmp_path / "habits.json")
+    tracker = sample_tracker()
+    persistence.JsonBackend(json_path).save(tracker)
+    migrate_json(json_path, directory)
+    assert state_of(ShardedBackend(directory).load()) == state_of(tracker)
+
+
+@pytest.mark.parametrize("snapshot_format", [persistence.FORMAT_JSON, persistence.FORMAT_BINARY])
+def test_schedule_change_rewrites_only_that_shard(directory, snapshot_format):
+    backend = ShardedBackend(directory, snapshot_format)
+    tracker = sample_tracker()
+    backend.save(tracker)
+
+    tracker.set_schedule("Correr", Schedule(per_week=3))
+    backend.save(tracker)
+    assert backend.shards_written == 1
+    loaded = ShardedBackend(directory).load()
+    assert loaded.schedules() == {"Correr": Schedule(per_week=3)}
+    assert loaded.get_current_streak("Correr", TODAY) == 0
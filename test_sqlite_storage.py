@@ -0,0 +1,141 @@
+# test_sqlite_storage.py
+from datetime import date, timedelta
+import pytest
+import persistence
+from completion_store import ArrayCompletionStore
+from habit_logic import HabitTracker, Schedule
+from sqlite_storage import SqliteBackend, migrate_json
+
+TODAY = date(2025, 7, 1)
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "habits.db")
+
+def sample_tracker() -> HabitTracker:
+    tracker = HabitTracker()
+    tracker.add_habit("Ler")
+    tracker.add_habit("Correr")
+    for offset in range(10):
+        tracker.mark_complete("Ler", TODAY - timedelta(days=offset))
+    tracker.mark_complete("Correr", TODAY)
+    return tracker
+
+def test_save_and_load_round_trip(db_path):
+    backend = SqliteBackend(db_path)
+    backend.save(sample_tracker())
+    tracker = SqliteBackend(db_path).load(store=ArrayCompletionStore)
+    assert [h.name for h in tracker] == ["Ler", "Correr"]
+    assert tracker.get_current_streak("Ler", TODAY) == 10
+    assert tracker.get_habit("Correr").completions == {TODAY}
+
+def test_save_removes_deleted_habits(db_path):
+    backend = SqliteBackend(db_path)
+    tracker = sample_tracker()
+    backend.save(tracker)
+    tracker.delete_habit("Ler")
+    backend.save(tracker)
+    assert [h.name for h in backend.load()] == ["Correr"]
+    assert backend._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0] == 1
+
+def test_partial_load_since_date(db_path):
+    backend = SqliteBackend(db_path)
+    backend.save(sample_tracker())
+    tracker = backend.load(since=TODAY - timedelta(days=2))
+    ler = tracker.get_habit("Ler")
+    assert not ler.history_loaded
+    assert tracker.get_current_streak("Correr", TODAY) == 1
+
+    # As conclusões anteriores a 'since' continuam no banco depois de um save.
+    backend.save(tracker)
+    assert len(backend.load().get_habit("Ler").completions) == 10
+
+def test_attach_applies_each_change(db_path):
+    backend = SqliteBackend(db_path)
+    tracker = HabitTracker()
+    recorder = backend.attach(tracker)
+    tracker.add_habit("Yoga")
+    tracker.mark_complete("Yoga", TODAY)
+    tracker.mark_complete("Yoga", TODAY - timedelta(days=1))
+    tracker.mark_incomplete("Yoga", TODAY - timedelta(days=1))
+    tracker.add_habit("Nadar")
+    tracker.delete_habit("Nadar")
+    recorder.close()
+    tracker.mark_complete("Yoga", TODAY - timedelta(days=5))  # após close: não grava
+    loaded = SqliteBackend(db_path).load()
+    assert [h.name for h in loaded] == ["Yoga"]
+    assert loaded.get_habit("Yoga").completions == {TODAY}
+
+def test_migrate_json_and_use_as_default_backend(tmp_path, db_path):
+    json_path = str(tmp_path / "habits_data.json")
+    persistence.JsonBackend(json_path).save(sample_tracker())
+    migrate_json(json_path, db_path)
+    persistence.set_backend(SqliteBackend(db_path))
+    try:
+        tracker = persistence.load_data()
+        tracker.add_habit("Meditar")
+        persistence.save_data(tracker)
+        assert [h.name for h in persistence.load_data()] == ["Ler", "Correr", "Meditar"]
+    finally:
+        persistence.set_backend(None)
+
+def test_lazy_load_pages_older_rows_on_demand(db_path):
+    backend = SqliteBackend(db_path)
+    backend.save(sample_tracker())
+    tracker = backend.load(window_days=3, today=TODAY)
+    ler = tracker.get_habit("Ler")
+    assert not ler.history_loaded
+    assert tracker.get_current_streak("Ler", TODAY) == 10
+    assert ler.history_loaded
+    assert tracker.get_current_streak("Correr", TODAY) == 1
+
+def test_save_after_lazy_load_keeps_older_history(db_path):
+    backend = SqliteBackend(db_path)
+    tracker = sample_tracker()
+    tracker.mark_complete("Correr", TODAY - timedelta(days=400))
+    backend.save(tracker)
+    lazy = backend.load(window_days=90, today=TODAY)
+    assert not lazy.get_habit("Correr").history_loaded
+
+    backend.save(lazy)  # carrega o histórico pendente sem travar no lock do backend
+    loaded = backend.load()
+    assert loaded.get_habit("Correr").completions == {TODAY, TODAY - timedelta(days=400)}
+
+def test_batches_and_renames_are_persisted(db_path):
+    backend = SqliteBackend(db_path)
+    tracker = HabitTracker()
+    recorder = backend.attach(tracker)
+    tracker.add_habit("Yoga")
+    tracker.add_habit("Alongar")
+    tracker.mark_range("Yoga", TODAY - timedelta(days=9), TODAY)
+    tracker.mark_complete("Alongar", TODAY - timedelta(days=20))
+    tracker.merge_habits("Alongar", "Yoga")
+    tracker.rename_habit("Yoga", "Ioga")
+    recorder.close()
+    loaded = SqliteBackend(db_path).load()
+    assert [h.name for h in loaded] == ["Ioga"]
+    assert loaded.get_current_streak("Ioga", TODAY) == 10
+    assert len(loaded.get_habit("Ioga").completions) == 11
+
+
+def test_schedules_are_saved_recorded_and_added_to_old_databases(db_path):
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE habits (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    conn.execute("INSERT INTO habits (name) VALUES ('Antigo')")
+    conn.commit()
+    conn.close()
+
+    backend = SqliteBackend(db_path)
+    assert backend.load().get_schedule("Antigo") == Schedule()
+    tracker = sample_tracker()
+    tracker.set_schedule("Ler", Schedule.from_days([0, 2, 4]))
+    backend.save(tracker)
+    loaded = backend.load()
+    assert loaded.schedules() == {"Ler": Schedule.from_days([0, 2, 4])}
+
+    recorder = backend.attach(loaded)
+    loaded.set_schedule("Correr", Schedule(per_week=2))
+    loaded.set_schedule("Ler", Schedule())
+    recorder.close()
+    assert SqliteBackend(db_path).load().schedules() == {"Correr": Schedule(per_week=2)}
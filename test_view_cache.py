@@ -0,0 +1,63 @@
+# test_view_cache.py
+from datetime import date, timedelta
+from habit_logic import HabitTracker
+from view_cache import DayViewCache
+
+DAY = date(2025, 6, 10)
+
+
+def make_tracker() -> HabitTracker:
+    tracker = HabitTracker()
+    for name in ("Ler", "Correr"):
+        tracker.add_habit(name)
+    for offset in range(3):
+        tracker.mark_complete("Ler", DAY - timedelta(days=offset))
+    return tracker
+
+
+def test_repeated_dates_are_served_from_cache():
+    cache = DayViewCache(make_tracker())
+    assert cache.get(DAY, ["Ler", "Correr"]) == {"Ler": (True, 3), "Correr": (False, 0)}
+    assert cache.get(DAY, ["Ler", "Correr"]) == {"Ler": (True, 3), "Correr": (False, 0)}
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_toggle_invalidates_only_that_habit_on_that_day_and_later():
+    tracker = make_tracker()
+    cache = DayViewCache(tracker)
+    days = [DAY - timedelta(days=1), DAY, DAY + timedelta(days=1)]
+    cache.prefetch(days, ["Ler", "Correr"])
+    misses = cache.misses
+
+    tracker.mark_incomplete("Ler", DAY)
+    assert cache.get(days[0], ["Ler", "Correr"]) == {"Ler": (True, 2), "Correr": (False, 0)}
+    assert cache.misses == misses  # o dia anterior não muda
+    assert cache.get(DAY, ["Ler", "Correr"]) == {"Ler": (False, 2), "Correr": (False, 0)}
+    assert cache.get(days[2], ["Ler"]) == {"Ler": (False, 0)}
+    assert cache.misses == misses + 2  # só "Ler" em DAY e no dia seguinte
+
+
+def test_batches_renames_and_deletes_invalidate_entries():
+    tracker = make_tracker()
+    cache = DayViewCache(tracker)
+    cache.get(DAY, ["Ler", "Correr"])
+    tracker.mark_range("Correr", DAY - timedelta(days=4), DAY)
+    assert cache.get(DAY, ["Correr"]) == {"Correr": (True, 5)}
+
+    tracker.rename_habit("Ler", "Leitura")
+    assert cache.get(DAY, ["Ler", "Leitura"]) == {"Ler": (False, 0), "Leitura": (True, 3)}
+    tracker.delete_habit("Leitura")
+    tracker.add_habit("Leitura")
+    assert cache.get(DAY, ["Leitura"]) == {"Leitura": (False, 0)}
+
+
+def test_lru_keeps_at_most_capacity_days_and_close_unsubscribes():
+    tracker = make_tracker()
+    cache = DayViewCache(tracker, capacity=3)
+    for offset in range(5):
+        cache.get(DAY - timedelta(days=offset), ["Ler"])
+    assert len(cache) == 3
+
+    cache.close()
+    tracker.mark_complete("Correr", DAY)  # não chega mais ao cache
+    assert len(cache) == 0
@@ -0,0 +1,104 @@
+# view_cache.py
+"""
+Cache, por data, do que a lista de hábitos mostra: se cada hábito foi
+concluído naquele dia e a sua streak.
+
+Navegar pelas datas (dia anterior/próximo/hoje) só muda o que é exibido; com o
+cache, voltar a um dia já visto não recalcula nada, e prefetch() prepara os
+dias vizinhos em segundo plano. As datas ficam num LRU de 'capacity' dias.
+
+As entradas são invalidadas pelos eventos do tracker, só onde a alteração
+importa: marcar/desmarcar o dia D de um hábito muda a conclusão em D e a streak
+desse hábito nos dias >= D (a streak de um dia só depende dos dias até ele);
+adicionar, remover, renomear ou mudar a agenda de um hábito descarta as
+entradas dele.
+"""
+import threading
+from collections import OrderedDict
+from datetime import date
+import instrumentation
+from habit_logic import HabitTracker, expand_event
+
+DEFAULT_CAPACITY = 64  # dias mantidos no cache
+
+DayState = tuple[bool, int]  # (concluído no dia, streak no dia)
+
+
+class DayViewCache:
+    """Estados (concluído, streak) por data e por hábito, com LRU por data."""
+
+    def __init__(self, tracker: HabitTracker, capacity: int = DEFAULT_CAPACITY):
+        self.tracker = tracker
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._days: OrderedDict[date, dict[str, DayState]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Muda a cada invalidação: um valor calculado antes dela não é guardado.
+        self._epoch = 0
+        tracker.subscribe(self._on_tracker_event)
+
+    def close(self):
+        """Para de acompanhar o tracker e descarta o cache."""
+        self.tracker.unsubscribe(self._on_tracker_event)
+        with self._lock:
+            self._days.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._days)
+
+    def get(self, day: date, names: list[str]) -> dict[str, DayState]:
+        """Estado de cada hábito de 'names' em 'day'; calcula só o que falta no cache."""
+        with self._lock:
+            cached = self._days.get(day)
+            if cached is not None:
+                self._days.move_to_end(day)
+                missing = [name for name in names if name not in cached]
+            else:
+                missing = list(names)
+            epoch = self._epoch
+        self.hits += len(names) - len(missing)
+        self.misses += len(missing)
+        instrumentation.count("gui.view_cache_hits", len(names) - len(missing))
+        instrumentation.count("gui.view_cache_misses", len(missing))
+        computed = {name: self._compute(name, day) for name in missing}
+
+        with self._lock:
+            entry = self._days.get(day)
+            if entry is None:
+                entry = self._days[day] = {}
+                self._evict()
+            if epoch == self._epoch:
+                entry.update(computed)
+            # Depois de uma invalidação no meio do caminho, o resultado vale para
+            # esta renderização (o evento já pediu outra), mas não fica no cache.
+            return {name: computed[name] if name in computed else entry[name] for name in names}
+
+    def prefetch(self, days: list[date], names: list[str]):
+        """Prepara no cache os estados de 'names' nos dias 'days' (ex.: numa thread em segundo plano)."""
+        for day in days:
+            self.get(day, names)
+
+    def _compute(self, name: str, day: date) -> DayState:
+        return self.tracker.is_complete_today(name, day), self.tracker.get_current_streak(name, day)
+
+    def _evict(self):
+        while len(self._days) > self.capacity:
+            self._days.popitem(last=False)
+
+    def _on_tracker_event(self, event: tuple):
+        with self._lock:
+            self._epoch += 1
+            for simple_event in expand_event(event):
+                kind, name, *rest = simple_event
+                if kind in ("complete", "incomplete"):
+                    changed = rest[0]
+                    for day, entry in self._days.items():
+                        if day >= changed:
+                            entry.pop(name, None)
+                else:
+                    names = (name, rest[0]) if kind == "rename" else (name,)
+                    for entry in self._days.values():
+                        for affected in names:
+                            entry.pop(affected, None)